@@ -0,0 +1,18 @@
+"""Ürün arama altyapısı — urun_ara_app.ara_urun'un Streamlit'ten bağımsız parçaları.
+
+Modules:
+  motor        — arama çekirdeği: sorgu normalize, özet RPC'leri, fallback, sonuç cache'i
+  urun_index   — urun_master.parquet üzerinden token→posting list + kod index'i
+  skor         — kolon bazlı alaka skoru (ürün başına bir kez, mağazalara yayılır)
+  fallback     — sıfır sonuçta eşzamanlı, öncelik sıralı varyant kaskadı
+  cache        — session'lar arası LRU+TTL sonuç cache'i (stok günü ile geçersizleşir)
+  singleflight — aynı terimle eşzamanlı gelen RPC çağrılarını tek istekte birleştirir
+  yazim        — ürün kelime dağarcığından SymSpell tarzı yazım düzeltme
+  oneri_index  — autocomplete için oneri_listesi üzerinde prefix/infix index (top-k)
+  artifact     — versiyonlu pipeline çıktıları (CURRENT) ve arka planda sıcak yeniden yükleme
+  urun_ozet    — iki aşamalı arama: ürün özeti önce, mağaza satırları kart açılınca
+  gruplama     — sonucun ekrana hazır ürün/mağaza yapısı (rerun'larda pandas yok)
+  log_kuyrugu  — arama_log için write-behind kuyruk (toplu, tek RPC ile artırma)
+  koruma       — arama RPC'leri için AIMD eşzamanlılık sınırı + devre kesici
+  metrikler    — arama aşamalarının süre histogramları (p50/p95/p99) ve sayaçlar
+"""
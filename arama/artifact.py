@@ -0,0 +1,214 @@
+"""Versiyonlu pipeline çıktıları ve process içi sıcak yeniden yükleme.
+
+Pipeline her kurulumda çıktıları yeni bir dizine yazar:
+
+    data/versions/<YYYYmmddTHHMMSSffffff>/urun_master.parquet
+                                         /urun_master.json
+                                         /oneri_listesi.json
+                                         /yazim_sozluk.json
+
+ve en son `data/CURRENT` dosyasını (içinde versiyon adı) os.replace ile
+atomik olarak değiştirir. Okuyucular sadece CURRENT'ın gösterdiği dizinden
+okur; yarım yazılmış dosya görmezler. data/ altındaki düz kopyalar
+(GitHub Actions commit'i ve eski okuyucular için) da tmp + os.replace ile
+yazılır. CURRENT yoksa okuyucular düz dosyalara düşer.
+
+`VersiyonluNesne` bir artifact'tan kurulan process içi yapıyı (index vb.)
+tutar: ilk erişimde senkron kurar, sonraki versiyon değişimlerinde yeniyi
+arka planda kurup hazır olunca değiştirir — bu sırada aramalar eski
+yapıyla devam eder.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Hashable
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = Path("data")
+VERSIYON_KLASORU = "versions"
+CURRENT_DOSYASI = "CURRENT"
+
+# Geri dönüş ve o an okuyan session'lar için tutulan eski versiyon sayısı
+SAKLANAN_VERSIYON = 3
+
+
+def _mtime(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def aktif_versiyon(data_dir: Path = DATA_DIR) -> str | None:
+    """CURRENT'ın gösterdiği versiyon adı (dizin yoksa None)."""
+    try:
+        ad = (data_dir / CURRENT_DOSYASI).read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    if not ad or not (data_dir / VERSIYON_KLASORU / ad).is_dir():
+        return None
+    return ad
+
+
+def artifact_yolu(ad: str, data_dir: Path = DATA_DIR) -> Path:
+    """Aktif versiyondaki dosya; versiyon yoksa data/ altındaki düz kopya."""
+    versiyon = aktif_versiyon(data_dir)
+    if versiyon:
+        yol = data_dir / VERSIYON_KLASORU / versiyon / ad
+        if yol.exists():
+            return yol
+    return data_dir / ad
+
+
+def artifact_anahtari(ad: str, data_dir: Path = DATA_DIR) -> tuple | None:
+    """(yol, mtime) — VersiyonluNesne için değişim anahtarı; dosya yoksa None."""
+    yol = artifact_yolu(ad, data_dir)
+    mtime = _mtime(yol)
+    return (str(yol), mtime) if mtime is not None else None
+
+
+def versiyon_bilgisi(data_dir: Path = DATA_DIR) -> dict:
+    """Admin paneli için aktif versiyon adı, yayın zamanı ve yaşı."""
+    versiyon = aktif_versiyon(data_dir)
+    current = data_dir / CURRENT_DOSYASI
+    yayin = _mtime(current) if versiyon else None
+    if yayin is None:
+        # Versiyonsuz kurulum: düz oneri_listesi.json'un zamanı
+        yayin = _mtime(data_dir / "oneri_listesi.json")
+    surumler = sorted(p.name for p in (data_dir / VERSIYON_KLASORU).glob('*') if p.is_dir()) \
+        if (data_dir / VERSIYON_KLASORU).is_dir() else []
+    return {
+        "versiyon": versiyon,
+        "yayinlandi": datetime.fromtimestamp(yayin) if yayin else None,
+        "yas_saniye": (time.time() - yayin) if yayin else None,
+        "saklanan": surumler,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Yazıcı tarafı (pipeline)
+# ---------------------------------------------------------------------------
+
+def yeni_versiyon_dizini(data_dir: Path = DATA_DIR) -> Path:
+    ad = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    yol = data_dir / VERSIYON_KLASORU / ad
+    yol.mkdir(parents=True, exist_ok=False)
+    return yol
+
+
+def atomik_kopyala(kaynak: Path, hedef: Path):
+    """kaynak'ı hedef'e tmp + os.replace ile kopyala (okuyucu yarım dosya görmez)."""
+    tmp = hedef.with_name(hedef.name + '.tmp')
+    shutil.copyfile(kaynak, tmp)
+    os.replace(tmp, hedef)
+
+
+def yayinla(versiyon_dizini: Path, data_dir: Path = DATA_DIR,
+            sakla: int = SAKLANAN_VERSIYON):
+    """CURRENT'ı yeni versiyona atomik olarak çevir, eski versiyonları buda."""
+    current = data_dir / CURRENT_DOSYASI
+    tmp = current.with_name(CURRENT_DOSYASI + '.tmp')
+    tmp.write_text(versiyon_dizini.name, encoding='utf-8')
+    os.replace(tmp, current)
+
+    surumler = sorted(p for p in versiyon_dizini.parent.iterdir() if p.is_dir())
+    for eski in surumler[:-sakla] if sakla > 0 else []:
+        if eski.name != versiyon_dizini.name:
+            shutil.rmtree(eski, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Okuyucu tarafı (process içi yapılar)
+# ---------------------------------------------------------------------------
+
+class VersiyonluNesne:
+    """Artifact anahtarına bağlı, anahtar değişince arka planda yeniden kurulan nesne."""
+
+    def __init__(self, ad: str, kur: Callable[[Hashable], object]):
+        self.ad = ad
+        self._kur = kur
+        self._nesne = None
+        self._anahtar: Hashable | None = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._kuruluyor = False
+        self._basarisiz: Hashable | None = None  # aynı bozuk artifact'ı tekrar tekrar deneme
+        self.kurulum_ms: float | None = None
+        self.kuruldu: datetime | None = None
+
+    def _kur_ve_degistir(self, anahtar: Hashable):
+        with self._build_lock:
+            if anahtar == self._anahtar:
+                return self._nesne
+            t0 = time.perf_counter()
+            try:
+                yeni = self._kur(anahtar)
+            except Exception:
+                log.exception("%s build failed (%s)", self.ad, anahtar)
+                self._basarisiz = anahtar
+                return self._nesne
+            with self._lock:
+                self._nesne, self._anahtar = yeni, anahtar
+                self.kurulum_ms = (time.perf_counter() - t0) * 1000
+                self.kuruldu = datetime.now()
+            log.info("%s built in %.0f ms (%s)", self.ad, self.kurulum_ms, anahtar)
+            return yeni
+
+    def _arka_plan(self, anahtar: Hashable):
+        try:
+            self._kur_ve_degistir(anahtar)
+        finally:
+            with self._lock:
+                self._kuruluyor = False
+
+    def get(self, anahtar: Hashable | None):
+        """Anahtara ait nesne; değiştiyse eskisini döndürüp yenisini arka planda kurar."""
+        if anahtar is None or anahtar == self._anahtar or anahtar == self._basarisiz:
+            return self._nesne
+        if self._nesne is None:
+            return self.reload(anahtar)
+        with self._lock:
+            if self._kuruluyor:
+                return self._nesne
+            self._kuruluyor = True
+        threading.Thread(
+            target=self._arka_plan, args=(anahtar,), daemon=True, name=f"{self.ad}-reload",
+        ).start()
+        return self._nesne
+
+    def reload(self, anahtar: Hashable | None):
+        """Senkron kur (ilk yükleme, pipeline'ın aynı process'teki yenilemesi)."""
+        if anahtar is None or anahtar == self._anahtar:
+            return self._nesne
+        return self._kur_ve_degistir(anahtar)
+
+    def stats(self) -> dict:
+        return {
+            "ad": self.ad,
+            "yuklu": self._nesne is not None,
+            "kaynak": self._anahtar[0] if isinstance(self._anahtar, tuple) else self._anahtar,
+            "kuruldu": self.kuruldu,
+            "kurulum_ms": self.kurulum_ms,
+            "kuruluyor": self._kuruluyor,
+        }
+
+
+_kayitli: list[VersiyonluNesne] = []
+
+
+def kaydet(nesne: VersiyonluNesne) -> VersiyonluNesne:
+    """Admin panelinde listelenmek üzere kaydet."""
+    _kayitli.append(nesne)
+    return nesne
+
+
+def yuklu_nesneler() -> list[dict]:
+    return [n.stats() for n in _kayitli]
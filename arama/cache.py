@@ -0,0 +1,161 @@
+"""Process genelinde paylaşılan arama sonucu cache'i (LRU + TTL + bellek bütçesi).
+
+Anahtar normalize sorgudur (ara_urun'daki `optimize_sorgu`); değer işlenmiş
+ürün özeti DataFrame'i ve varsa kullanıcıya gösterilecek uyarı metnidir.
+Aynı sınıfın ikinci örneği (`get_magaza_cache`) ürün koduna göre mağaza
+satırlarını tutar. Tüm Streamlit session'ları aynı cache'leri görür.
+
+stok_gunluk günde bir kez yüklenir (09:00) ve pipeline 10:30'dan sonra
+yeni bir artifact versiyonu yayınlar (bkz. arama/artifact.py). Cache her erişimde bu ikisinden türetilen
+bir "veri damgası"na bakar; damga değişince tüm girdiler düşürülür.
+
+Süresi dolan girdi hemen silinmez (LRU sırasıyla çıkar): arama RPC'leri devre
+kesici yüzünden reddedilirken `bayat_getir` onu "kısıtlı" sonuç olarak verir
+(bkz. arama/koruma.py).
+
+Cache'ten dönen DataFrame'ler paylaşılır — çağıranlar yerinde değiştirmemeli.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from .artifact import artifact_anahtari
+
+ONERI_JSON = Path("data/oneri_listesi.json")
+
+# Stok yükleme saati: bu saatten önceki sonuçlar bir önceki stok gününe ait
+STOK_YUKLEME_SAATI = 9
+
+DEFAULT_TTL = 30 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def veri_damgasi() -> tuple:
+    """(stok günü, aktif oneri_listesi.json (yol, mtime)) — değişirse cache geçersizdir."""
+    stok_gunu = (datetime.now() - timedelta(hours=STOK_YUKLEME_SAATI)).date()
+    return stok_gunu, artifact_anahtari(ONERI_JSON.name)
+
+
+def _df_boyut(df: pd.DataFrame | None) -> int:
+    if df is None:
+        return 0
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except Exception:
+        return 0
+
+
+class SonucCache:
+    """Thread-safe LRU + TTL cache; toplam DataFrame boyutu max_bytes ile sınırlı."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL,
+                 damga_fn=veri_damgasi):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._damga_fn = damga_fn
+        self._damga = None
+        self._data: OrderedDict[str, tuple] = OrderedDict()  # key → (df, uyari, nbytes, ts)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bayat_hits = 0
+
+    def _damga_kontrol(self):
+        damga = self._damga_fn()
+        if damga != self._damga:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._bytes = 0
+            self._damga = damga
+
+    def get(self, key: str):
+        """(df, uyari) ya da None."""
+        with self._lock:
+            self._damga_kontrol()
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            df, uyari, nbytes, ts = entry
+            if time.time() - ts > self.ttl:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return df, uyari
+
+    def bayat_getir(self, key: str):
+        """TTL'i dolmuş olsa da (df, uyari, yaş saniye) ya da None — isabet sayılmaz."""
+        with self._lock:
+            self._damga_kontrol()
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            df, uyari, _, ts = entry
+            self.bayat_hits += 1
+            return df, uyari, time.time() - ts
+
+    def put(self, key: str, df: pd.DataFrame | None, uyari: str = ""):
+        nbytes = _df_boyut(df)
+        if nbytes > self.max_bytes:
+            return  # Tek başına bütçeyi aşan sonucu saklama
+        with self._lock:
+            self._damga_kontrol()
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (df, uyari, nbytes, time.time())
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._data:
+                _, (_, _, eski_bytes, _) = self._data.popitem(last=False)
+                self._bytes -= eski_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            toplam = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / toplam) if toplam else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "bayat_hits": self.bayat_hits,
+            }
+
+
+_sonuc_cache = SonucCache()
+
+
+def get_sonuc_cache() -> SonucCache:
+    return _sonuc_cache
+
+
+# İki aşamalı aramanın 2. aşaması: urun_kod → o ürünün mağaza satırları
+# (bkz. arama/urun_ozet.py). Satırlar kartı açılınca çekilir; aynı ürünü
+# açan diğer session'lar RPC'ye gitmez.
+_magaza_cache = SonucCache(max_bytes=32 * 1024 * 1024)
+
+
+def get_magaza_cache() -> SonucCache:
+    return _magaza_cache
@@ -0,0 +1,106 @@
+"""Sıfır sonuçlu aramalar için fallback kaskadı.
+
+İlk `hizli_urun_ara` çağrısı boş dönünce denenecek sorgu varyantları
+(öncelik sırasıyla):
+  1. kategori kelimeleri atılmış sorgu   ("seg klima" → "seg")
+  2. kelimeler tek tek                   (çok kelimeli sorgularda)
+  3. kapasite sadeleştirilmiş sorgu      ("18000 btu" → "18 btu")
+  4. ilk kelime                          (marka odaklı)
+  5. en uzun kelime                      (son çare)
+
+Varyantlar sırayla değil, process genelinde paylaşılan sınırlı bir thread
+pool'da eşzamanlı gönderilir. Sonuç yine öncelik sırasıyla seçilir: en
+yüksek öncelikli boş olmayan sonuç döner, geri kalanlar iptal edilir
+(henüz başlamadıysa) ya da yok sayılır. Pool boyutu aynı anda Supabase'e
+giden fallback RPC sayısının üst sınırıdır.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+KATEGORI_KELIMELERI = {
+    'klima', 'televizyon', 'tv', 'telefon', 'supurge', 'buzdolabi',
+    'camasir', 'bulasik', 'makine', 'makinesi', 'makinası', 'ucretsiz', 'teslimat',
+    'btu', 'inv', 'inverter'
+}
+
+# Process genelinde aynı anda en fazla bu kadar fallback RPC'si uçuşta olur.
+# Fazlası pool kuyruğunda bekler; sonucu belli olan aramanın kuyruktaki
+# varyantları iptal edilir.
+MAX_INFLIGHT = 4
+
+_pool = ThreadPoolExecutor(max_workers=MAX_INFLIGHT, thread_name_prefix="arama-fallback")
+
+
+def fallback_sorgulari(optimize_sorgu: str) -> list[str]:
+    """Denenecek fallback terimleri, öncelik sırasıyla (tekrarsız)."""
+    adaylar: list[str] = []
+    sorgu_kelimeleri = optimize_sorgu.split()
+    cok_kelimeli = len(sorgu_kelimeleri) > 1
+
+    # 1. Kategori temizleyip tekrar dene (Örn: "Seg klima" -> "Seg")
+    yeni_sorgu_kelimeleri = [w for w in sorgu_kelimeleri if w not in KATEGORI_KELIMELERI]
+    if 0 < len(yeni_sorgu_kelimeleri) < len(sorgu_kelimeleri):
+        adaylar.append(" ".join(yeni_sorgu_kelimeleri))
+
+    # 2. Kelimeleri tek tek dene
+    if cok_kelimeli:
+        adaylar.extend(
+            w for w in sorgu_kelimeleri
+            if len(w) >= 3 and w not in KATEGORI_KELIMELERI
+        )
+
+    # 3. Kapasite temizleyip tekrar dene (Örn: "18000" -> "18")
+    if "000" in optimize_sorgu:
+        yeni_sorgu = optimize_sorgu.replace("000", "").strip()
+        if len(yeni_sorgu) >= 2:
+            adaylar.append(yeni_sorgu)
+
+    # 4. İlk kelimeyi dene (marka odaklı)
+    if cok_kelimeli:
+        ilk_kelime = sorgu_kelimeleri[0]
+        if len(ilk_kelime) >= 3 and ilk_kelime not in KATEGORI_KELIMELERI:
+            adaylar.append(ilk_kelime)
+
+    # 5. En uzun kelimeyi dene (son çare)
+    if cok_kelimeli:
+        en_uzun_kelime = max(sorgu_kelimeleri, key=len)
+        if len(en_uzun_kelime) >= 4:
+            adaylar.append(en_uzun_kelime)
+
+    # Aynı terimi iki kez sormanın anlamı yok; ilk (öncelikli) konum kalır
+    return [t for t in dict.fromkeys(adaylar) if t and t != optimize_sorgu]
+
+
+def _guvenli_cagir(rpc: Callable[[str], list], terim: str) -> list:
+    try:
+        return rpc(terim) or []
+    except Exception as e:
+        log.debug("fallback RPC failed for %r: %s", terim, e)
+        return []
+
+
+def ilk_sonuc(terimler: list[str], rpc: Callable[[str], list]) -> tuple[str, list] | None:
+    """Terimleri eşzamanlı dene; en öncelikli boş olmayan (terim, data) döner.
+
+    rpc(terim) → satır listesi. Hata veren varyant boş sonuç sayılır.
+    Worker thread'lerde çalıştığı için rpc içinde st.* çağrılmamalı.
+    """
+    if not terimler:
+        return None
+
+    futures: list[Future] = [_pool.submit(_guvenli_cagir, rpc, t) for t in terimler]
+    try:
+        for terim, fut in zip(terimler, futures):
+            data = fut.result()
+            if data:
+                return terim, data
+        return None
+    finally:
+        for fut in futures:
+            fut.cancel()
@@ -0,0 +1,70 @@
+"""Arama sonucunun ekrana hazır, ürün bazlı gösterimi.
+
+Streamlit her widget etkileşiminde (kart açma, poster kaydırma...) tüm
+sayfayı yeniden çalıştırır ve `_fe_search_result` her seferinde yeniden
+çizilir. Sonuç DataFrame'i arama anında bir kez buraya çevrilir: gösterilecek
+ürünler sırasıyla düz dict'ler halinde, fiyat metni ve sayılar hazır.
+Bir ürünün mağaza satırları ilk açılışta `magaza_kayitlari` ile dict
+listesine çevrilir, çizilen HTML sonuçta saklanır; sonraki çizimler
+pandas'a dokunmaz.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+# goster_sonuclar'ın en fazla gösterdiği ürün sayısı
+GOSTERILEN_URUN = 40
+
+_MAGAZA_KOLONLARI = ('magaza_kod', 'magaza_ad', 'sm_kod', 'bs_kod', 'stok_adet', 'latitude', 'longitude')
+
+
+def fiyat_metni(fiyat) -> str:
+    """1234.5 → "1.234,50 ₺"; geçersiz/sıfır fiyat → ""."""
+    try:
+        deger = float(fiyat)
+    except (TypeError, ValueError):
+        return ""
+    if not deger > 0:  # NaN dahil
+        return ""
+    return f"{deger:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " ₺"
+
+
+def sonucu_grupla(df: pd.DataFrame, top_n: int = GOSTERILEN_URUN) -> dict:
+    """Ürün özeti DataFrame'i (bkz. arama/urun_ozet.py) → gösterime hazır sonuç.
+
+    Returns:
+        {"toplam": ürün sayısı, "urunler": [ilk top_n ürün dict'i],
+         "magaza_html": {urun_kod: kart HTML'i}}  — kartlar açıldıkça dolar.
+        stoklu_magaza NaN olan ürün (kısıtlı mod, bkz. arama/motor.kisitli_sonuc)
+        "stok_bilinmiyor": True taşır.
+    """
+    if df is None or df.empty:
+        return {"toplam": 0, "urunler": [], "magaza_html": {}}
+
+    urunler = []
+    for kayit in df.head(top_n).to_dict('records'):
+        kod = str(kayit['urun_kod'])
+        stok_bilinmiyor = bool(pd.isna(kayit.get('stoklu_magaza')))
+        urunler.append({
+            "urun_kod": kod,
+            "urun_ad": str(kayit['urun_ad']) if kayit.get('urun_ad') else kod,
+            "stoklu_magaza": 0 if stok_bilinmiyor else int(kayit['stoklu_magaza']),
+            "toplam_stok": int(kayit.get('toplam_stok') or 0),
+            "fiyat_str": fiyat_metni(kayit.get('birim_fiyat')),
+            "stok_bilinmiyor": stok_bilinmiyor,
+        })
+    return {"toplam": int(df['urun_kod'].nunique()), "urunler": urunler, "magaza_html": {}}
+
+
+def magaza_kayitlari(df: pd.DataFrame) -> list[dict]:
+    """Stoklu mağaza satırları (stok sırasında) → çizim için dict listesi."""
+    if df is None or df.empty:
+        return []
+    kolonlar = [k for k in _MAGAZA_KOLONLARI if k in df.columns]
+    secili = df[kolonlar].astype(object)
+    # NaN → None: çizimde `magaza_ad or magaza_kod` gibi boşluk kontrolleri doğru çalışsın
+    kayitlar = secili.where(secili.notna(), None).to_dict('records')
+    for k in kayitlar:
+        k['stok_adet'] = int(k.get('stok_adet') or 0)
+    return kayitlar
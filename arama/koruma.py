@@ -0,0 +1,175 @@
+"""Arama RPC'leri için uyarlanır eşzamanlılık sınırı (AIMD) ve devre kesici.
+
+Supabase yük altındayken her arama RPC'si 57014 (statement timeout) ile
+dönebilir; fallback kaskadı da tam bu anda yükü katlar. Bu modül process'ten
+veritabanına giden arama RPC'lerini tek bir kapıdan geçirir:
+
+  Sınır (AIMD) — aynı anda uçuşta olabilecek RPC sayısı. HEDEF_MS'in altında
+    biten her çağrı sınırı 1/sınır kadar artırır (pencere başına ~+1); timeout,
+    hata ya da hedefi aşan yavaş çağrı sınırı yarıya indirir (AZALTMA_ARALIGI
+    içinde bir kez). Sınır doluysa çağıran en fazla BEKLEME saniye bekler,
+    sonra reddedilir.
+
+  Devre kesici — ESIK ardışık hatadan sonra devre ACIK_SURE boyunca açılır ve
+    çağrılar veritabanına hiç gitmeden reddedilir. Süre dolunca tek bir deneme
+    çağrısına izin verilir (yarı açık): başarılıysa devre kapanır, değilse
+    yeniden açılır.
+
+Reddedilen çağrı `KorumaAcik` fırlatır; arama çekirdeği (arama/motor.py) bunu
+görünce kaskadı atlar. Devre açıksa ("devre") bayat cache ya da yerel ürün
+index'iyle "kısıtlı" sonuç döner; sınır dolu ("limit") reddi anlık yoğunluktur,
+kısıtlı moda geçilmez, cache'lenmeyen bir "meşgul" hatası döner.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
+
+BASLANGIC_LIMIT = 8
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+HEDEF_MS = 2000
+AZALTMA_ARALIGI = 1.0
+BEKLEME = 0.3
+ESIK = 5
+ACIK_SURE = 20.0
+
+KAPALI, ACIK, YARI_ACIK = "kapali", "acik", "yari_acik"
+
+
+class KorumaAcik(Exception):
+    """Çağrı veritabanına gönderilmeden reddedildi (neden: "devre" | "limit")."""
+
+    def __init__(self, neden: str):
+        super().__init__(f"arama RPC reddedildi ({neden})")
+        self.neden = neden
+
+
+class RpcKoruma:
+    """Thread-safe AIMD eşzamanlılık sınırı + devre kesici.
+
+    hata_sayilir(e) False dönen hatalar (ör. RPC'nin kurulu olmaması) ne
+    sınırı ne devreyi etkiler.
+    """
+
+    def __init__(self, baslangic: float = BASLANGIC_LIMIT, min_limit: int = MIN_LIMIT,
+                 max_limit: int = MAX_LIMIT, hedef_ms: float = HEDEF_MS, esik: int = ESIK,
+                 acik_sure: float = ACIK_SURE, bekleme: float = BEKLEME,
+                 hata_sayilir: Callable[[BaseException], bool] = lambda e: True,
+                 saat: Callable[[], float] = time.monotonic):
+        self.limit = float(baslangic)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.hedef_ms = hedef_ms
+        self.esik = esik
+        self.acik_sure = acik_sure
+        self.bekleme = bekleme
+        self._hata_sayilir = hata_sayilir
+        self._saat = saat
+        self._kosul = threading.Condition()
+        self.ucusta = 0
+        self.durum = KAPALI
+        self._acildi = 0.0
+        self._deneme_ucusta = False
+        self._son_azaltma = float("-inf")
+        self._ardisik_hata = 0
+        self.basarili = 0
+        self.hatalar = 0
+        self.reddedilen = 0
+        self.acilma = 0
+
+    def _azalt(self, simdi: float):
+        if simdi - self._son_azaltma >= AZALTMA_ARALIGI:
+            self.limit = max(self.min_limit, self.limit / 2)
+            self._son_azaltma = simdi
+
+    def _gir(self) -> bool:
+        """Slot al; yarı açık devrede deneme çağrısıysa True döner."""
+        son = self._saat() + self.bekleme
+        with self._kosul:
+            while True:
+                simdi = self._saat()
+                if self.durum == ACIK:
+                    if simdi - self._acildi < self.acik_sure:
+                        self.reddedilen += 1
+                        raise KorumaAcik("devre")
+                    self.durum = YARI_ACIK
+                if self.durum == YARI_ACIK:
+                    if self._deneme_ucusta:
+                        self.reddedilen += 1
+                        raise KorumaAcik("devre")
+                    self._deneme_ucusta = True
+                    self.ucusta += 1
+                    return True
+                if self.ucusta < int(self.limit):
+                    self.ucusta += 1
+                    return False
+                kalan = son - simdi
+                if kalan <= 0:
+                    self.reddedilen += 1
+                    raise KorumaAcik("limit")
+                self._kosul.wait(kalan)
+
+    def _cik(self, deneme: bool, sure_ms: float, hata: BaseException | None):
+        simdi = self._saat()
+        with self._kosul:
+            self.ucusta -= 1
+            if deneme:
+                self._deneme_ucusta = False
+            if hata is not None and self._hata_sayilir(hata):
+                self.hatalar += 1
+                self._ardisik_hata += 1
+                self._azalt(simdi)
+                if deneme or (self.durum == KAPALI and self._ardisik_hata >= self.esik):
+                    if self.durum != ACIK:
+                        self.acilma += 1
+                        log.warning("arama RPC devresi açıldı (%d ardışık hata)", self._ardisik_hata)
+                    self.durum = ACIK
+                    self._acildi = simdi
+            elif hata is None:
+                self.basarili += 1
+                self._ardisik_hata = 0
+                if deneme:
+                    log.info("arama RPC devresi kapandı")
+                    self.durum = KAPALI
+                if sure_ms > self.hedef_ms:
+                    self._azalt(simdi)
+                elif self.durum == KAPALI:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._kosul.notify_all()
+
+    def cagir(self, fn: Callable[[], Any]) -> Any:
+        """fn()'i sınır ve devre kesici altında çalıştır; reddedilirse KorumaAcik."""
+        deneme = self._gir()
+        t0 = time.perf_counter()
+        try:
+            sonuc = fn()
+        except BaseException as e:
+            self._cik(deneme, (time.perf_counter() - t0) * 1000, e)
+            raise
+        self._cik(deneme, (time.perf_counter() - t0) * 1000, None)
+        return sonuc
+
+    def kisitli_mi(self) -> bool:
+        """Devre açık ya da deneme aşamasında mı (UI göstergesi için)."""
+        return self.durum != KAPALI
+
+    def stats(self) -> dict:
+        with self._kosul:
+            return {
+                "durum": self.durum,
+                "limit": self.limit,
+                "ucusta": self.ucusta,
+                "basarili": self.basarili,
+                "hatalar": self.hatalar,
+                "reddedilen": self.reddedilen,
+                "acilma": self.acilma,
+                "ardisik_hata": self._ardisik_hata,
+                "acik_kalan": max(0.0, self.acik_sure - (self._saat() - self._acildi))
+                if self.durum == ACIK else 0.0,
+            }
@@ -0,0 +1,182 @@
+"""Arama log'u için write-behind kuyruk (process başına bir tane).
+
+Eskiden her arama `arama_log` tablosuna SELECT + UPDATE/INSERT gönderiyordu
+(son_arama_zamani kolonu hata verirse bir tur daha). Artık arama sadece
+bellekteki (tarih, terim) sayacını artırır; arka plan thread'i her
+FLUSH_ARALIGI saniyede birikenleri tek bir `arama_log_artir` RPC'siyle
+(INSERT ... ON CONFLICT DO UPDATE) yazar. Yazma başarısız olursa kayıtlar
+kuyruğa geri katılır ve bir sonraki turda tekrar denenir; yazıcı batch'in bir
+kısmını yazabildiyse KismiYazim ile sadece yazılamayanları geri verir (aksi
+halde yazılmış terimler iki kez sayılırdı). Process kapanırken (atexit) kuyruk
+boşaltılır.
+
+Veritabanı uzun süre erişilemezse bellek MAX_BEKLEYEN farklı terimle
+sınırlıdır; fazlası (geri katılan kayıtlar dahil) sayılıp düşürülür.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+FLUSH_ARALIGI = 5.0
+MAX_BATCH = 500
+MAX_BEKLEYEN = 5000
+
+
+class KismiYazim(Exception):
+    """Yazıcı batch'in bir kısmını yazdı; kalan kayıtlar kuyruğa geri katılır."""
+
+    def __init__(self, kalan: list[dict], neden: Exception):
+        super().__init__(str(neden))
+        self.kalan = kalan
+
+
+class AramaLogKuyrugu:
+    """(tarih, terim) başına arama sayısını biriktirip toplu yazan kuyruk.
+
+    yaz(kayitlar) her kayıt için {tarih, arama_terimi, adet, sonuc_sayisi,
+    son_arama_zamani} dict'i alır; hata fırlatırsa kayıtlar geri katılır
+    (KismiYazim fırlatırsa sadece e.kalan).
+    """
+
+    def __init__(self, yaz: Callable[[list[dict]], None], aralik: float = FLUSH_ARALIGI,
+                 max_batch: int = MAX_BATCH, max_bekleyen: int = MAX_BEKLEYEN):
+        self._yaz = yaz
+        self.aralik = aralik
+        self.max_batch = max_batch
+        self.max_bekleyen = max_bekleyen
+        self._bekleyen: dict[tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dur = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.eklenen = 0
+        self.yazilan = 0
+        self.flush_sayisi = 0
+        self.hatalar = 0
+        self.dusurulen = 0
+        self.son_flush_ms: float | None = None
+        self.son_hata: str | None = None
+
+    def ekle(self, terim: str, sonuc_sayisi: int, zaman: datetime | None = None):
+        """Aramayı say (I/O yok)."""
+        zaman = zaman or datetime.now()
+        anahtar = (zaman.strftime('%Y-%m-%d'), terim)
+        with self._lock:
+            kayit = self._bekleyen.get(anahtar)
+            if kayit is None:
+                if len(self._bekleyen) >= self.max_bekleyen:
+                    self.dusurulen += 1
+                    return
+                kayit = self._bekleyen[anahtar] = {
+                    'tarih': anahtar[0], 'arama_terimi': terim, 'adet': 0,
+                }
+            kayit['adet'] += 1
+            kayit['sonuc_sayisi'] = int(sonuc_sayisi)
+            kayit['son_arama_zamani'] = zaman.isoformat()
+            self.eklenen += 1
+        self._baslat()
+
+    def _baslat(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._dongu, daemon=True, name="arama-log-flush")
+            self._thread.start()
+
+    def _dongu(self):
+        while not self._dur.wait(self.aralik):
+            try:
+                while self.flush() >= self.max_batch:
+                    pass
+            except Exception:
+                log.exception("arama log flush loop error")
+
+    def _geri_kat(self, batch: list[dict]):
+        with self._lock:
+            for kayit in batch:
+                anahtar = (kayit['tarih'], kayit['arama_terimi'])
+                yeni = self._bekleyen.get(anahtar)
+                if yeni is None:
+                    # ekle ile aynı sınır: yazılamayan yeni terim belleği büyütmez
+                    if len(self._bekleyen) >= self.max_bekleyen:
+                        self.dusurulen += kayit['adet']
+                        continue
+                    self._bekleyen[anahtar] = kayit
+                else:
+                    # Sonradan gelen kayıt daha güncel sonuç sayısı/zamanı taşır
+                    yeni['adet'] += kayit['adet']
+
+    def flush(self) -> int:
+        """En fazla max_batch kaydı yaz; yazılan kayıt sayısını döndürür."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._bekleyen:
+                    return 0
+                anahtarlar = list(self._bekleyen)[:self.max_batch]
+                batch = [self._bekleyen.pop(a) for a in anahtarlar]
+            t0 = time.perf_counter()
+            try:
+                self._yaz(batch)
+            except Exception as e:
+                kalan = e.kalan if isinstance(e, KismiYazim) else batch
+                self._geri_kat(kalan)
+                with self._lock:
+                    self.hatalar += 1
+                    self.yazilan += len(batch) - len(kalan)
+                    self.son_hata = str(e)[:200]
+                log.warning("arama log flush failed (%d kayıt geri kuyrukta): %s", len(kalan), e)
+                return 0
+            with self._lock:
+                self.flush_sayisi += 1
+                self.yazilan += len(batch)
+                self.son_flush_ms = (time.perf_counter() - t0) * 1000
+            return len(batch)
+
+    def kapat(self, timeout: float = 5.0):
+        """Thread'i durdur ve kuyruğu boşalt (yazma başarısızsa timeout'ta vazgeç)."""
+        self._dur.set()
+        son = time.monotonic() + timeout
+        while time.monotonic() < son:
+            if self.flush() == 0:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bekleyen": len(self._bekleyen),
+                "bekleyen_arama": sum(k['adet'] for k in self._bekleyen.values()),
+                "eklenen": self.eklenen,
+                "yazilan": self.yazilan,
+                "flush": self.flush_sayisi,
+                "hatalar": self.hatalar,
+                "dusurulen": self.dusurulen,
+                "son_flush_ms": self.son_flush_ms,
+                "son_hata": self.son_hata,
+                "aralik": self.aralik,
+            }
+
+
+_kuyruk: AramaLogKuyrugu | None = None
+_kuyruk_lock = threading.Lock()
+
+
+def get_log_kuyrugu(yaz: Callable[[list[dict]], None]) -> AramaLogKuyrugu:
+    """Process'in kuyruğu; ilk çağrıdaki yaz fonksiyonuyla kurulur."""
+    global _kuyruk
+    if _kuyruk is None:
+        with _kuyruk_lock:
+            if _kuyruk is None:
+                _kuyruk = AramaLogKuyrugu(yaz)
+                # Çıkışta boşaltma sadece process kuyruğu için (tek hook)
+                atexit.register(_kuyruk.kapat)
+    return _kuyruk
@@ -0,0 +1,127 @@
+"""Arama yolu için aşama bazlı süre ölçümü (process içi, hafif).
+
+Yavaş bir aramanın zamanı nerede harcadığını görmek için ara_urun,
+goster_sonuclar ve log_arama aşamaları `olc(ad)` ile sarılır:
+
+    with olc("skor"):
+        df = _process_results(ozet, sorgu)
+
+Her aşamanın son ORNEK_SAYISI süresi bellekte tutulur; admin panelindeki
+Performans sekmesi p50/p95/p99'u buradan okur. Süre dışı olaylar (fallback
+derinliği, timeout, hata) `say(ad, etiket)` ile sayılır.
+
+Ölçüm kapalıyken (`ARAMA_METRIK=0` ya da `etkinlestir(False)`) `olc` paylaşılan
+bir boş context manager döndürür ve `say` hemen döner: saat okunmaz, kilit
+alınmaz, bellek ayrılmaz.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+
+ORNEK_SAYISI = 2000
+
+_etkin = os.environ.get("ARAMA_METRIK", "1") != "0"
+_bos = nullcontext()
+_lock = threading.Lock()
+_sureler: dict[str, deque] = {}
+_adetler: Counter = Counter()
+_toplam_ms: Counter = Counter()
+_sayaclar: dict[str, Counter] = {}
+
+
+def etkin() -> bool:
+    return _etkin
+
+
+def etkinlestir(acik: bool):
+    global _etkin
+    _etkin = bool(acik)
+
+
+def kaydet(ad: str, ms: float):
+    """Aşama süresini (ms) histograma ekle."""
+    with _lock:
+        ornekler = _sureler.get(ad)
+        if ornekler is None:
+            ornekler = _sureler[ad] = deque(maxlen=ORNEK_SAYISI)
+        ornekler.append(ms)
+        _adetler[ad] += 1
+        _toplam_ms[ad] += ms
+
+
+class _Olcum:
+    __slots__ = ("ad", "t0")
+
+    def __init__(self, ad: str):
+        self.ad = ad
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        kaydet(self.ad, (time.perf_counter() - self.t0) * 1000)
+        if exc_type is not None:
+            say("hata", self.ad)
+        return False
+
+
+def olc(ad: str):
+    """`with olc("asama"):` — blok süresini kaydeder; kapalıyken maliyetsiz."""
+    if not _etkin:
+        return _bos
+    return _Olcum(ad)
+
+
+def say(ad: str, etiket: str = "", n: int = 1):
+    """Sayaç artır (ör. say("fallback_derinlik", "2"), say("timeout", fn))."""
+    if not _etkin:
+        return
+    with _lock:
+        sayac = _sayaclar.get(ad)
+        if sayac is None:
+            sayac = _sayaclar[ad] = Counter()
+        sayac[etiket] += n
+
+
+def _yuzdelik(sirali: list[float], p: float) -> float:
+    # Nearest-rank
+    return sirali[min(len(sirali) - 1, max(0, int(round(p / 100 * len(sirali))) - 1))]
+
+
+def asama_ozeti() -> list[dict]:
+    """Aşama başına {ad, adet, ort_ms, p50_ms, p95_ms, p99_ms, max_ms} (son örnekler üzerinden)."""
+    with _lock:
+        kopya = {ad: (sorted(d), _adetler[ad], _toplam_ms[ad]) for ad, d in _sureler.items()}
+    ozet = []
+    for ad, (sirali, adet, toplam) in kopya.items():
+        if not sirali:
+            continue
+        ozet.append({
+            "ad": ad,
+            "adet": adet,
+            "ort_ms": toplam / adet,
+            "p50_ms": _yuzdelik(sirali, 50),
+            "p95_ms": _yuzdelik(sirali, 95),
+            "p99_ms": _yuzdelik(sirali, 99),
+            "max_ms": sirali[-1],
+        })
+    return ozet
+
+
+def sayaclar() -> dict[str, dict[str, int]]:
+    with _lock:
+        return {ad: dict(sayac) for ad, sayac in _sayaclar.items()}
+
+
+def sifirla():
+    with _lock:
+        _sureler.clear()
+        _adetler.clear()
+        _toplam_ms.clear()
+        _sayaclar.clear()
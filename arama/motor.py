@@ -0,0 +1,477 @@
+"""Arama çekirdeği: sorgu normalize → yerel index / özet RPC'leri → fallback kaskadı.
+
+urun_ara_app.ara_urun'un Streamlit'e dokunmayan kısmı. Supabase client'ı
+dışarıdan verilir (`client.rpc(fn, params).execute().data`); uygulama gerçek
+client'ı, benchmarks/bench_arama.py ise yerel sahte RPC'yi geçirir. Uyarı/hata
+kullanıcıya gösterilmez, (df, uyari, hata) olarak döner; mesajlar çağıranın
+işidir.
+
+Tüm arama RPC'leri tek bir RpcKoruma'dan (AIMD sınırı + devre kesici, bkz.
+arama/koruma.py) geçer. Reddedilen aramada kaskad atlanır. Devre açıksa hata
+"koruma" ile bayat cache sonucu ya da yerel index'ten stok bilgisiz ürün
+listesi döner; sadece eşzamanlılık sınırı dolduysa (veritabanı sağlıklı,
+anlık yoğunluk) hata "mesgul" döner, kısıtlı moda geçilmez.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils_text import normalize_tr_search
+
+from . import metrikler
+from .cache import get_magaza_cache, get_sonuc_cache
+from .fallback import fallback_sorgulari, ilk_sonuc
+from .koruma import KorumaAcik, RpcKoruma
+from .metrikler import olc
+from .singleflight import get_rpc_group
+from .urun_ozet import OZET_KOLONLARI, magaza_df, ozet_df, ozet_sirala, satirlardan_ozet
+
+log = logging.getLogger(__name__)
+
+# TV aramasında elenen aksesuar/alakasız ürünler (önceden derlenmiş)
+RE_TV_NEGATIF = re.compile(
+    r'battaniye|battanıye|ünite|unite|sehpa|koltuk|kılıf|kumanda|askı|aparat|kablo|atv|oyuncak|lisanslı|tvk',
+    re.IGNORECASE
+)
+
+
+def temizle_ve_kok_bul(text: str) -> str:
+    """
+    SQL normalize_tr_search ile birebir uyumlu normalize + yazım düzeltme.
+
+    SQL fonksiyonu sırası:
+      1. translate(text, 'İIıĞğÜüŞşÖöÇç', 'iiigguussoocc')
+      2. unaccent(...)       → â→a gibi accent temizliği
+      3. lower(...)
+      4. replace('makinasi','makine')
+      5. replace('makinesi','makine')
+      6. replace('makina','makine')
+
+    Örnekler:
+      "terlik"           → "terlik"          (ESKİ: "ter" ❌)
+      "waffle makinesi"  → "waffle makine"   ✅
+      "akıllı saat"      → "akilli saat"     (ESKİ: "akil saat" ❌)
+      "nescaffe gold"    → "nescafe gold"    ✅ (yazım düzeltme)
+    """
+    # 1-6 + temizlik: ortak normalize (bkz. utils_text.normalize_tr_search)
+    result = normalize_tr_search(text)
+
+    # 7. Yazım hatası düzeltme (kelime bazlı)
+    words = result.split()
+    corrected = [YAZIM_DUZELTME.get(w, w) for w in words]
+    result = ' '.join(corrected)
+
+    return result
+
+
+# ============================================================================
+# YAZIM HATASI SÖZLÜĞÜ
+# ============================================================================
+# Arama loglarından tespit edilen yaygın yazım hataları.
+# Genel düzeltmeyi ürün sözlüğünden kurulan index yapar (bkz. arama/yazim.py);
+# buradakiler ondan önce uygulanan elle istisnalardır (ör. cold → gold).
+# Format: 'yanlis_yazim': 'dogru_yazim'
+# ============================================================================
+
+YAZIM_DUZELTME = {
+    # Marka yazım hataları
+    'nescaffe': 'nescafe', 'nescfe': 'nescafe', 'nesacfe': 'nescafe',
+    'cold': 'gold',
+    'philps': 'philips', 'phlips': 'philips', 'plips': 'philips',
+    'samsun': 'samsung', 'samgung': 'samsung', 'smasung': 'samsung',
+    'tosiba': 'toshiba', 'toshbia': 'toshiba', 'tosihba': 'toshiba',
+    'grundik': 'grundig', 'grunding': 'grundig',
+    'sinbo': 'sinbo',
+
+    # Ürün kategorisi yazım hataları
+    'tercere': 'tencere', 'tencre': 'tencere', 'tenecre': 'tencere',
+    'blendir': 'blender', 'belnder': 'blender', 'blnder': 'blender',
+    'wafle': 'waffle', 'vafle': 'waffle', 'wafle': 'waffle',
+    'aklli': 'akilli', 'akkilli': 'akilli', 'aklili': 'akilli',
+    'buzdobali': 'buzdolabi', 'buzdolbi': 'buzdolabi',
+    'televizon': 'televizyon', 'televzyon': 'televizyon', 'teleivzyon': 'televizyon',
+    'makarana': 'makarna', 'maknara': 'makarna',
+    'bibron': 'biberon', 'bbiron': 'biberon',
+    'termoss': 'termos',
+    'kulaklik': 'kulaklik',
+    'supurge': 'supurge', 'spurge': 'supurge', 'surpuge': 'supurge',
+    'camasir': 'camasir', 'camaisr': 'camasir',
+    'bulasik': 'bulasik', 'bualsik': 'bulasik',
+    'mikrodlga': 'mikrodalga', 'mikrdalga': 'mikrodalga',
+    'sampuan': 'sampuan', 'sampuvan': 'sampuan',
+    'rejisor': 'rejisör',
+}
+
+
+def _oneri_ad_to_kod(arama_text: str) -> str:
+    """Dropdown'dan gelen ürün adını koda çevir. Bulamazsa boş string döner."""
+    from .oneri_index import get_oneri_index
+    try:
+        index = get_oneri_index()
+    except Exception:
+        return ''
+    if index is None:
+        return ''
+    with olc("oneri_lookup"):
+        return index.ad_to_kod(arama_text)
+
+
+def _payload_kaydet(data, query: str):
+    """ARAMA_PAYLOAD_DIR ayarlıysa ham RPC payload'ını benchmark için diske yaz."""
+    kayit_dir = os.environ.get('ARAMA_PAYLOAD_DIR')
+    if not kayit_dir:
+        return
+    try:
+        out = Path(kayit_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        dosya = out / f"{int(time.time() * 1000)}_{re.sub(r'[^0-9a-z]+', '_', query)[:40]}.json"
+        with dosya.open('w', encoding='utf-8') as f:
+            json.dump({'query': query, 'data': data}, f, ensure_ascii=False)
+    except Exception:
+        log.exception("payload kaydı başarısız")
+
+
+def _yerel_aday_kodlar(optimize_sorgu: str, is_kod_araması: bool) -> list:
+    """In-process ürün index'inden aday urun_kod listesi. Index yoksa boş liste."""
+    from .urun_index import get_urun_index
+    try:
+        index = get_urun_index()
+    except Exception:
+        log.exception("urun_index unavailable")
+        return []
+    if index is None:
+        return []
+    if is_kod_araması:
+        return [optimize_sorgu] if index.kod_var_mi(optimize_sorgu) else []
+    if optimize_sorgu.isdigit():
+        return []  # Kısa sayısal sorgu: kod prefix araması RPC'de kalır
+    with olc("yerel_index"):
+        return index.ara(optimize_sorgu)
+
+
+def _yazim_duzelt(sorgu: str) -> str:
+    """Sözlük dışı kelimeleri ürün kelime dağarcığına göre düzelt.
+
+    Sadece sorgu yerel ürün index'inde aday bulamadığında kullanılır (bkz.
+    ara_urun_sorgu); index'te eşleşen sorgular olduğu gibi aranır.
+    """
+    from .yazim import get_yazim_index
+    try:
+        index = get_yazim_index()
+    except Exception:
+        log.exception("yazim index unavailable")
+        return sorgu
+    if index is None:
+        return sorgu
+    with olc("yazim"):
+        duzeltilmis = index.duzelt(sorgu)
+    if duzeltilmis != sorgu:
+        log.info("yazim düzeltme: %r → %r", sorgu, duzeltilmis)
+    return duzeltilmis
+
+
+def sorgu_hazirla(arama_text: str) -> str:
+    """Kullanıcı girdisini RPC'ye gidecek normalize sorguya çevir."""
+    # Başta ürün kodu varsa sadece onu kullan ("25006169 - ÜRÜN ADI" gibi)
+    arama_raw = arama_text.strip()
+    kod_prefix_match = re.match(r'^\s*(\d{5,})\s*(?:-|–)\s*', arama_raw)
+
+    if kod_prefix_match:
+        return kod_prefix_match.group(1)
+    if arama_raw.isdigit():
+        return arama_raw
+    # Öneri listesinden seçilen ürün adını koda çevir (reverse lookup)
+    resolved_kod = _oneri_ad_to_kod(arama_raw)
+    if resolved_kod:
+        return resolved_kod
+    with olc("normalize"):
+        return temizle_ve_kok_bul(arama_raw)
+
+
+def _process_results(ozet: pd.DataFrame, query: str) -> pd.DataFrame:
+    """Ürün özetini filtrele, skorla ve sırala (bkz. arama/urun_ozet.py)."""
+    # TV Filtresi (sadece bağımsız kelime olarak "tv" veya "televizyon" varsa)
+    query_words_set = set(query.lower().split())
+    if query_words_set.intersection({'tv', 'televizyon'}):
+        ozet = ozet[~ozet['urun_ad'].str.contains(RE_TV_NEGATIF, na=False, regex=True)]
+
+    # Alaka + stok sırası; kısa sorgularda alakasızlar düşer
+    with olc("skor"):
+        return ozet_sirala(ozet, query)
+
+
+def rpc_hatasi_mi_timeout(err) -> bool:
+    msg = str(err)
+    return "timeout" in msg.lower() or "57014" in msg
+
+
+def arama_rpc(client, fn: str, params: dict):
+    """Arama RPC'si — aynı parametreli eşzamanlı çağrılar tek istekte birleşir.
+
+    Veritabanına giden (lider) çağrı RpcKoruma'dan geçer; reddedilirse KorumaAcik.
+    """
+    key = (fn,) + tuple(
+        (k, tuple(v) if isinstance(v, list) else v) for k, v in sorted(params.items())
+    )
+    with olc(f"rpc:{fn}"):
+        try:
+            return get_rpc_group().do(
+                key, lambda: _koruma.cagir(lambda: client.rpc(fn, params).execute().data)
+            )
+        except KorumaAcik as e:
+            metrikler.say("koruma", e.neden)
+            raise
+        except Exception as e:
+            if rpc_hatasi_mi_timeout(e):
+                metrikler.say("timeout", fn)
+            raise
+
+
+# Özet RPC'si → aynı parametreyle mağaza satırı döndüren eski RPC
+_SATIR_RPC = {'urun_kodlari_ozet': 'urun_kodlari_stok', 'hizli_urun_ara_ozet': 'hizli_urun_ara'}
+_ozet_rpc_yok: set = set()
+
+
+def rpc_bulunamadi_mi(err) -> bool:
+    msg = str(err)
+    return "PGRST202" in msg or "could not find the function" in msg.lower()
+
+
+# Kurulu olmayan RPC (eski şema) veritabanı yükü değildir; devreyi açmaz
+_koruma = RpcKoruma(hata_sayilir=lambda e: not rpc_bulunamadi_mi(e))
+
+
+def get_rpc_koruma() -> RpcKoruma:
+    return _koruma
+
+
+def _koruma_hatasi(e: KorumaAcik) -> str:
+    """Devre açık → "koruma" (kısıtlı mod); sınır dolu → "mesgul" (tekrar dene)."""
+    return "koruma" if e.neden == "devre" else "mesgul"
+
+
+def _ozet_rpc(client, fn: str, params: dict, query: str) -> pd.DataFrame:
+    """1. aşama: ürün başına özet satırları.
+
+    Özet RPC'si veritabanında yoksa (eski şema) satır RPC'si çağrılır ve özet
+    yerelde üretilir; çekilmiş mağaza satırları mağaza cache'ine konur.
+    """
+    if fn not in _ozet_rpc_yok:
+        try:
+            return ozet_df(arama_rpc(client, fn, params))
+        except Exception as e:
+            if not rpc_bulunamadi_mi(e):
+                raise
+            log.warning("%s RPC missing, using %s rows: %s", fn, _SATIR_RPC[fn], e)
+            _ozet_rpc_yok.add(fn)
+
+    data = arama_rpc(client, _SATIR_RPC[fn], params)
+    if not data:
+        return ozet_df([])
+    _payload_kaydet(data, query)
+    satirlar = pd.DataFrame(data)
+    satirlar.columns = [col.replace('out_', '') for col in satirlar.columns]
+    magaza_cache = get_magaza_cache()
+    for kod, grup in satirlar.groupby(satirlar['urun_kod'].astype(str), sort=False):
+        magaza_cache.put(kod, magaza_df(grup))
+    return satirlardan_ozet(satirlar)
+
+
+# urun_kodlari_ozet'e tek çağrıda gönderilecek en fazla kod. Geniş sorgularda
+# (ör. "mama") aday kümesinin tamamı parça parça gider; her parça stok_gunluk
+# üzerinde index'li bir urun_kod = ANY(...) okumasıdır, metin araması yapılmaz.
+KOD_PARCASI = 500
+
+
+def _kod_ozeti(client, kodlar: list, query: str) -> pd.DataFrame:
+    """Aday kodların ürün özeti (KOD_PARCASI'lık RPC'lerle, sırayla)."""
+    parcalar = [
+        _ozet_rpc(client, 'urun_kodlari_ozet', {'p_urun_kodlari': kodlar[i:i + KOD_PARCASI]}, query)
+        for i in range(0, len(kodlar), KOD_PARCASI)
+    ]
+    parcalar = [p for p in parcalar if not p.empty]
+    if len(parcalar) <= 1:
+        return parcalar[0] if parcalar else ozet_df([])
+    return pd.concat(parcalar, ignore_index=True)
+
+
+UYARI_KOD_YOK = "Bu ürün kodu bulunamadı. Kodu kontrol edip tekrar deneyin."
+UYARI_DUZELTME = "Yazım düzeltildi: \"{duzeltilmis}\" için sonuçlar gösteriliyor."
+UYARI_SONUC_YOK = "Aradığınız kriterlerde sonuç bulunamadı veya veri tabanı meşgul. Lütfen daha kısa/farklı kelimeler deneyin."
+
+
+def ara_urun_sorgu(client, optimize_sorgu: str) -> tuple:
+    """Arama çekirdeği (Streamlit çağrısı yapmaz).
+
+    İki aşamalı aramanın 1. aşaması: df ürün başına tek satırdır (bkz.
+    arama/urun_ozet.py); mağaza satırları kart açılınca magaza_satirlari ile gelir.
+
+    Yazım düzeltme ilk RPC'den önce yapılır: sorgu yerel index'te aday
+    bulamazsa yazım düzeltilmiş hali önce, yazıldığı hali sonra aranır
+    (ikisi de tek RPC); fallback kaskadı sadece bir kez, ilk terim için çalışır.
+
+    Returns:
+        (df, uyari, hata) — uyari kullanıcıya gösterilecek metin ya da "";
+        hata None | "timeout" | "servis" | "koruma" | "mesgul". Hata varsa
+        sonuç cache'lenmez.
+    """
+    hata = None
+
+    # --- Query Router: Kod mu, metin mi? ---
+    is_kod_araması = optimize_sorgu.isdigit() and len(optimize_sorgu) >= 7
+
+    # Yerel index'te aday varsa sorgu olduğu gibi aranır (sözlük dışı ama doğru
+    # yazılmış kelimeler düzeltilmez); yoksa düzeltilmiş hali önce denenir
+    aday_kodlar = _yerel_aday_kodlar(optimize_sorgu, is_kod_araması)
+    terimler = [optimize_sorgu]
+    if not aday_kodlar and not optimize_sorgu.isdigit():
+        duzeltilmis = _yazim_duzelt(optimize_sorgu)
+        if duzeltilmis != optimize_sorgu:
+            terimler = [duzeltilmis, optimize_sorgu]
+            aday_kodlar = _yerel_aday_kodlar(duzeltilmis, False)
+    sorgu = terimler[0]
+
+    def _sonuc(df, terim):
+        if terim == optimize_sorgu:
+            return df, "", None
+        metrikler.say("yazim", "düzeltme")
+        return df, UYARI_DUZELTME.format(duzeltilmis=terim), None
+
+    # Yerel index → sadece aday kodların ürün özetini çek
+    # (metin araması DB'ye gitmez; RPC yoksa/boşsa hizli_urun_ara_ozet'e düşer)
+    if aday_kodlar:
+        try:
+            ozet = _kod_ozeti(client, aday_kodlar, sorgu)
+            if not ozet.empty:
+                df = _process_results(ozet, sorgu)
+                if is_kod_araması and not df.empty:
+                    exact = df[df['urun_kod'].astype(str) == optimize_sorgu]
+                    if not exact.empty:
+                        metrikler.say("fallback_derinlik", "yerel index")
+                        return exact, "", None
+                if not df.empty:
+                    metrikler.say("fallback_derinlik", "yerel index")
+                    return _sonuc(df, sorgu)
+        except KorumaAcik as e:
+            return pd.DataFrame(), "", _koruma_hatasi(e)
+        except Exception as e:
+            log.warning("urun_kodlari_ozet failed, falling back to hizli_urun_ara_ozet: %s", e)
+
+    # RPC Çağrısı (Zaman aşımı kontrolü ile)
+    try:
+        for terim in terimler:
+            ozet = _ozet_rpc(client, 'hizli_urun_ara_ozet', {'arama_terimi': terim}, terim)
+            if ozet.empty:
+                continue
+            df = _process_results(ozet, terim)
+
+            metrikler.say("fallback_derinlik", "hizli_urun_ara")
+            # Kod araması: exact varsa SADECE exact dön
+            if is_kod_araması and not df.empty:
+                exact = df[df['urun_kod'].astype(str) == optimize_sorgu]
+                if not exact.empty:
+                    return exact, "", None
+
+            return _sonuc(df, terim)
+    except KorumaAcik as e:
+        return pd.DataFrame(), "", _koruma_hatasi(e)
+    except Exception as e:
+        if rpc_hatasi_mi_timeout(e):
+            hata = "timeout"
+        else:
+            log.exception("ara_urun RPC call failed")
+            hata = "servis"
+
+    # Kod aramasında fallback yapma - kod ya var ya yok
+    if is_kod_araması:
+        metrikler.say("fallback_derinlik", "sonuç yok")
+        return pd.DataFrame(), UYARI_KOD_YOK, hata
+
+    # ---- FALLBACK SEARCH (Google-like) ----
+    # Varyantlar (kategori temizleme, kelime kelime, kapasite, ilk/en uzun
+    # kelime) sınırlı bir pool'da eşzamanlı denenir; öncelik sırası korunur.
+    fallback_hatalari = []
+
+    def _fallback_rpc(terim):
+        try:
+            ozet = _ozet_rpc(client, 'hizli_urun_ara_ozet', {'arama_terimi': terim}, terim)
+        except Exception as e:
+            fallback_hatalari.append(e)
+            raise
+        # ilk_sonuc satır listesi bekler (boş liste = sonuç yok)
+        return ozet.to_dict('records')
+
+    varyantlar = fallback_sorgulari(sorgu)
+    with olc("fallback"):
+        bulunan = ilk_sonuc(varyantlar, _fallback_rpc)
+    if bulunan:
+        metrikler.say("fallback_derinlik", f"varyant {varyantlar.index(bulunan[0]) + 1}")
+        return _process_results(pd.DataFrame(bulunan[1]), sorgu), "", hata
+    metrikler.say("fallback_derinlik", "sonuç yok")
+
+    # Timeout uyarısı (Eğer buraya kadar gelip sonuç yoksa ve timeout olmuşsa)
+    reddedilen = {_koruma_hatasi(e) for e in fallback_hatalari if isinstance(e, KorumaAcik)}
+    if reddedilen:
+        hata = "koruma" if "koruma" in reddedilen else "mesgul"
+    elif fallback_hatalari and hata is None:
+        hata = "timeout"
+    return pd.DataFrame(), UYARI_SONUC_YOK, hata
+
+
+def ara(client, arama_text: str) -> tuple:
+    """Tam arama: sorgu_hazirla → process genelindeki sonuç cache'i → ara_urun_sorgu.
+
+    Returns:
+        ara_urun_sorgu ile aynı (df, uyari, hata); cache'ten dönen sonuçta hata
+        None'dır. Hatalı sonuç cache'lenmez. hata "koruma" ise df kisitli_sonuc'tur;
+        "mesgul" ise df boştur (kullanıcı kısa süre sonra tekrar dener).
+    """
+    optimize_sorgu = sorgu_hazirla(arama_text)
+
+    cache = get_sonuc_cache()
+    cached = cache.get(optimize_sorgu)
+    if cached is not None:
+        metrikler.say("sonuc_cache", "isabet")
+        df, uyari = cached
+        return df, uyari, None
+
+    metrikler.say("sonuc_cache", "ıska")
+    df, uyari, hata = ara_urun_sorgu(client, optimize_sorgu)
+    if hata == "koruma":
+        return kisitli_sonuc(optimize_sorgu)
+    if hata is None:
+        cache.put(optimize_sorgu, df, uyari)
+    return df, uyari, hata
+
+
+def kisitli_sonuc(optimize_sorgu: str) -> tuple:
+    """Devre açıkken: bayat cache sonucu, yoksa yerel index'ten stok bilgisiz ürünler.
+
+    Yerel sonuçta stoklu_magaza NaN'dır (stok bilinmiyor; bkz. gruplama.sonucu_grupla).
+    """
+    bayat = get_sonuc_cache().bayat_getir(optimize_sorgu)
+    if bayat is not None:
+        metrikler.say("kisitli", "bayat cache")
+        df, uyari, _ = bayat
+        return df, uyari, "koruma"
+
+    from .urun_index import get_urun_index
+    is_kod_araması = optimize_sorgu.isdigit() and len(optimize_sorgu) >= 7
+    kodlar = _yerel_aday_kodlar(optimize_sorgu, is_kod_araması)
+    index = get_urun_index() if kodlar else None
+    if index is None:
+        metrikler.say("kisitli", "sonuç yok")
+        return pd.DataFrame(), UYARI_SONUC_YOK, "koruma"
+
+    metrikler.say("kisitli", "yerel index")
+    ozet = pd.DataFrame(index.urun_bilgisi(kodlar), columns=['urun_kod', 'urun_ad', 'birim_fiyat'])
+    ozet = ozet.assign(stoklu_magaza=float('nan'), toplam_stok=0, max_stok=0)[OZET_KOLONLARI]
+    return _process_results(ozet, optimize_sorgu), "", "koruma"
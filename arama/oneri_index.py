@@ -0,0 +1,224 @@
+"""Sunucu tarafı autocomplete index'i (oneri_listesi.json üzerinden).
+
+Eskiden tüm oneri_listesi.json (~866 KB "kod - ad - fiyat" metni) her
+session'da tarayıcıya gömülüp JS ile taranıyordu. Artık liste process
+başına bir kez okunur ve iki sıralı anahtar dizisi kurulur:
+  - kelime başı anahtarları: normalize adın her kelimesinden sona kadar
+    olan kısım ("kedi mama 1 kg" → "kedi mama 1 kg", "mama 1 kg", "1 kg", "kg")
+  - ürün kodları
+Her tuşta sadece bisect ile prefix aralığı okunur; ilk MAX_ONERI sonuç
+tarayıcıya gönderilir. "Ad içinde"/"kod içinde" eşleşmeleri için adların ve
+kodların trigram posting'leri tutulur: sorgunun trigram'larını içeren
+adaylar kesişimle bulunur, tüm liste taranmaz.
+
+Sıralama tarayıcıdaki eski skorla aynı katmanları izler (tam eşleşme > ad
+başı > kelime başı > ad içinde > kod başı > kod içinde); aynı katmanda
+pipeline'ın `frekans` sırası (listedeki konum) belirler.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+from utils_text import normalize_tr_search
+
+from .artifact import VersiyonluNesne, _mtime, artifact_anahtari, kaydet
+
+log = logging.getLogger(__name__)
+
+ONERI_JSON = Path("data/oneri_listesi.json")
+
+MAX_ONERI = 12
+MAX_SORGU = 64
+MIN_SORGU = 2
+# Prefix aralığı bundan azsa "ad içinde" taramasına da bakılır
+_INFIX_ESIK = MAX_ONERI
+
+_TAM, _AD_BASI, _KELIME_BASI, _AD_ICINDE, _KOD_BASI, _KOD_ICINDE = range(6)
+
+
+def _trigramlar(s: str) -> set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _trigram_index(metinler: list[str]) -> dict[str, frozenset[int]]:
+    postings: dict[str, set[int]] = defaultdict(set)
+    for i, metin in enumerate(metinler):
+        for g in _trigramlar(metin):
+            postings[g].add(i)
+    return {g: frozenset(ids) for g, ids in postings.items()}
+
+
+def _parcala(raw: str) -> tuple[str, str, str]:
+    """"kod - ad - fiyat" → (kod, ad, fiyat); JS'teki split(' - ') ile aynı."""
+    parts = raw.split(' - ')
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip(), parts[2].strip() if len(parts) >= 3 else ''
+    return '', raw.strip(), ''
+
+
+class OneriIndex:
+    """Öneri metinleri üzerinde prefix/infix tamamlama index'i."""
+
+    def __init__(self, oneriler: list[str]):
+        self.raw: list[str] = []
+        self.ad_norm: list[str] = []
+        self._kod: list[str] = []
+        self._ad_kod: dict[str, str] = {}
+        kelime_anahtar: list[tuple[str, int]] = []
+        kod_anahtar: list[tuple[str, int]] = []
+
+        for raw in oneriler:
+            if not isinstance(raw, str) or not raw.strip():
+                continue
+            kod, ad, _ = _parcala(raw)
+            i = len(self.raw)
+            n = normalize_tr_search(ad)
+            self.raw.append(raw)
+            self.ad_norm.append(n)
+            self._kod.append(kod)
+            if kod.isdigit() and ad:
+                self._ad_kod.setdefault(ad.lower(), kod)
+            kelimeler = n.split(' ')
+            for j in range(len(kelimeler)):
+                kelime_anahtar.append((' '.join(kelimeler[j:]), i))
+            if kod:
+                kod_anahtar.append((kod.lower(), i))
+
+        kelime_anahtar.sort()
+        kod_anahtar.sort()
+        self._kelime_keys = [k for k, _ in kelime_anahtar]
+        self._kelime_ids = [i for _, i in kelime_anahtar]
+        self._kod_keys = [k for k, _ in kod_anahtar]
+        self._kod_ids = [i for _, i in kod_anahtar]
+        self._ad_tri = _trigram_index(self.ad_norm)
+        self._kod_tri = _trigram_index([kod.lower() for kod in self._kod])
+
+        self._lock = threading.Lock()
+        self._sureler: deque = deque(maxlen=1000)
+        self.lookups = 0
+
+    @classmethod
+    def from_json(cls, path: Path = ONERI_JSON) -> "OneriIndex":
+        with path.open(encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data if isinstance(data, list) else [])
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    @staticmethod
+    def _aralik(keys: list[str], ids: list[int], q: str):
+        lo = bisect.bisect_left(keys, q)
+        hi = bisect.bisect_left(keys, q + '\uffff')
+        return ids[lo:hi]
+
+    @staticmethod
+    def _infix_adaylar(tri: dict[str, frozenset[int]], q: str) -> list[int]:
+        """q'nun tüm trigram'larını içeren id'ler (artan sırada; q in metin ayrıca kontrol edilir)."""
+        gramlar = _trigramlar(q)
+        if not gramlar:
+            return []
+        postings = sorted((tri.get(g, frozenset()) for g in gramlar), key=len)
+        adaylar = set(postings[0])
+        for ids in postings[1:]:
+            adaylar &= ids
+            if not adaylar:
+                return []
+        return sorted(adaylar)
+
+    def ad_to_kod(self, ad: str) -> str:
+        """Dropdown'dan seçilen ürün adını koda çevir; yoksa boş string."""
+        return self._ad_kod.get(ad.strip().lower(), '')
+
+    def tamamla(self, sorgu: str, k: int = MAX_ONERI) -> list[str]:
+        """Sorgu için en iyi k öneri (ham "kod - ad - fiyat" metinleri)."""
+        t0 = time.perf_counter()
+        try:
+            return self._tamamla(sorgu, min(k, MAX_ONERI))
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                self.lookups += 1
+                self._sureler.append(ms)
+
+    def _tamamla(self, sorgu: str, k: int) -> list[str]:
+        q = normalize_tr_search((sorgu or '')[:MAX_SORGU])
+        if len(q) < MIN_SORGU:
+            return []
+        kisa = len(q) <= 2
+
+        katman: dict[int, int] = {}
+
+        def _ekle(i: int, kat: int):
+            if kat < katman.get(i, 99):
+                katman[i] = kat
+
+        for i in self._aralik(self._kelime_keys, self._kelime_ids, q):
+            n = self.ad_norm[i]
+            if n == q:
+                _ekle(i, _TAM)
+            elif n.startswith(q):
+                _ekle(i, _AD_BASI)
+            else:
+                _ekle(i, _KELIME_BASI)
+
+        # İç eşleşmeler: aynı katmanda küçük id önce, k tanesi yeter
+        if not kisa and len(katman) < _INFIX_ESIK:
+            bulunan = 0
+            for i in self._infix_adaylar(self._ad_tri, q):
+                if i not in katman and q in self.ad_norm[i]:
+                    _ekle(i, _AD_ICINDE)
+                    bulunan += 1
+                    if bulunan >= k:
+                        break
+
+        kod_q = q.replace(' ', '')
+        for i in self._aralik(self._kod_keys, self._kod_ids, kod_q):
+            _ekle(i, _KOD_BASI)
+        if not kisa and kod_q.isdigit() and len(katman) < _INFIX_ESIK:
+            bulunan = 0
+            for i in self._infix_adaylar(self._kod_tri, kod_q):
+                if i not in katman and kod_q in self._kod[i]:
+                    _ekle(i, _KOD_ICINDE)
+                    bulunan += 1
+                    if bulunan >= k:
+                        break
+
+        # Aynı katmanda liste sırası = pipeline frekans sırası
+        secilen = sorted(katman, key=lambda i: (katman[i], i))[:k]
+        return [self.raw[i] for i in secilen]
+
+    def stats(self) -> dict:
+        with self._lock:
+            sureler = sorted(self._sureler)
+            lookups = self.lookups
+        if not sureler:
+            return {"lookups": lookups, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "lookups": lookups,
+            "avg_ms": sum(sureler) / len(sureler),
+            "p95_ms": sureler[min(len(sureler) - 1, int(len(sureler) * 0.95))],
+            "max_ms": sureler[-1],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Process-wide singleton (tüm Streamlit session'ları paylaşır)
+# ---------------------------------------------------------------------------
+
+_oneri = kaydet(VersiyonluNesne("oneri_index", lambda key: OneriIndex.from_json(Path(key[0]))))
+
+
+def get_oneri_index(path: Path | None = None) -> OneriIndex | None:
+    """Güncel index; artifact değiştiyse yenisi arka planda kurulur (eskisi döner)."""
+    if path is None:
+        return _oneri.get(artifact_anahtari(ONERI_JSON.name))
+    mtime = _mtime(path)
+    return _oneri.get((str(path), mtime) if mtime is not None else None)
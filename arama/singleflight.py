@@ -0,0 +1,83 @@
+"""Single-flight: aynı anahtarlı eşzamanlı çağrıları tek uçuşta birleştirir.
+
+Mağaza açılışında aynı kampanya ürünü (çoğu zaman aynı afiş hotspot'u)
+aynı saniye içinde onlarca kez aranır. İlk gelen çağrı ("lider") RPC'yi
+yapar; o sürerken aynı anahtarla gelenler ("takipçi") bekler ve liderin
+sonucunu — ya da fırlattığı hatayı — paylaşır. Uçuş bitince anahtar
+serbest kalır; bu bir cache değildir (bkz. arama/cache.py).
+
+Paylaşılan sonuç nesnesi tüm çağıranlara aynen döner — yerinde değiştirmeyin.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Ucus:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Thread-safe single-flight grubu; birleştirilen çağrıları sayar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ucuslar: dict[Hashable, _Ucus] = {}
+        self.calls = 0
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn()'i key için en fazla bir kez uçuşta çalıştır, sonucu paylaş."""
+        with self._lock:
+            self.calls += 1
+            ucus = self._ucuslar.get(key)
+            if ucus is not None:
+                self.collapsed += 1
+                lider = False
+            else:
+                ucus = _Ucus()
+                self._ucuslar[key] = ucus
+                self.executed += 1
+                lider = True
+
+        if not lider:
+            ucus.done.wait()
+            if ucus.error is not None:
+                raise ucus.error
+            return ucus.result
+
+        try:
+            ucus.result = fn()
+        except BaseException as e:
+            ucus.error = e
+            raise
+        finally:
+            with self._lock:
+                self._ucuslar.pop(key, None)
+            ucus.done.set()
+        return ucus.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "inflight": len(self._ucuslar),
+                "collapse_rate": (self.collapsed / self.calls) if self.calls else 0.0,
+            }
+
+
+_rpc_group = SingleFlight()
+
+
+def get_rpc_group() -> SingleFlight:
+    return _rpc_group
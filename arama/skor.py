@@ -0,0 +1,105 @@
+"""Alaka skoru (relevance) — ara_urun sonuç satırlarını sıralamak için.
+
+Skor bileşenleri:
+  kod eşleşme (sadece sayısal sorgu)  → exact +1000, prefix +600, içinde +200
+  sorgu ürün adında geçiyor           → +100
+  ortak kelime başına                 → +10
+  stokta (stok_adet > 0)              → +5
+
+`alaka_skoru` skorun metin/kod kısmını her farklı (urun_kod, urun_ad) için
+bir kez, pandas string operasyonlarıyla hesaplar ve mağaza satırlarına
+yayar; stok bonusu satır bazında eklenir. `calculate_relevance` eski
+satır-satır implementasyondur — parity testi ve benchmark için tutulur.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def calculate_relevance(row, query: str, query_words: set) -> int:
+    """Tek satır için alaka skoru (eski df.apply yolu)."""
+    score = 0
+    urun_ad = str(row.get('urun_ad', '')).lower()
+    urun_kod = str(row.get('urun_kod', ''))
+
+    # Kod eşleşme (en yüksek öncelik)
+    if query.isdigit():
+        if urun_kod == query:
+            score += 1000
+        elif urun_kod.startswith(query):
+            score += 600
+        elif len(query) >= 6 and query in urun_kod:
+            score += 200
+
+    # Tam eşleşme (metin)
+    if query.lower() in urun_ad:
+        score += 100
+
+    # Kelime bazlı eşleşme
+    urun_words = set(urun_ad.split())
+    common_words = query_words.intersection(urun_words)
+    score += len(common_words) * 10
+
+    # Stok puanı (Bonus)
+    stok = row.get('stok_adet', 0)
+    if stok > 0:
+        score += 5
+
+    return score
+
+
+def _kolon(df: pd.DataFrame, name: str, default) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def alaka_skoru(df: pd.DataFrame, query: str) -> pd.Series:
+    """df satırları için alaka skoru (calculate_relevance ile birebir aynı)."""
+    if df.empty:
+        return pd.Series(0, index=df.index, dtype='int64')
+
+    kod_col = _kolon(df, 'urun_kod', '')
+    ad_col = _kolon(df, 'urun_ad', '')
+
+    # Her farklı ürün (kod + ad) bir kez skorlanır
+    keys = pd.DataFrame({'k': kod_col.to_numpy(), 'a': ad_col.to_numpy()})
+    grup_id = keys.groupby(['k', 'a'], sort=False, dropna=False).ngroup().to_numpy()
+    urunler = keys.drop_duplicates().reset_index(drop=True)
+
+    # object dtype: str/lower/split Python semantiğiyle birebir kalsın
+    # (Arrow string dtype'ı "İ".lower() sonucunu farklı üretir)
+    kod = pd.Series([str(k) for k in urunler['k']], dtype=object)
+    ad = pd.Series([str(a).lower() for a in urunler['a']], dtype=object)
+
+    skor = np.zeros(len(urunler), dtype='int64')
+
+    if query.isdigit():
+        exact = (kod == query).to_numpy()
+        prefix = kod.str.startswith(query).to_numpy()
+        icinde = kod.str.contains(query, regex=False).to_numpy() if len(query) >= 6 else np.zeros(len(kod), bool)
+        skor += np.select([exact, prefix, icinde], [1000, 600, 200], default=0)
+
+    skor += np.where(ad.str.contains(query.lower(), regex=False).to_numpy(), 100, 0)
+
+    query_words = set(query.lower().split())
+    if query_words:
+        kelimeler = ad.str.split().explode()
+        kelimeler = kelimeler[kelimeler.isin(query_words)]
+        ortak = (
+            kelimeler.reset_index().drop_duplicates()
+            .groupby('index').size()
+            .reindex(range(len(urunler)), fill_value=0)
+            .to_numpy()
+        )
+        skor += ortak * 10
+
+    sonuc = skor[grup_id]
+
+    # Stok bonusu satır bazında (aynı ürün farklı mağazalarda farklı stok)
+    stok = pd.to_numeric(_kolon(df, 'stok_adet', 0), errors='coerce').fillna(0).to_numpy()
+    sonuc = sonuc + np.where(stok > 0, 5, 0)
+
+    return pd.Series(sonuc, index=df.index, dtype='int64')
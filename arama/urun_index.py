@@ -0,0 +1,178 @@
+"""In-process ürün index'i — normalize sorgudan aday urun_kod listesi üretir.
+
+urun_master.parquet (pipeline çıktısı) bir kez okunur ve iki yapı kurulur:
+  - token → posting list (urun_ad_normalized içindeki kelimeler)
+  - urun_kod → satır (exact kod araması)
+
+Ürün adı ve fiyatı da tutulur: arama RPC'leri devre kesici yüzünden
+reddedildiğinde (bkz. arama/koruma.py) `urun_bilgisi` stoksuz bir ürün
+listesi verir.
+
+Arama, sorgudaki her token için exact + prefix posting'lerini birleştirip
+kesişim alır. Böylece `hizli_urun_ara` RPC'sine metin araması gönderilmez;
+Supabase'e sadece bilinen urun_kod'lar için stok özeti sorulur. Aday kümesi
+kesilmez (geniş sorgularda da tamamı gider; parçalama arama/motor.py'de),
+alaka/stok sıralaması özet geldikten sonra yapılır.
+
+Index aktif artifact versiyonu değiştiğinde (bkz. arama/artifact.py) arka
+planda yeniden kurulur; kurulum sırasında aramalar eski index'ten devam eder.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from .artifact import VersiyonluNesne, _mtime, artifact_anahtari, kaydet
+
+log = logging.getLogger(__name__)
+
+MASTER_PARQUET = Path("data/urun_master.parquet")
+
+# Prefix genişletmesi için en kısa token ("t" → binlerce kelime olmasın)
+MIN_PREFIX = 2
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalize edilmiş metni index token'larına ayır ("1,5 lt" → 1, 5, lt)."""
+    return _TOKEN_RE.findall(text or "")
+
+
+class UrunIndex:
+    """urun_master satırları üzerinde token ve kod index'i."""
+
+    def __init__(self, kodlar: list[str], normalized: list[str],
+                 adlar: list[str] | None = None, fiyatlar: list[float] | None = None):
+        self.kodlar = kodlar
+        self._adlar = adlar
+        self._fiyatlar = fiyatlar
+
+        postings: dict[str, list[int]] = {}
+        for doc_id, text in enumerate(normalized):
+            for tok in set(tokenize(text)):
+                postings.setdefault(tok, []).append(doc_id)
+        self._postings = {tok: frozenset(ids) for tok, ids in postings.items()}
+        self._vocab = sorted(self._postings)
+
+        self._kod_index: dict[str, int] = {}
+        for doc_id, kod in enumerate(kodlar):
+            if kod and kod not in self._kod_index:
+                self._kod_index[kod] = doc_id
+
+        self._prefix_cache: dict[str, frozenset[int]] = {}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "UrunIndex":
+        kodlar = df["urun_kod"].fillna("").astype(str).str.strip().tolist()
+        normalized = df["urun_ad_normalized"].fillna("").astype(str).tolist()
+        adlar = df["urun_ad"].fillna("").astype(str).tolist() if "urun_ad" in df.columns else None
+        fiyatlar = pd.to_numeric(df["birim_fiyat"], errors="coerce").tolist() \
+            if "birim_fiyat" in df.columns else None
+        return cls(kodlar, normalized, adlar, fiyatlar)
+
+    @classmethod
+    def from_parquet(cls, path: Path = MASTER_PARQUET) -> "UrunIndex":
+        df = pd.read_parquet(path, columns=["urun_kod", "urun_ad", "birim_fiyat", "urun_ad_normalized"])
+        return cls.from_dataframe(df)
+
+    def __len__(self) -> int:
+        return len(self.kodlar)
+
+    @property
+    def vocab(self) -> list[str]:
+        return self._vocab
+
+    def kod_var_mi(self, kod: str) -> bool:
+        return kod in self._kod_index
+
+    def urun_bilgisi(self, kodlar: list[str]) -> list[dict]:
+        """Kodların master kaydı: {urun_kod, urun_ad, birim_fiyat} (bilinmeyen kod atlanır)."""
+        bilgi = []
+        for kod in kodlar:
+            doc_id = self._kod_index.get(kod)
+            if doc_id is None:
+                continue
+            bilgi.append({
+                "urun_kod": kod,
+                "urun_ad": self._adlar[doc_id] if self._adlar else kod,
+                "birim_fiyat": self._fiyatlar[doc_id] if self._fiyatlar else None,
+            })
+        return bilgi
+
+    def _prefix_docs(self, tok: str) -> frozenset[int]:
+        """tok ile başlayan tüm kelimelerin posting birleşimi (cache'li)."""
+        cached = self._prefix_cache.get(tok)
+        if cached is not None:
+            return cached
+        lo = bisect.bisect_left(self._vocab, tok)
+        hi = bisect.bisect_left(self._vocab, tok + "\uffff")
+        docs: set[int] = set()
+        for word in self._vocab[lo:hi]:
+            docs.update(self._postings[word])
+        result = frozenset(docs)
+        if len(self._prefix_cache) > 4096:
+            self._prefix_cache.clear()
+        self._prefix_cache[tok] = result
+        return result
+
+    def ara(self, sorgu: str) -> list[str]:
+        """Normalize sorgu için tüm aday urun_kod'ları (master sırasında).
+
+        Her sorgu token'ı ürün adında exact ya da prefix olarak bulunmalı.
+        Eşleşme yoksa boş liste döner (çağıran RPC aramasına düşer).
+        Sıralamayı ara_urun'un alaka skoru yapar.
+        """
+        tokens = tokenize(sorgu)
+        if not tokens:
+            return []
+
+        match_sets = []
+        for tok in dict.fromkeys(tokens):
+            exact = self._postings.get(tok, frozenset())
+            docs = self._prefix_docs(tok) if len(tok) >= MIN_PREFIX else exact
+            if not docs:
+                return []
+            match_sets.append(docs)
+
+        match_sets.sort(key=len)
+        adaylar = set(match_sets[0])
+        for docs in match_sets[1:]:
+            adaylar &= docs
+            if not adaylar:
+                return []
+
+        return [self.kodlar[i] for i in sorted(adaylar) if self.kodlar[i]]
+
+
+# ---------------------------------------------------------------------------
+# Process-wide singleton (tüm Streamlit session'ları paylaşır)
+# ---------------------------------------------------------------------------
+
+_index = kaydet(VersiyonluNesne("urun_index", lambda key: UrunIndex.from_parquet(Path(key[0]))))
+
+
+def _anahtar(path: Path | None) -> tuple | None:
+    if path is None:
+        return artifact_anahtari(MASTER_PARQUET.name)
+    mtime = _mtime(path)
+    return (str(path), mtime) if mtime is not None else None
+
+
+def reload_urun_index(path: Path | None = None) -> UrunIndex | None:
+    """Index'i aktif artifact'tan (ya da path'ten) senkron kur ve değiştir."""
+    return _index.reload(_anahtar(path))
+
+
+def get_urun_index(path: Path | None = None) -> UrunIndex | None:
+    """Güncel index'i döndür; artifact değiştiyse yenisi arka planda kurulur.
+
+    İlk çağrı index'i senkron kurar; sonraki versiyon değişimlerinde
+    yenisi hazır olana kadar eski index döner.
+    """
+    return _index.get(_anahtar(path))
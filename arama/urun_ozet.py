@@ -0,0 +1,95 @@
+"""İki aşamalı arama: önce ürün özeti, mağaza satırları ürün açılınca.
+
+goster_sonuclar en fazla 40 ürün gösterir ama `hizli_urun_ara` eşleşen her
+ürünün her mağaza satırını döndürüyordu; geniş sorgularda on binlerce satır
+DataFrame'e çevrilip skorlanıyordu. Artık:
+
+  1. aşama — `urun_kodlari_ozet` / `hizli_urun_ara_ozet` RPC'leri ürün başına
+     tek satır döndürür: ad, stoklu mağaza sayısı, toplam/en yüksek stok ve
+     fiyat. Skor ve sıralama bu özet üzerinde yapılır.
+  2. aşama — bir ürünün mağaza satırları sadece kartı açılınca
+     `urun_kodlari_stok([kod])` ile çekilir ve mağaza cache'inde tutulur.
+
+Özet RPC'leri kurulu olmayan veritabanlarında satır RPC'leri çağrılır ve
+`satirlardan_ozet` aynı özeti yerelde üretir.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from .skor import alaka_skoru
+
+OZET_KOLONLARI = ['urun_kod', 'urun_ad', 'stoklu_magaza', 'toplam_stok', 'max_stok', 'birim_fiyat']
+
+
+def _kolonlar(data) -> pd.DataFrame:
+    df = pd.DataFrame(data)
+    df.columns = [col.replace('out_', '') for col in df.columns]
+    return df
+
+
+def _stok(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(stok_adet=pd.to_numeric(df['stok_adet'], errors='coerce').fillna(0).astype('int64'))
+
+
+def ozet_df(data) -> pd.DataFrame:
+    """Özet RPC satırlarını (out_ prefix'li) tiplenmiş özet DataFrame'ine çevir."""
+    df = _kolonlar(data)
+    if df.empty:
+        return pd.DataFrame(columns=OZET_KOLONLARI)
+    for kolon in ('stoklu_magaza', 'toplam_stok', 'max_stok'):
+        df[kolon] = pd.to_numeric(df[kolon], errors='coerce').fillna(0).astype('int64')
+    df['birim_fiyat'] = pd.to_numeric(df['birim_fiyat'], errors='coerce')
+    df['urun_kod'] = df['urun_kod'].astype(str)
+    return df[OZET_KOLONLARI]
+
+
+def magaza_df(data) -> pd.DataFrame:
+    """Mağaza satırları: mağaza başına tek satır, sadece stokta olanlar, stok sırasında."""
+    df = _kolonlar(data)
+    if df.empty:
+        return df
+    df = _stok(df).sort_values('stok_adet', ascending=False, kind='stable')
+    df = df.drop_duplicates(subset=['magaza_kod', 'urun_kod'])
+    return df[df['stok_adet'] > 0].reset_index(drop=True)
+
+
+def satirlardan_ozet(df: pd.DataFrame) -> pd.DataFrame:
+    """Mağaza satırlarından (urun_kodlari_stok / hizli_urun_ara) özet RPC'siyle aynı özeti üret."""
+    if df.empty:
+        return pd.DataFrame(columns=OZET_KOLONLARI)
+    df = _stok(df).sort_values('stok_adet', ascending=False, kind='stable')
+    df = df.drop_duplicates(subset=['urun_kod', 'magaza_kod'])
+    df = df.assign(urun_kod=df['urun_kod'].astype(str))
+    stoklu = df[df['stok_adet'] > 0]
+
+    g = df.groupby('urun_kod', sort=False)
+    ozet = pd.DataFrame({'urun_ad': g['urun_ad'].first(), 'max_stok': g['stok_adet'].max()})
+    sg = stoklu.groupby('urun_kod', sort=False)
+    ozet['stoklu_magaza'] = sg.size().reindex(ozet.index, fill_value=0).astype('int64')
+    ozet['toplam_stok'] = sg['stok_adet'].sum().reindex(ozet.index, fill_value=0).astype('int64')
+    fiyat = pd.to_numeric(stoklu['birim_fiyat'], errors='coerce')
+    ozet['birim_fiyat'] = (
+        stoklu.assign(birim_fiyat=fiyat)[fiyat > 0]
+        .groupby('urun_kod', sort=False)['birim_fiyat'].first()
+        .reindex(ozet.index)
+    )
+    return ozet.reset_index()[OZET_KOLONLARI]
+
+
+def ozet_sirala(ozet: pd.DataFrame, query: str) -> pd.DataFrame:
+    """Ürün özetini skorla ve sırala — eski satır bazlı sıralamayla aynı ürün sırası.
+
+    Satır yolunda bir ürünün yeri en iyi satırıyla belirlenirdi: metin skoru
+    + (o satır stoktaysa) 5, eşitlikte o satırın stoku. Bu tam olarak
+    max_stok ile hesaplanan skordur.
+    """
+    if ozet.empty:
+        return ozet.assign(alaka=pd.Series(dtype='int64'))
+    ozet = ozet.assign(alaka=alaka_skoru(ozet.assign(stok_adet=ozet['max_stok']), query))
+    # Kısa sorgularda alakasızları (substring) temizle
+    if len(query) <= 2:
+        ozet = ozet[ozet['alaka'] > 0]
+    return ozet.sort_values(by=['alaka', 'max_stok'], ascending=[False, False], kind='stable') \
+        .reset_index(drop=True)
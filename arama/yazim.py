@@ -0,0 +1,204 @@
+"""Sözlük tabanlı yazım düzeltme (SymSpell tarzı simetrik silme index'i).
+
+Sözlük, urun_master'daki normalize ürün adlarının kelimeleridir; her kelimenin
+ağırlığı geçtiği ürünlerin mağaza sayısı toplamıdır (çok satılan/çok mağazada
+olan ürünün kelimesi adaylar arasında öne geçer). Pipeline sözlüğü
+data/yazim_sozluk.json olarak yazar; dosya yoksa urun_master.parquet'ten
+ürün sayısıyla kurulur.
+
+Index: her kelimenin (ilk PREFIX_LEN harfinin) MAX_EDIT'e kadar silme
+varyantı → kelime listesi. Sorgu kelimesinin silme varyantları aynı
+tabloda aranır, adaylar Damerau-Levenshtein (OSA) mesafesiyle süzülür.
+Seçim: en küçük mesafe, sonra en yüksek frekans.
+
+Düzeltilmeyenler: sözlükte olan, sözlükteki bir kelimenin prefix'i olan
+(yazılmakta olan kelime), rakam içeren ve MIN_UZUNLUK'tan kısa kelimeler.
+arama.motor.YAZIM_DUZELTME elle tanımlı istisnalar için önce uygulanır.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from .artifact import VersiyonluNesne, _mtime, artifact_anahtari, kaydet
+from .urun_index import MASTER_PARQUET, tokenize
+
+log = logging.getLogger(__name__)
+
+YAZIM_JSON = Path("data/yazim_sozluk.json")
+
+MAX_EDIT = 2
+PREFIX_LEN = 7
+MIN_UZUNLUK = 4
+# Bu uzunluğa kadar (dahil) tek harf hatası düzeltilir, üstünde iki harf
+TEK_HATA_MAX_UZUNLUK = 5
+
+
+def _sozluge_uygun(kelime: str) -> bool:
+    return len(kelime) >= 3 and kelime.isalpha()
+
+
+def yazim_frekanslari(normalized: pd.Series, agirlik: pd.Series | None = None) -> dict[str, int]:
+    """Normalize ürün adlarından kelime → frekans sözlüğü.
+
+    agirlik verilirse (ör. ürünün mağaza sayısı) her ürün o kadar sayılır;
+    yoksa her ürün 1. Bir kelime aynı adda iki kez geçse de bir sayılır.
+    """
+    sayac: Counter = Counter()
+    agirliklar = agirlik.tolist() if agirlik is not None else [1] * len(normalized)
+    for ad, w in zip(normalized.tolist(), agirliklar):
+        for kelime in set(tokenize(ad if isinstance(ad, str) else "")):
+            if _sozluge_uygun(kelime):
+                sayac[kelime] += int(w) if pd.notna(w) else 1
+    return dict(sorted(sayac.items(), key=lambda kv: (-kv[1], kv[0])))
+
+
+def yazim_sozlugu_kaydet(frekans: dict[str, int], path: Path = YAZIM_JSON):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as f:
+        json.dump(frekans, f, ensure_ascii=False)
+
+
+def _silmeler(kelime: str, max_edit: int) -> set[str]:
+    sonuc = {kelime}
+    sinir = {kelime}
+    for _ in range(max_edit):
+        yeni = set()
+        for k in sinir:
+            if len(k) <= 1:
+                continue
+            for i in range(len(k)):
+                yeni.add(k[:i] + k[i + 1:])
+        yeni -= sonuc
+        sonuc |= yeni
+        sinir = yeni
+    return sonuc
+
+
+def mesafe(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment mesafesi; limit aşılırsa limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    onceki2: list[int] | None = None
+    onceki = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        satir = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            maliyet = 0 if a[i - 1] == b[j - 1] else 1
+            satir[j] = min(onceki[j] + 1, satir[j - 1] + 1, onceki[j - 1] + maliyet)
+            if (onceki2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                satir[j] = min(satir[j], onceki2[j - 2] + 1)
+        # Transpozisyon iki satır geriye bakar; iki satır da sınırın üstündeyse çık
+        if min(satir) > limit and min(onceki) >= limit:
+            return limit + 1
+        onceki2, onceki = onceki, satir
+    return onceki[-1]
+
+
+class YazimIndex:
+    """Kelime frekans sözlüğü üzerinde simetrik silme index'i."""
+
+    def __init__(self, frekans: dict[str, int], max_edit: int = MAX_EDIT,
+                 prefix_len: int = PREFIX_LEN):
+        self.frekans = frekans
+        self.max_edit = max_edit
+        self.prefix_len = prefix_len
+        self._sirali = sorted(frekans)
+        self._index: dict[str, list[str]] = {}
+        for kelime in frekans:
+            for s in _silmeler(kelime[:prefix_len], max_edit):
+                self._index.setdefault(s, []).append(kelime)
+
+    @classmethod
+    def from_json(cls, path: Path = YAZIM_JSON) -> "YazimIndex":
+        with path.open(encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_parquet(cls, path: Path = MASTER_PARQUET) -> "YazimIndex":
+        df = pd.read_parquet(path, columns=['urun_ad_normalized'])
+        return cls(yazim_frekanslari(df['urun_ad_normalized']))
+
+    def __len__(self) -> int:
+        return len(self.frekans)
+
+    def _prefix_mi(self, kelime: str) -> bool:
+        i = bisect.bisect_left(self._sirali, kelime)
+        return i < len(self._sirali) and self._sirali[i].startswith(kelime)
+
+    def oner(self, kelime: str) -> str | None:
+        """Sözlük dışı kelime için en iyi düzeltme; yoksa None."""
+        limit = 1 if len(kelime) <= TEK_HATA_MAX_UZUNLUK else self.max_edit
+        en_iyi: tuple | None = None
+        gorulen: set[str] = set()
+        for s in _silmeler(kelime[:self.prefix_len], limit):
+            for aday in self._index.get(s, ()):
+                if aday in gorulen:
+                    continue
+                gorulen.add(aday)
+                d = mesafe(kelime, aday, limit)
+                if d > limit:
+                    continue
+                anahtar = (d, -self.frekans[aday], aday)
+                if en_iyi is None or anahtar < en_iyi:
+                    en_iyi = anahtar
+        return en_iyi[2] if en_iyi else None
+
+    def duzelt(self, sorgu: str) -> str:
+        """Normalize sorgudaki sözlük dışı kelimeleri düzelt."""
+        kelimeler = sorgu.split()
+        degisti = False
+        for i, k in enumerate(kelimeler):
+            if len(k) < MIN_UZUNLUK or not k.isalpha() or k in self.frekans or self._prefix_mi(k):
+                continue
+            oneri = self.oner(k)
+            if oneri:
+                kelimeler[i] = oneri
+                degisti = True
+        return ' '.join(kelimeler) if degisti else sorgu
+
+
+# ---------------------------------------------------------------------------
+# Process-wide singleton (tüm Streamlit session'ları paylaşır)
+# ---------------------------------------------------------------------------
+
+def _kur(anahtar: tuple) -> YazimIndex:
+    yol = Path(anahtar[0])
+    if yol.suffix == '.json':
+        return YazimIndex.from_json(yol)
+    return YazimIndex.from_parquet(yol)
+
+
+_yazim = kaydet(VersiyonluNesne("yazim", _kur))
+
+
+def _anahtar(json_path: Path | None, parquet_path: Path | None) -> tuple | None:
+    """Sözlük JSON'u; yoksa urun_master.parquet (ürün sayısıyla kurulur)."""
+    for yol, ad in ((json_path, YAZIM_JSON.name), (parquet_path, MASTER_PARQUET.name)):
+        if yol is None:
+            anahtar = artifact_anahtari(ad)
+        else:
+            mtime = _mtime(yol)
+            anahtar = (str(yol), mtime) if mtime is not None else None
+        if anahtar is not None:
+            return anahtar
+    return None
+
+
+def reload_yazim_index(json_path: Path | None = None,
+                       parquet_path: Path | None = None) -> YazimIndex | None:
+    """Index'i aktif artifact'tan senkron kur ve değiştir."""
+    return _yazim.reload(_anahtar(json_path, parquet_path))
+
+
+def get_yazim_index(json_path: Path | None = None,
+                    parquet_path: Path | None = None) -> YazimIndex | None:
+    """Güncel index; artifact değiştiyse yenisi arka planda kurulur (eskisi döner)."""
+    return _yazim.get(_anahtar(json_path, parquet_path))
@@ -0,0 +1,446 @@
+-- ============================================================================
+-- ÜRÜN ARAMA — yardımcı RPC'ler
+-- Supabase SQL Editor'de çalıştırın.
+-- ============================================================================
+
+
+-- 1. Aday ürün kodları için mağaza/stok satırları
+-- ara_urun metin aramasını in-process index ile (arama/urun_index.py)
+-- urun_kod listesine çevirir; bu RPC sadece o kodların satırlarını döndürür.
+-- Kolonlar hizli_urun_ara ile aynıdır (out_ prefix'i Python'da temizlenir).
+CREATE INDEX IF NOT EXISTS idx_stok_gunluk_urun_kod ON stok_gunluk(urun_kod);
+
+CREATE OR REPLACE FUNCTION urun_kodlari_stok(p_urun_kodlari TEXT[])
+RETURNS TABLE(
+    out_urun_kod    TEXT,
+    out_urun_ad     TEXT,
+    out_magaza_kod  TEXT,
+    out_magaza_ad   TEXT,
+    out_sm_kod      TEXT,
+    out_bs_kod      TEXT,
+    out_stok_adet   INTEGER,
+    out_birim_fiyat NUMERIC,
+    out_latitude    DOUBLE PRECISION,
+    out_longitude   DOUBLE PRECISION
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        sg.urun_kod::TEXT,
+        sg.urun_ad::TEXT,
+        sg.magaza_kod::TEXT,
+        sg.magaza_ad::TEXT,
+        sg.sm_kod::TEXT,
+        sg.bs_kod::TEXT,
+        COALESCE(sg.stok_adet, 0)::INTEGER,
+        sg.birim_fiyat::NUMERIC,
+        m.latitude,
+        m.longitude
+    FROM stok_gunluk sg
+    LEFT JOIN magazalar m ON m.magaza_kod = sg.magaza_kod
+    WHERE sg.urun_kod = ANY(p_urun_kodlari)
+    ORDER BY sg.urun_kod, sg.stok_adet DESC NULLS LAST;
+$$;
+
+
+-- 2. urun_master pipeline'ı için id aralığı özetleri (artımlı kurulum)
+-- id uzayı p_genislik'in katlarına hizalı aralıklara bölünür; her dolu aralık
+-- için satır sayısı, en büyük id ve içerik checksum'ı döner. Pipeline bunu
+-- data/urun_master_manifest.json ile karşılaştırıp sadece değişen aralıkları
+-- çeker (bkz. urun_master_pipeline.build_and_save_urun_master).
+CREATE OR REPLACE FUNCTION stok_aralik_ozet(p_genislik BIGINT)
+RETURNS TABLE(
+    out_lo       BIGINT,
+    out_satir    BIGINT,
+    out_max_id   BIGINT,
+    out_checksum TEXT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        (sg.id / p_genislik) * p_genislik AS lo,
+        COUNT(*)::BIGINT,
+        MAX(sg.id)::BIGINT,
+        md5(string_agg(
+            sg.id::TEXT || '|' || COALESCE(sg.urun_kod::TEXT, '') || '|' ||
+            COALESCE(sg.urun_ad::TEXT, '') || '|' || COALESCE(sg.birim_fiyat::TEXT, ''),
+            E'\n' ORDER BY sg.id
+        ))
+    FROM stok_gunluk sg
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+
+-- 3. İki aşamalı arama — 1. aşama: ürün başına özet
+-- ara_urun ilk çağrıda mağaza satırlarını değil, ürün başına tek satırı
+-- çeker (stoklu mağaza sayısı, toplam/en yüksek stok, en çok stoklu
+-- mağazanın fiyatı). Mağaza satırları kart açılınca urun_kodlari_stok(ARRAY[kod])
+-- ile gelir (bkz. arama/urun_ozet.py). Mağaza başına en yüksek stoklu satır sayılır.
+CREATE OR REPLACE FUNCTION urun_kodlari_ozet(p_urun_kodlari TEXT[])
+RETURNS TABLE(
+    out_urun_kod      TEXT,
+    out_urun_ad       TEXT,
+    out_stoklu_magaza INTEGER,
+    out_toplam_stok   BIGINT,
+    out_max_stok      INTEGER,
+    out_birim_fiyat   NUMERIC
+)
+LANGUAGE sql STABLE AS $$
+    WITH s AS (
+        SELECT DISTINCT ON (sg.urun_kod, sg.magaza_kod)
+            sg.urun_kod::TEXT             AS urun_kod,
+            sg.urun_ad::TEXT              AS urun_ad,
+            COALESCE(sg.stok_adet, 0)     AS stok_adet,
+            sg.birim_fiyat::NUMERIC       AS birim_fiyat
+        FROM stok_gunluk sg
+        WHERE sg.urun_kod = ANY(p_urun_kodlari)
+        ORDER BY sg.urun_kod, sg.magaza_kod, sg.stok_adet DESC NULLS LAST
+    )
+    SELECT
+        urun_kod,
+        (array_agg(urun_ad ORDER BY stok_adet DESC))[1],
+        (COUNT(*) FILTER (WHERE stok_adet > 0))::INTEGER,
+        COALESCE(SUM(stok_adet) FILTER (WHERE stok_adet > 0), 0)::BIGINT,
+        MAX(stok_adet)::INTEGER,
+        (array_agg(birim_fiyat ORDER BY stok_adet DESC)
+            FILTER (WHERE stok_adet > 0 AND birim_fiyat > 0))[1]
+    FROM s
+    GROUP BY urun_kod;
+$$;
+
+
+-- 4. hizli_urun_ara'nın ürün özeti (metin araması / fallback kaskadı)
+-- Eşleşme mantığı hizli_urun_ara'da kalır; sadece sonuç ürün başına toplanır.
+CREATE OR REPLACE FUNCTION hizli_urun_ara_ozet(arama_terimi TEXT)
+RETURNS TABLE(
+    out_urun_kod      TEXT,
+    out_urun_ad       TEXT,
+    out_stoklu_magaza INTEGER,
+    out_toplam_stok   BIGINT,
+    out_max_stok      INTEGER,
+    out_birim_fiyat   NUMERIC
+)
+LANGUAGE sql STABLE AS $$
+    WITH s AS (
+        SELECT DISTINCT ON (h.out_urun_kod, h.out_magaza_kod)
+            h.out_urun_kod::TEXT          AS urun_kod,
+            h.out_urun_ad::TEXT           AS urun_ad,
+            COALESCE(h.out_stok_adet, 0)  AS stok_adet,
+            h.out_birim_fiyat::NUMERIC    AS birim_fiyat
+        FROM hizli_urun_ara(arama_terimi) h
+        ORDER BY h.out_urun_kod, h.out_magaza_kod, h.out_stok_adet DESC NULLS LAST
+    )
+    SELECT
+        urun_kod,
+        (array_agg(urun_ad ORDER BY stok_adet DESC))[1],
+        (COUNT(*) FILTER (WHERE stok_adet > 0))::INTEGER,
+        COALESCE(SUM(stok_adet) FILTER (WHERE stok_adet > 0), 0)::BIGINT,
+        MAX(stok_adet)::INTEGER,
+        (array_agg(birim_fiyat ORDER BY stok_adet DESC)
+            FILTER (WHERE stok_adet > 0 AND birim_fiyat > 0))[1]
+    FROM s
+    GROUP BY urun_kod;
+$$;
+
+
+-- 5. Arama log'u — toplu artırma (write-behind kuyruk, bkz. arama/log_kuyrugu.py)
+-- Uygulama aramaları bellekte (tarih, terim) başına sayar ve birkaç saniyede
+-- bir tek çağrıyla yazar. ON CONFLICT için (tarih, arama_terimi) tekil olmalı;
+-- önce eski tekrarlı satırlar en küçük id'de birleştirilir.
+ALTER TABLE arama_log ADD COLUMN IF NOT EXISTS son_arama_zamani TIMESTAMPTZ;
+
+WITH tekrar AS (
+    SELECT
+        MIN(id)            AS kalan_id,
+        tarih,
+        arama_terimi,
+        SUM(arama_sayisi)  AS toplam
+    FROM arama_log
+    GROUP BY tarih, arama_terimi
+    HAVING COUNT(*) > 1
+), guncel AS (
+    UPDATE arama_log a SET arama_sayisi = t.toplam
+    FROM tekrar t
+    WHERE a.id = t.kalan_id
+    RETURNING a.id
+)
+DELETE FROM arama_log a
+USING tekrar t
+WHERE a.tarih = t.tarih AND a.arama_terimi = t.arama_terimi AND a.id <> t.kalan_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_arama_log_tarih_terim ON arama_log(tarih, arama_terimi);
+
+-- Analitik rollup'ları (bkz. 6. bölüm): arama_log_artir her toplu yazmada
+-- günlük ve saatlik sayaçları da artırır; admin analitik sekmesi arama_log'u
+-- taramadan bu küçük tablolardan okur.
+CREATE TABLE IF NOT EXISTS arama_gunluk (
+    tarih           DATE PRIMARY KEY,
+    arama_sayisi    BIGINT  NOT NULL DEFAULT 0,
+    terim_sayisi    INTEGER NOT NULL DEFAULT 0,   -- o gün ilk kez aranan terimler
+    sonucsuz_arama  BIGINT  NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS arama_saatlik (
+    tarih         DATE     NOT NULL,
+    saat          SMALLINT NOT NULL,
+    arama_sayisi  BIGINT   NOT NULL DEFAULT 0,
+    PRIMARY KEY (tarih, saat)
+);
+
+-- Terim rollup'u: sabit pencereler (son N gün, bugün dahil N+1 gün) için terim
+-- başına sayaçlar. Analitik ve popüler aramalar sadece bu tablodan okur;
+-- okuma maliyeti penceredeki terim sayısıyla sınırlı, log büyüdükçe artmaz.
+-- Pencereyi kaydırmak için arama_log'daki gün/terim satırları kullanılır:
+-- yeni bir gün geldiğinde pencereden düşen günün satırları çıkarılır.
+-- sonuclu_adet/sonucsuz_adet aramanın kendi sonucuna göre sayılır, böylece
+-- çıkarılan değer eklenenle birebir aynıdır.
+ALTER TABLE arama_log ADD COLUMN IF NOT EXISTS sonuclu_adet BIGINT;
+ALTER TABLE arama_log ADD COLUMN IF NOT EXISTS sonucsuz_adet BIGINT;
+UPDATE arama_log SET
+    sonuclu_adet  = CASE WHEN sonuc_sayisi > 0 THEN arama_sayisi ELSE 0 END,
+    sonucsuz_adet = CASE WHEN sonuc_sayisi > 0 THEN 0 ELSE arama_sayisi END
+WHERE sonuclu_adet IS NULL OR sonucsuz_adet IS NULL;
+ALTER TABLE arama_log ALTER COLUMN sonuclu_adet SET DEFAULT 0;
+ALTER TABLE arama_log ALTER COLUMN sonucsuz_adet SET DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS arama_pencere_durum (
+    pencere  SMALLINT PRIMARY KEY,   -- gün; pencere [bitis - pencere, bitis]
+    bitis    DATE     NOT NULL       -- yazılan en yeni log günü
+);
+
+CREATE TABLE IF NOT EXISTS arama_terim_pencere (
+    pencere           SMALLINT NOT NULL,
+    arama_terimi      TEXT     NOT NULL,
+    arama_sayisi      BIGINT   NOT NULL DEFAULT 0,
+    sonuclu_arama     BIGINT   NOT NULL DEFAULT 0,
+    sonucsuz_arama    BIGINT   NOT NULL DEFAULT 0,
+    son_sonuc_sayisi  INTEGER,
+    son_arama_zamani  TIMESTAMP,
+    PRIMARY KEY (pencere, arama_terimi)
+);
+CREATE INDEX IF NOT EXISTS idx_terim_pencere_hepsi    ON arama_terim_pencere(pencere, arama_sayisi DESC);
+CREATE INDEX IF NOT EXISTS idx_terim_pencere_sonuclu  ON arama_terim_pencere(pencere, sonuclu_arama DESC);
+CREATE INDEX IF NOT EXISTS idx_terim_pencere_sonucsuz ON arama_terim_pencere(pencere, sonucsuz_arama DESC);
+
+-- p_kayitlar: [{"tarih", "arama_terimi", "adet", "sonuc_sayisi", "son_arama_zamani"}, ...]
+-- son_arama_zamani uygulamanın yerel saatidir (saatlik kırılım bu saatle yapılır).
+-- Adımlar sırayla çalışır (pencere kaydırma, log'a eklemeden önce log'un eski
+-- halini görmeli); eşzamanlı flush'lar pencere satırlarının kilidinde sıraya girer.
+CREATE OR REPLACE FUNCTION arama_log_artir(p_kayitlar JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql VOLATILE AS $$
+DECLARE
+    v_son     DATE;
+    v_yazilan INTEGER;
+    r         RECORD;
+BEGIN
+    SELECT MAX((e->>'tarih')::DATE) INTO v_son FROM jsonb_array_elements(p_kayitlar) e;
+    IF v_son IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    -- 1. Pencereleri v_son'a kaydır: düşen günlerin terim sayaçlarını çıkar
+    PERFORM 1 FROM arama_pencere_durum FOR UPDATE;
+    FOR r IN SELECT pencere, bitis FROM arama_pencere_durum WHERE bitis < v_son LOOP
+        UPDATE arama_terim_pencere t SET
+            arama_sayisi   = t.arama_sayisi - d.arama_sayisi,
+            sonuclu_arama  = t.sonuclu_arama - d.sonuclu,
+            sonucsuz_arama = t.sonucsuz_arama - d.sonucsuz
+        FROM (
+            SELECT arama_terimi, SUM(arama_sayisi) AS arama_sayisi,
+                   SUM(sonuclu_adet) AS sonuclu, SUM(sonucsuz_adet) AS sonucsuz
+            FROM arama_log
+            WHERE tarih >= r.bitis - r.pencere AND tarih < v_son - r.pencere
+            GROUP BY arama_terimi
+        ) d
+        WHERE t.pencere = r.pencere AND t.arama_terimi = d.arama_terimi;
+        DELETE FROM arama_terim_pencere WHERE pencere = r.pencere AND arama_sayisi <= 0;
+        UPDATE arama_pencere_durum SET bitis = v_son WHERE pencere = r.pencere;
+    END LOOP;
+
+    -- 2. Gün/terim log'u + günlük ve saatlik rollup'lar
+    WITH k AS (
+        SELECT
+            (e->>'tarih')::DATE                   AS tarih,
+            e->>'arama_terimi'                    AS arama_terimi,
+            (e->>'adet')::INTEGER                 AS adet,
+            (e->>'sonuc_sayisi')::INTEGER         AS sonuc_sayisi,
+            (e->>'son_arama_zamani')::TIMESTAMP   AS zaman
+        FROM jsonb_array_elements(p_kayitlar) e
+    ), yazilan AS (
+        INSERT INTO arama_log (tarih, arama_terimi, arama_sayisi, sonuc_sayisi, son_arama_zamani,
+                               sonuclu_adet, sonucsuz_adet)
+        SELECT tarih, arama_terimi, adet, sonuc_sayisi, zaman,
+               CASE WHEN sonuc_sayisi > 0 THEN adet ELSE 0 END,
+               CASE WHEN sonuc_sayisi > 0 THEN 0 ELSE adet END
+        FROM k
+        ON CONFLICT (tarih, arama_terimi) DO UPDATE SET
+            arama_sayisi     = arama_log.arama_sayisi + EXCLUDED.arama_sayisi,
+            sonuc_sayisi     = EXCLUDED.sonuc_sayisi,
+            son_arama_zamani = GREATEST(arama_log.son_arama_zamani, EXCLUDED.son_arama_zamani),
+            sonuclu_adet     = COALESCE(arama_log.sonuclu_adet, 0) + EXCLUDED.sonuclu_adet,
+            sonucsuz_adet    = COALESCE(arama_log.sonucsuz_adet, 0) + EXCLUDED.sonucsuz_adet
+        RETURNING arama_log.tarih, (xmax = 0) AS yeni
+    ), yeni_terim AS (
+        SELECT tarih, COUNT(*) FILTER (WHERE yeni) AS adet FROM yazilan GROUP BY tarih
+    ), gunluk AS (
+        INSERT INTO arama_gunluk (tarih, arama_sayisi, terim_sayisi, sonucsuz_arama)
+        SELECT g.tarih, g.adet, COALESCE(y.adet, 0), g.sonucsuz
+        FROM (
+            SELECT tarih, SUM(adet) AS adet,
+                   COALESCE(SUM(adet) FILTER (WHERE sonuc_sayisi = 0), 0) AS sonucsuz
+            FROM k GROUP BY tarih
+        ) g
+        LEFT JOIN yeni_terim y USING (tarih)
+        ON CONFLICT (tarih) DO UPDATE SET
+            arama_sayisi   = arama_gunluk.arama_sayisi + EXCLUDED.arama_sayisi,
+            terim_sayisi   = arama_gunluk.terim_sayisi + EXCLUDED.terim_sayisi,
+            sonucsuz_arama = arama_gunluk.sonucsuz_arama + EXCLUDED.sonucsuz_arama
+        RETURNING 1
+    ), saatlik AS (
+        INSERT INTO arama_saatlik (tarih, saat, arama_sayisi)
+        SELECT tarih, EXTRACT(HOUR FROM zaman)::SMALLINT, SUM(adet)
+        FROM k GROUP BY 1, 2
+        ON CONFLICT (tarih, saat) DO UPDATE SET
+            arama_sayisi = arama_saatlik.arama_sayisi + EXCLUDED.arama_sayisi
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER INTO v_yazilan FROM yazilan;
+
+    -- 3. Pencere içindeki kayıtları terim rollup'una ekle
+    INSERT INTO arama_terim_pencere AS t (pencere, arama_terimi, arama_sayisi, sonuclu_arama,
+                                          sonucsuz_arama, son_sonuc_sayisi, son_arama_zamani)
+    SELECT p.pencere, k.arama_terimi, SUM(k.adet),
+           SUM(CASE WHEN k.sonuc_sayisi > 0 THEN k.adet ELSE 0 END),
+           SUM(CASE WHEN k.sonuc_sayisi > 0 THEN 0 ELSE k.adet END),
+           (array_agg(k.sonuc_sayisi ORDER BY k.zaman DESC))[1],
+           MAX(k.zaman)
+    FROM (
+        SELECT (e->>'tarih')::DATE AS tarih, e->>'arama_terimi' AS arama_terimi,
+               (e->>'adet')::INTEGER AS adet, (e->>'sonuc_sayisi')::INTEGER AS sonuc_sayisi,
+               (e->>'son_arama_zamani')::TIMESTAMP AS zaman
+        FROM jsonb_array_elements(p_kayitlar) e
+    ) k
+    JOIN arama_pencere_durum p ON k.tarih BETWEEN p.bitis - p.pencere AND p.bitis
+    GROUP BY p.pencere, k.arama_terimi
+    ON CONFLICT (pencere, arama_terimi) DO UPDATE SET
+        arama_sayisi     = t.arama_sayisi + EXCLUDED.arama_sayisi,
+        sonuclu_arama    = t.sonuclu_arama + EXCLUDED.sonuclu_arama,
+        sonucsuz_arama   = t.sonucsuz_arama + EXCLUDED.sonucsuz_arama,
+        son_sonuc_sayisi = CASE WHEN EXCLUDED.son_arama_zamani >= t.son_arama_zamani
+                                  OR t.son_arama_zamani IS NULL
+                                THEN EXCLUDED.son_sonuc_sayisi ELSE t.son_sonuc_sayisi END,
+        son_arama_zamani = GREATEST(t.son_arama_zamani, EXCLUDED.son_arama_zamani);
+
+    RETURN v_yazilan;
+END;
+$$;
+
+
+-- 6. Arama analitiği — okuma RPC'leri ve rollup backfill'i
+-- Admin analitik sekmesi ve popüler aramalar arama_log'u taramaz; sadece
+-- rollup tablolarından (gün, saat, terim penceresi) sonuç satırlarını alır.
+
+-- Rollup tabloları boşsa mevcut log'dan doldur (tekrar çalıştırmak güvenli)
+INSERT INTO arama_gunluk (tarih, arama_sayisi, terim_sayisi, sonucsuz_arama)
+SELECT tarih, SUM(arama_sayisi), COUNT(*),
+       COALESCE(SUM(arama_sayisi) FILTER (WHERE sonuc_sayisi = 0), 0)
+FROM arama_log
+GROUP BY tarih
+ON CONFLICT (tarih) DO NOTHING;
+
+INSERT INTO arama_saatlik (tarih, saat, arama_sayisi)
+SELECT tarih, EXTRACT(HOUR FROM son_arama_zamani)::SMALLINT, SUM(arama_sayisi)
+FROM arama_log
+WHERE son_arama_zamani IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (tarih, saat) DO NOTHING;
+
+-- Tutulan pencereler: popüler aramalar (3 gün) + analitik dönemleri (7/14/30).
+-- Yeni eklenen pencere mevcut log'dan bir kez doldurulur.
+DO $$
+DECLARE
+    v_pencere SMALLINT;
+    v_bitis   DATE := COALESCE((SELECT MAX(tarih) FROM arama_log), CURRENT_DATE);
+BEGIN
+    FOREACH v_pencere IN ARRAY ARRAY[3, 7, 14, 30]::SMALLINT[] LOOP
+        INSERT INTO arama_pencere_durum (pencere, bitis) VALUES (v_pencere, v_bitis)
+        ON CONFLICT (pencere) DO NOTHING;
+        IF FOUND THEN
+            INSERT INTO arama_terim_pencere (pencere, arama_terimi, arama_sayisi, sonuclu_arama,
+                                             sonucsuz_arama, son_sonuc_sayisi, son_arama_zamani)
+            SELECT v_pencere, arama_terimi, SUM(arama_sayisi), SUM(sonuclu_adet), SUM(sonucsuz_adet),
+                   (array_agg(sonuc_sayisi ORDER BY tarih DESC))[1], MAX(son_arama_zamani)
+            FROM arama_log
+            WHERE tarih BETWEEN v_bitis - v_pencere AND v_bitis
+            GROUP BY arama_terimi
+            ON CONFLICT (pencere, arama_terimi) DO NOTHING;
+        END IF;
+    END LOOP;
+END;
+$$;
+
+-- Eski imzalar (p_baslangic DATE) arama_log'u tarıyordu
+DROP FUNCTION IF EXISTS arama_top_terimler(DATE, INTEGER, TEXT);
+DROP FUNCTION IF EXISTS arama_donem_ozet(DATE);
+
+-- Pencerenin en çok aranan terimleri. p_pencere: arama_pencere_durum'daki
+-- pencerelerden biri (değilse boş döner). p_sonuc: 'hepsi' | 'sonuclu' |
+-- 'sonucsuz' — sonuç getirmiş / getirmemiş aramaların sayısına göre sıralar.
+CREATE OR REPLACE FUNCTION arama_top_terimler(
+    p_pencere INTEGER,
+    p_limit   INTEGER DEFAULT 20,
+    p_sonuc   TEXT    DEFAULT 'hepsi'
+)
+RETURNS TABLE(
+    out_arama_terimi TEXT,
+    out_arama_sayisi BIGINT,
+    out_sonuc_sayisi INTEGER
+)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    -- Her dal kendi index'inden (pencere, sayaç DESC) ilk p_limit satırı okur
+    IF p_sonuc = 'sonuclu' THEN
+        RETURN QUERY
+        SELECT t.arama_terimi, t.sonuclu_arama, t.son_sonuc_sayisi
+        FROM arama_terim_pencere t
+        WHERE t.pencere = p_pencere AND t.sonuclu_arama > 0
+        ORDER BY t.sonuclu_arama DESC, t.arama_terimi
+        LIMIT p_limit;
+    ELSIF p_sonuc = 'sonucsuz' THEN
+        RETURN QUERY
+        SELECT t.arama_terimi, t.sonucsuz_arama, t.son_sonuc_sayisi
+        FROM arama_terim_pencere t
+        WHERE t.pencere = p_pencere AND t.sonucsuz_arama > 0
+        ORDER BY t.sonucsuz_arama DESC, t.arama_terimi
+        LIMIT p_limit;
+    ELSE
+        RETURN QUERY
+        SELECT t.arama_terimi, t.arama_sayisi, t.son_sonuc_sayisi
+        FROM arama_terim_pencere t
+        WHERE t.pencere = p_pencere
+        ORDER BY t.arama_sayisi DESC, t.arama_terimi
+        LIMIT p_limit;
+    END IF;
+END;
+$$;
+
+-- Pencere özeti: toplam arama, farklı terim, sonuçsuz arama. Gün sınırı
+-- pencerenin kendi bitiş gününden hesaplanır (terim sayısıyla tutarlı).
+CREATE OR REPLACE FUNCTION arama_donem_ozet(p_pencere INTEGER)
+RETURNS TABLE(
+    out_arama_sayisi   BIGINT,
+    out_terim_sayisi   BIGINT,
+    out_sonucsuz_arama BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    WITH p AS (
+        SELECT COALESCE(
+            (SELECT bitis FROM arama_pencere_durum WHERE pencere = p_pencere),
+            CURRENT_DATE
+        ) - p_pencere AS baslangic
+    )
+    SELECT
+        (SELECT COALESCE(SUM(g.arama_sayisi), 0) FROM arama_gunluk g, p WHERE g.tarih >= p.baslangic)::BIGINT,
+        (SELECT COUNT(*) FROM arama_terim_pencere WHERE pencere = p_pencere)::BIGINT,
+        (SELECT COALESCE(SUM(g.sonucsuz_arama), 0) FROM arama_gunluk g, p WHERE g.tarih >= p.baslangic)::BIGINT;
+$$;
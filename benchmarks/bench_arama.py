@@ -0,0 +1,369 @@
+"""Uçtan uca arama benchmark'ı: gerçek arama_log sorguları, yerel sahte Supabase.
+
+Canlı Supabase'e yük testi yapılamadığı için arama_motoru.ara'nın tamamı
+(normalize, yazım düzeltme, yerel index, özet RPC'leri, fallback kaskadı,
+sonuç cache'i, skor) ve ardından sonucu_grupla, RPC'leri yerelde cevaplayan
+SahteSupabase'e karşı çalıştırılır.
+
+1. Snapshot al (SUPABASE_URL/SUPABASE_KEY gerekir; üretim sorguları içerir,
+   repoya girmez):
+
+       python benchmarks/bench_arama.py --disa-aktar [--gun 14]
+
+   benchmarks/arama_snapshot/ altına son N günün arama_log terimleri
+   (sorgular.json, terim + arama sayısı) ve aktif urun_master.parquet,
+   oneri_listesi.json, yazim_sozluk.json kopyalanır.
+
+2. Çalıştır (snapshot dizininde, sorgular arama sayısına göre ağırlıklı örneklenir):
+
+       python benchmarks/bench_arama.py [--sorgu 2000] [--eszamanli 8]
+           [--gecikme-ms 40] [--sapma-ms 15] [--timeout-orani 0.01]
+           [--timeout-ms 3000] [--eski-sema] [--json sonuc.json]
+           [--karsilastir onceki.json]
+
+   Snapshot yoksa data/ ve sentetik sorgular kullanılır.
+
+Sahte RPC'ler: hizli_urun_ara / hizli_urun_ara_ozet (tüm sorgu kelimeleri
+urun_ad_normalized içinde geçen ya da kodu sorguyla başlayan ürünler),
+urun_kodlari_stok / urun_kodlari_ozet. Her ürünün --magaza mağazadaki stoğu
+seed'li rastgele üretilir. Her çağrı gecikme + sapma kadar bekler; --timeout-orani
+olasılıkla --timeout-ms bekleyip PostgreSQL statement timeout (57014) fırlatır.
+--eski-sema özet RPC'lerini PGRST202 ile reddeder (satır RPC'si yolu).
+
+Rapor: throughput, sorgu gecikmesi p50/p95/p99, sonucu veren basamak
+(fallback derinliği) dağılımı, cache isabet oranı, timeout sayısı, RPC
+koruması (sınır, reddedilen, devre açılma; bkz. arama/koruma.py) ve aşama
+süreleri (arama/metrikler.py). --json ile kaydedilen sonuç sonraki çalıştırmada
+--karsilastir ile yan yana gösterilir.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+KOK = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(KOK))
+
+from arama import metrikler  # noqa: E402
+from arama import motor as arama_motoru  # noqa: E402
+from arama.artifact import artifact_yolu  # noqa: E402
+from arama.cache import get_sonuc_cache  # noqa: E402
+from arama.gruplama import sonucu_grupla  # noqa: E402
+from arama.oneri_index import get_oneri_index  # noqa: E402
+from arama.urun_index import get_urun_index  # noqa: E402
+from arama.yazim import get_yazim_index  # noqa: E402
+
+SNAPSHOT_DIR = KOK / "benchmarks" / "arama_snapshot"
+SNAPSHOT_DOSYALARI = ("urun_master.parquet", "oneri_listesi.json", "yazim_sozluk.json")
+SENTETIK_SORGULAR = ["tv", "mama", "kedi mama", "termos", "seg klima", "samsun tv 55",
+                     "26047079", "waffle makinesi", "nescaffe gold", "blendır"]
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+def disa_aktar(gun: int) -> int:
+    from supabase import create_client
+
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    if not url or not key:
+        print("SUPABASE_URL/SUPABASE_KEY gerekli")
+        return 1
+    client = create_client(url, key)
+    baslangic = (datetime.now() - timedelta(days=gun)).strftime("%Y-%m-%d")
+
+    adetler: dict[str, int] = {}
+    sayfa, offset = 1000, 0
+    while True:
+        r = client.table("arama_log").select("arama_terimi, arama_sayisi") \
+            .gte("tarih", baslangic).range(offset, offset + sayfa - 1).execute()
+        for satir in r.data or []:
+            terim = satir["arama_terimi"]
+            adetler[terim] = adetler.get(terim, 0) + int(satir["arama_sayisi"] or 0)
+        if len(r.data or []) < sayfa:
+            break
+        offset += sayfa
+
+    hedef = SNAPSHOT_DIR / "data"
+    hedef.mkdir(parents=True, exist_ok=True)
+    for ad in SNAPSHOT_DOSYALARI:
+        kaynak = artifact_yolu(ad, KOK / "data")
+        if kaynak.exists():
+            shutil.copy2(kaynak, hedef / ad)
+    sorgular = [{"terim": t, "adet": a} for t, a in sorted(adetler.items(), key=lambda x: -x[1])]
+    with (SNAPSHOT_DIR / "sorgular.json").open("w", encoding="utf-8") as f:
+        json.dump({"baslangic": baslangic, "sorgular": sorgular}, f, ensure_ascii=False)
+    print(f"{len(sorgular):,} terim ({sum(adetler.values()):,} arama) → {SNAPSHOT_DIR}")
+    return 0
+
+
+def _sorgulari_yukle() -> tuple[list[str], np.ndarray, str]:
+    dosya = SNAPSHOT_DIR / "sorgular.json"
+    if dosya.exists():
+        with dosya.open(encoding="utf-8") as f:
+            kayit = json.load(f)
+        sorgular = [s for s in kayit["sorgular"] if len(s["terim"]) >= 2]
+        return ([s["terim"] for s in sorgular],
+                np.array([max(s["adet"], 1) for s in sorgular], dtype="float64"),
+                f"arama_log snapshot ({kayit['baslangic']}'den beri)")
+    return SENTETIK_SORGULAR, np.ones(len(SENTETIK_SORGULAR)), "sentetik"
+
+
+# ---------------------------------------------------------------------------
+# Sahte Supabase
+# ---------------------------------------------------------------------------
+
+class _Yanit:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Istek:
+    def __init__(self, db: "SahteSupabase", fn: str, params: dict):
+        self._db, self._fn, self._params = db, fn, params
+
+    def execute(self) -> _Yanit:
+        return _Yanit(self._db.cagir(self._fn, self._params))
+
+
+class SahteSupabase:
+    """client.rpc(fn, params).execute().data arayüzlü yerel stand-in."""
+
+    def __init__(self, master: pd.DataFrame, magaza: int, gecikme_ms: float, sapma_ms: float,
+                 timeout_orani: float, timeout_ms: float, eski_sema: bool, seed: int = 42):
+        self.master = master.reset_index(drop=True)
+        self.master["urun_kod"] = self.master["urun_kod"].astype(str)
+        self._kod_satir = {k: i for i, k in enumerate(self.master["urun_kod"])}
+        # Sahte RPC'nin kendi maliyeti ölçümü kirletmesin: satır başına iloc yok
+        self._urunler = self.master[["urun_kod", "urun_ad", "birim_fiyat"]].to_dict("records")
+        rng = np.random.default_rng(seed)
+        stok = rng.integers(1, 15, size=(len(self.master), magaza))
+        self.stok = np.where(rng.random(stok.shape) < 0.6, 0, stok)
+        self.gecikme_ms, self.sapma_ms = gecikme_ms, sapma_ms
+        self.timeout_orani, self.timeout_ms = timeout_orani, timeout_ms
+        self.eski_sema = eski_sema
+        self._rng = np.random.default_rng(seed + 1)
+        self._lock = threading.Lock()
+        self.cagrilar: dict[str, int] = {}
+
+    def rpc(self, fn: str, params: dict) -> _Istek:
+        return _Istek(self, fn, params)
+
+    def _bekle(self, fn: str):
+        with self._lock:
+            self.cagrilar[fn] = self.cagrilar.get(fn, 0) + 1
+            timeout = self._rng.random() < self.timeout_orani
+            ms = max(0.0, self._rng.normal(self.gecikme_ms, self.sapma_ms))
+        if timeout:
+            time.sleep(self.timeout_ms / 1000)
+            raise RuntimeError("{'code': '57014', 'message': 'canceling statement due to statement timeout'}")
+        time.sleep(ms / 1000)
+
+    def _eslesen(self, terim: str) -> list[int]:
+        kelimeler = terim.split()
+        if not kelimeler:
+            return []
+        if terim.isdigit():
+            return self.master.index[self.master["urun_kod"].str.startswith(terim)].tolist()
+        maske = np.ones(len(self.master), dtype=bool)
+        for k in kelimeler:
+            maske &= self.master["urun_ad_normalized"].str.contains(k, regex=False).to_numpy()
+        return np.flatnonzero(maske).tolist()
+
+    def _satirlar(self, idx: list[int]) -> list[dict]:
+        satirlar = []
+        for i in idx:
+            u = self._urunler[i]
+            for m, adet in enumerate(self.stok[i].tolist()):
+                satirlar.append({
+                    "out_urun_kod": u["urun_kod"], "out_urun_ad": u["urun_ad"],
+                    "out_magaza_kod": f"M{m:04d}", "out_magaza_ad": f"Mağaza {m}",
+                    "out_sm_kod": None, "out_bs_kod": None,
+                    "out_stok_adet": adet, "out_birim_fiyat": u["birim_fiyat"],
+                    "out_latitude": None, "out_longitude": None,
+                })
+        return satirlar
+
+    def _ozet(self, idx: list[int]) -> list[dict]:
+        ozet = []
+        for i in idx:
+            u, stok = self._urunler[i], self.stok[i]
+            stoklu = stok[stok > 0]
+            ozet.append({
+                "out_urun_kod": u["urun_kod"], "out_urun_ad": u["urun_ad"],
+                "out_stoklu_magaza": int(len(stoklu)), "out_toplam_stok": int(stoklu.sum()),
+                "out_max_stok": int(stok.max()),
+                "out_birim_fiyat": u["birim_fiyat"] if len(stoklu) else None,
+            })
+        return ozet
+
+    def cagir(self, fn: str, params: dict) -> list[dict]:
+        if self.eski_sema and fn.endswith("_ozet"):
+            raise RuntimeError(f"PGRST202: Could not find the function public.{fn}")
+        self._bekle(fn)
+        if fn in ("hizli_urun_ara", "hizli_urun_ara_ozet"):
+            idx = self._eslesen(params["arama_terimi"])
+        elif fn in ("urun_kodlari_stok", "urun_kodlari_ozet"):
+            idx = [self._kod_satir[k] for k in params["p_urun_kodlari"] if k in self._kod_satir]
+        else:
+            raise RuntimeError(f"PGRST202: Could not find the function public.{fn}")
+        return self._ozet(idx) if fn.endswith("_ozet") else self._satirlar(idx)
+
+
+# ---------------------------------------------------------------------------
+# Çalıştırma
+# ---------------------------------------------------------------------------
+
+def _yuzdelik(degerler: list[float], p: float) -> float:
+    return float(np.percentile(degerler, p)) if degerler else 0.0
+
+
+def calistir(args) -> dict:
+    terimler, agirlik, kaynak = _sorgulari_yukle()
+    rng = np.random.default_rng(args.seed)
+    orneklem = rng.choice(len(terimler), size=args.sorgu, p=agirlik / agirlik.sum())
+    master = pd.read_parquet(artifact_yolu("urun_master.parquet"))
+    client = SahteSupabase(master, args.magaza, args.gecikme_ms, args.sapma_ms,
+                           args.timeout_orani, args.timeout_ms, args.eski_sema, args.seed)
+    print(f"Sorgular: {kaynak}, {len(terimler):,} terim → {args.sorgu:,} arama, "
+          f"{args.eszamanli} eşzamanlı, RPC {args.gecikme_ms:.0f}±{args.sapma_ms:.0f} ms, "
+          f"timeout %{args.timeout_orani * 100:.1f}{', eski şema' if args.eski_sema else ''}\n")
+
+    # Index'ler ilk aramada kurulur; ölçüme girmesin
+    get_urun_index()
+    get_yazim_index()
+    get_oneri_index()
+    metrikler.etkinlestir(True)
+    metrikler.sifirla()
+    get_sonuc_cache().clear()
+    sureler: list[float] = []
+    hatalar = {"timeout": 0, "servis": 0, "koruma": 0, "mesgul": 0}
+    lock = threading.Lock()
+
+    def _tek(terim: str):
+        t0 = time.perf_counter()
+        df, _, hata = arama_motoru.ara(client, terim)
+        sonucu_grupla(df)
+        ms = (time.perf_counter() - t0) * 1000
+        with lock:
+            sureler.append(ms)
+            if hata:
+                hatalar[hata] += 1
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.eszamanli) as pool:
+        list(pool.map(_tek, (terimler[i] for i in orneklem)))
+    gecen = time.perf_counter() - t0
+
+    cache = get_sonuc_cache().stats()
+    return {
+        "tarih": datetime.now().isoformat(timespec="seconds"),
+        "ayarlar": {k: v for k, v in vars(args).items() if k not in ("json", "karsilastir", "disa_aktar")},
+        "throughput_qps": args.sorgu / gecen,
+        "gecikme_ms": {
+            "p50": _yuzdelik(sureler, 50), "p95": _yuzdelik(sureler, 95),
+            "p99": _yuzdelik(sureler, 99), "max": max(sureler, default=0.0),
+        },
+        "cache_isabet": cache["hit_rate"],
+        "hatalar": hatalar,
+        "sayaclar": metrikler.sayaclar(),
+        "rpc_cagrilari": dict(client.cagrilar),
+        "koruma": arama_motoru.get_rpc_koruma().stats(),
+        "asamalar": {a["ad"]: {"adet": a["adet"], "p50": a["p50_ms"], "p95": a["p95_ms"]}
+                     for a in metrikler.asama_ozeti()},
+    }
+
+
+def _fark(yeni: float, eski: float | None) -> str:
+    if eski is None:
+        return ""
+    if not eski:
+        return f"  (önce {eski:.2f})"
+    return f"  (önce {eski:.2f}, {(yeni - eski) / eski * 100:+.0f}%)"
+
+
+def rapor(sonuc: dict, onceki: dict | None):
+    o = onceki or {}
+    og = o.get("gecikme_ms", {})
+    print(f"throughput     {sonuc['throughput_qps']:>9.1f} arama/s{_fark(sonuc['throughput_qps'], o.get('throughput_qps'))}")
+    for p in ("p50", "p95", "p99", "max"):
+        print(f"gecikme {p:<6} {sonuc['gecikme_ms'][p]:>9.1f} ms{_fark(sonuc['gecikme_ms'][p], og.get(p))}")
+    print(f"cache isabet   {sonuc['cache_isabet'] * 100:>9.1f} %"
+          f"{_fark(sonuc['cache_isabet'] * 100, o['cache_isabet'] * 100 if 'cache_isabet' in o else None)}")
+    print(f"hata           timeout {sonuc['hatalar']['timeout']:,} • servis {sonuc['hatalar']['servis']:,}"
+          f" • kısıtlı {sonuc['hatalar']['koruma']:,} • meşgul {sonuc['hatalar']['mesgul']:,}")
+    kr = sonuc["koruma"]
+    print(f"koruma         sınır {kr['limit']:.1f} • reddedilen {kr['reddedilen']:,} • devre açılma {kr['acilma']:,}")
+
+    derinlik = sonuc["sayaclar"].get("fallback_derinlik", {})
+    toplam = sum(derinlik.values()) or 1
+    print("\nsonucu veren basamak (cache ıskası başına)")
+    for etiket, adet in sorted(derinlik.items(), key=lambda x: -x[1]):
+        print(f"  {etiket:<16}{adet:>7,}  %{adet / toplam * 100:5.1f}")
+    if sonuc["sayaclar"].get("kisitli"):
+        print("kısıtlı sonuç: " + " • ".join(f"{k} {n:,}" for k, n in sonuc["sayaclar"]["kisitli"].items()))
+    if sonuc["sayaclar"].get("timeout"):
+        print("RPC timeout: " + " • ".join(f"{fn} {n:,}" for fn, n in sonuc["sayaclar"]["timeout"].items()))
+    print("RPC çağrısı: " + " • ".join(f"{fn} {n:,}" for fn, n in sorted(sonuc["rpc_cagrilari"].items())))
+
+    print(f"\n{'aşama':<28}{'adet':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    onceki_asama = o.get("asamalar", {})
+    for ad, a in sorted(sonuc["asamalar"].items(), key=lambda x: -x[1]["p95"]):
+        eski = onceki_asama.get(ad, {}).get("p95")
+        print(f"{ad:<28}{a['adet']:>8,}{a['p50']:>10.2f}{a['p95']:>10.2f}"
+              + (f"  (önce p95 {eski:.2f})" if eski is not None else ""))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--disa-aktar", action="store_true", help="arama_log + artifact snapshot'ı al")
+    ap.add_argument("--gun", type=int, default=14)
+    ap.add_argument("--sorgu", type=int, default=2000)
+    ap.add_argument("--eszamanli", type=int, default=8)
+    ap.add_argument("--magaza", type=int, default=60)
+    ap.add_argument("--gecikme-ms", type=float, default=40.0)
+    ap.add_argument("--sapma-ms", type=float, default=15.0)
+    ap.add_argument("--timeout-orani", type=float, default=0.0)
+    ap.add_argument("--timeout-ms", type=float, default=3000.0)
+    ap.add_argument("--eski-sema", action="store_true")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", type=Path, help="sonucu bu dosyaya yaz")
+    ap.add_argument("--karsilastir", type=Path, help="önceki --json çıktısıyla karşılaştır")
+    args = ap.parse_args()
+
+    if args.disa_aktar:
+        return disa_aktar(args.gun)
+
+    onceki = None
+    if args.karsilastir:
+        with args.karsilastir.open(encoding="utf-8") as f:
+            onceki = json.load(f)
+    if args.json:
+        args.json = args.json.resolve()
+    # Artifact'lar (urun_index, yazım, öneri) göreli data/ yolundan okunur
+    os.chdir(SNAPSHOT_DIR if (SNAPSHOT_DIR / "data").is_dir() else KOK)
+
+    sonuc = calistir(args)
+    rapor(sonuc, onceki)
+    if args.json:
+        with args.json.open("w", encoding="utf-8") as f:
+            json.dump(sonuc, f, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""urun_master pipeline aşama benchmark'ı: aşama başına süre + eski/yeni format karşılaştırması.
+
+Supabase'e gitmez: data/urun_master.parquet'teki her ürün N mağazada
+varmış gibi sentetik stok_gunluk satırları üretilir (~900k satır için
+--magaza 60). Aşamalar build_and_save_urun_master ile aynı fonksiyonlardır:
+
+    fetch      Arrow tablosu → temiz DataFrame (ağ hariç)
+    dedup      (kod, ad) tekilleştirme
+    normalize  urun_ad_normalized
+    groupby    frekans + son fiyat, frekans sırası
+    format     "kod - ad - fiyat" öneri metinleri
+    yaz/yazim  parquet/json + yazım sözlüğü (geçici dizine)
+
+Ayrıca format aşaması eski satır bazlı apply ile karşılaştırılır (çıktı
+birebir aynı olmalı).
+
+Kullanım:
+    python benchmarks/bench_pipeline.py [--magaza 60] [--tekrar 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import urun_master_pipeline as pipeline  # noqa: E402
+from utils_text import normalize_tr_search_series  # noqa: E402
+
+
+def _sentetik_tablo(magaza_sayisi: int, seed: int = 42) -> pa.Table:
+    master = pd.read_parquet("data/urun_master.parquet")
+    rng = np.random.default_rng(seed)
+    n = len(master) * magaza_sayisi
+    urun = np.tile(np.arange(len(master)), magaza_sayisi)
+    fiyat = master["birim_fiyat"].to_numpy(dtype="float64")[urun]
+    # Mağazaların bir kısmında farklı/eksik fiyat
+    oynat = rng.random(n)
+    fiyat = np.where(oynat < 0.05, np.nan, np.where(oynat < 0.15, np.round(fiyat * 1.1, 2), fiyat))
+    return pa.table({
+        "id": pa.array(np.arange(1, n + 1), pa.int64()),
+        "urun_kod": pa.array(master["urun_kod"].to_numpy(dtype=object)[urun], pa.string()),
+        "urun_ad": pa.array(master["urun_ad"].to_numpy(dtype=object)[urun], pa.string()),
+        "birim_fiyat": pa.array(fiyat, pa.float64()),
+    }, schema=pipeline._RAW_SCHEMA)
+
+
+def _olc(fn, tekrar: int):
+    best, sonuc = float("inf"), None
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        sonuc = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, sonuc
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--magaza", type=int, default=60)
+    ap.add_argument("--tekrar", type=int, default=3)
+    args = ap.parse_args()
+
+    table = _sentetik_tablo(args.magaza)
+    print(f"Sentetik stok_gunluk: {table.num_rows:,} satır ({args.magaza} mağaza), en iyi {args.tekrar} ölçüm\n")
+
+    sureler: dict[str, float] = {}
+    sureler["fetch"], raw_df = _olc(lambda: pipeline._tablodan_df(table), args.tekrar)
+    sureler["dedup"], master_df = _olc(lambda: pipeline._master_tekillestir(raw_df), args.tekrar)
+    sureler["normalize"], normalized = _olc(
+        lambda: normalize_tr_search_series(master_df["urun_ad"]), args.tekrar,
+    )
+    master_df["urun_ad_normalized"] = normalized
+    sureler["groupby"], oneri_df = _olc(lambda: pipeline._oneri_grupla(raw_df), args.tekrar)
+    sureler["format"], oneri_listesi = _olc(lambda: pipeline._oneri_metinleri(oneri_df), args.tekrar)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        yazma: dict[str, float] = {}
+        pipeline._ciktilari_yaz(Path(tmp), master_df, oneri_df, oneri_listesi, yazma)
+        sureler.update(yazma)
+
+    t_apply, eski = _olc(
+        lambda: oneri_df.apply(pipeline._format_oneri, axis=1).drop_duplicates().tolist(), 1,
+    )
+
+    toplam = sum(sureler.values())
+    print(f"\n{'aşama':<12}{'süre s':>10}{'pay':>8}")
+    for ad, sn in sureler.items():
+        print(f"{ad:<12}{sn:>10.3f}{sn / toplam * 100:>7.1f}%")
+    print(f"{'toplam':<12}{toplam:>10.3f}")
+
+    ayni = eski == oneri_listesi
+    print(f"\nformat: apply {t_apply:.3f} s → vektör {sureler['format']:.3f} s "
+          f"({t_apply / max(sureler['format'], 1e-9):.0f}x), "
+          f"{len(oneri_listesi):,} öneri — {'birebir aynı' if ayni else '✗ ÇIKTI FARKLI'}")
+    return 0 if ayni else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
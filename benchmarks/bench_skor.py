@@ -0,0 +1,121 @@
+"""Alaka skoru micro-benchmark: df.apply(calculate_relevance) vs alaka_skoru.
+
+Kayıtlı RPC payload'ları üzerinde çalışır. Payload kaydetmek için uygulamayı
+ARAMA_PAYLOAD_DIR=benchmarks/payloads ile başlatıp birkaç arama yapın; her
+process_results çağrısı {"query", "data"} JSON'u olarak yazılır.
+
+Kayıt yoksa data/urun_master.parquet'ten sentetik payload üretilir
+(her ürün × N mağaza, rastgele stok).
+
+Kullanım:
+    python benchmarks/bench_skor.py [--payload-dir DIR] [--tekrar 5] [--magaza 150]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from arama.skor import alaka_skoru, calculate_relevance  # noqa: E402
+
+SENTETIK_SORGULAR = ["tv", "mama", "kedi mama", "termos", "su", "26047079"]
+
+
+def _payload_yukle(payload_dir: Path) -> list[tuple[str, list[dict]]]:
+    out = []
+    for p in sorted(payload_dir.glob("*.json")):
+        with p.open(encoding="utf-8") as f:
+            rec = json.load(f)
+        out.append((rec["query"], rec["data"]))
+    return out
+
+
+def _sentetik_payload(magaza_sayisi: int, seed: int = 42) -> list[tuple[str, list[dict]]]:
+    master = pd.read_parquet("data/urun_master.parquet")
+    rng = np.random.default_rng(seed)
+    out = []
+    for q in SENTETIK_SORGULAR:
+        if q.isdigit():
+            urunler = master[master["urun_kod"].str.startswith(q[:5])]
+        else:
+            urunler = master[master["urun_ad_normalized"].str.contains(q, regex=False)]
+        urunler = urunler.head(200)
+        rows = []
+        for _, u in urunler.iterrows():
+            stoklar = rng.integers(-1, 12, size=magaza_sayisi)
+            for m in range(magaza_sayisi):
+                rows.append({
+                    "out_urun_kod": u["urun_kod"],
+                    "out_urun_ad": u["urun_ad"],
+                    "out_magaza_kod": f"M{m:04d}",
+                    "out_magaza_ad": f"Mağaza {m}",
+                    "out_stok_adet": int(max(stoklar[m], 0)),
+                    "out_birim_fiyat": u["birim_fiyat"],
+                })
+        out.append((q, rows))
+    return out
+
+
+def _sirala(df: pd.DataFrame, skor: pd.Series) -> list:
+    df = df.assign(alaka=skor)
+    df = df.sort_values(by=["alaka", "stok_adet"], ascending=[False, False])
+    return df.drop_duplicates(subset=["magaza_kod", "urun_kod"]).index.tolist()
+
+
+def _olc(fn, tekrar: int) -> float:
+    best = float("inf")
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--payload-dir", type=Path, default=Path("benchmarks/payloads"))
+    ap.add_argument("--tekrar", type=int, default=5)
+    ap.add_argument("--magaza", type=int, default=150)
+    args = ap.parse_args()
+
+    payloads = _payload_yukle(args.payload_dir) if args.payload_dir.is_dir() else []
+    kaynak = f"kayıt ({args.payload_dir})"
+    if not payloads:
+        payloads = _sentetik_payload(args.magaza)
+        kaynak = f"sentetik ({args.magaza} mağaza)"
+
+    print(f"Payload: {kaynak}, {len(payloads)} sorgu, en iyi {args.tekrar} ölçüm\n")
+    print(f"{'sorgu':<20}{'satır':>8}{'ürün':>7}{'apply ms':>11}{'vektör ms':>11}{'hız':>8}")
+
+    hata = 0
+    for query, data in payloads:
+        df = pd.DataFrame(data)
+        df.columns = [c.replace("out_", "") for c in df.columns]
+        qw = set(query.lower().split())
+
+        eski = df.apply(lambda r: calculate_relevance(r, query, qw), axis=1)
+        yeni = alaka_skoru(df, query)
+        ayni = eski.astype("int64").equals(yeni) and _sirala(df, eski) == _sirala(df, yeni)
+        if not ayni:
+            hata += 1
+
+        t_eski = _olc(lambda: df.apply(lambda r: calculate_relevance(r, query, qw), axis=1), args.tekrar)
+        t_yeni = _olc(lambda: alaka_skoru(df, query), args.tekrar)
+        urun = df["urun_kod"].nunique() if "urun_kod" in df.columns else 0
+        isaret = "" if ayni else "  ✗ sıralama farklı"
+        print(f"{query[:19]:<20}{len(df):>8}{urun:>7}{t_eski:>11.1f}{t_yeni:>11.2f}{t_eski / max(t_yeni, 1e-9):>7.0f}x{isaret}")
+
+    print("\nSıralama birebir aynı." if not hata else f"\n{hata} sorguda sıralama farkı!")
+    return 1 if hata else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Autocomplete — Streamlit custom component (declare_component).
+
+Ana arama kutusuna (parent document'taki text_input) bağlanır ve altında
+öneri dropdown'ı gösterir. Öneriler tarayıcıda değil sunucuda üretilir:
+
+  - Tarayıcı her tuşta (debounce'lu) ``{"q": str, "seq": int}`` gönderir
+  - Python tarafı (st.fragment içinde) arama/oneri_index ile top-k öneriyi
+    hesaplar ve aynı ``seq`` ile component'a geri verir
+  - Tarayıcı sadece en son gönderdiği ``seq``'e ait önerileri çizer
+
+Böylece oneri_listesi.json tarayıcıya hiç gönderilmez; tuş başına en
+fazla MAX_ONERI satır gider. Iframe görünmezdir (yükseklik 0).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import streamlit.components.v1 as components
+
+_FRONTEND_DIR = Path(__file__).parent / "frontend"
+_component_func = components.declare_component("autocomplete", path=str(_FRONTEND_DIR))
+
+
+def autocomplete(
+    oneriler: list[str],
+    *,
+    seq: int = 0,
+    input_placeholder: str = "Ürün kodu",
+    key: str,
+) -> dict | None:
+    """Dropdown'ı verilen önerilerle güncelle; son tuş vuruşunu döndür.
+
+    Parameters
+    ----------
+    oneriler : list[str]
+        "kod - ad - fiyat" metinleri (sunucuda sıralanmış, kısaltılmış).
+    seq : int
+        Bu önerilerin ait olduğu istek numarası (tarayıcıdan gelen).
+    input_placeholder : str
+        Bağlanılacak input'un placeholder'ında geçen metin.
+    key : str
+        Sabit component key'i — değeri st.session_state[key]'den de okunur.
+
+    Returns
+    -------
+    dict | None
+        ``{"q": "kedi ma", "seq": 7}`` ya da henüz yazılmadıysa None.
+    """
+    return _component_func(
+        oneriler=oneriler,
+        seq=seq,
+        input_placeholder=input_placeholder,
+        key=key,
+        default=None,
+    )
@@ -3,6 +3,10 @@
 Displays poster pages in a slider with interactive hotspots.
 Clicking a hotspot shows product info (code, description, price).
 Supports keyboard arrows and touch swipe navigation.
+
+Pages that carry pre-rendered display variants (storage.display_variants) are
+passed to the browser as URLs; only legacy pages without variants are resized
+and base64-encoded here, a few at a time as the user navigates.
 """
 
 from __future__ import annotations
@@ -33,7 +37,10 @@ def poster_viewer(
     Parameters
     ----------
     pages : list[dict]
-        Each entry: {"png_bytes": bytes, "label": str, "hotspots": [...]}
+        Each entry: {"id": Any, "display": {...} | None, "width": int | None,
+        "height": int | None, "png_bytes": bytes, "label": str,
+        "hotspots": [...]}. When "display" (src/srcset URLs) is present,
+        "png_bytes" is not used.
     current_index : int
         Which page to show initially.
     click_mode : str
@@ -51,29 +58,39 @@ def poster_viewer(
         ``{"type": "hotspot_click", "urun_kodu": "..."}`` in search mode,
         ``{"type": "page_change", "index": N}`` on navigation.
     """
-    # Build lightweight page data (b64 images + hotspots)
+    # Props carry a manifest only (label, URL, size, hotspots); the browser
+    # loads the visible page and prefetches ±1. Legacy pages without display
+    # variants are encoded lazily: the current page ±1, plus whatever the
+    # frontend asked for with a "need_pages" message.
     cache_key = f"_pv_cache_{key}"
     cached = st.session_state.get(cache_key)
 
-    # Build signature from all pages: labels + hotspot counts + image sizes
     pages_sig = tuple(
-        (pg.get("label", ""), len(pg.get("hotspots", [])), len(pg.get("png_bytes", b"")))
+        (pg.get("id"), pg.get("label", ""), len(pg.get("hotspots", [])),
+         (pg.get("display") or {}).get("src") or len(pg.get("png_bytes", b"")))
         for pg in pages
     )
-    if cached and cached.get("sig") == pages_sig:
-        comp_pages = cached["data"]
-    else:
-        comp_pages = []
-        for pg in pages:
-            b64 = _encode_page(pg["png_bytes"], max_display_width)
-            comp_pages.append({
-                "image_b64": b64,
-                "label": pg.get("label", ""),
-                "hotspots": pg.get("hotspots", []),
-            })
-        st.session_state[cache_key] = {"sig": pages_sig, "data": comp_pages}
-
-    return _component_func(
+    if not cached or cached.get("sig") != pages_sig:
+        cached = {
+            "sig": pages_sig,
+            "data": [_manifest_entry(i, pg, max_display_width) for i, pg in enumerate(pages)],
+            "b64": {},
+        }
+        st.session_state[cache_key] = cached
+    manifest, encoded = cached["data"], cached["b64"]
+
+    wanted = {current_index - 1, current_index, current_index + 1}
+    request = st.session_state.get(key)
+    if isinstance(request, dict) and request.get("type") == "need_pages":
+        wanted.update(int(i) for i in request.get("indices", []))
+    for i in sorted(wanted):
+        if 0 <= i < len(pages) and not manifest[i].get("src") and i not in encoded:
+            encoded[i] = _encode_page(pages[i]["png_bytes"], max_display_width)
+
+    comp_pages = [dict(entry, image_b64=encoded[i]) if i in encoded else entry
+                  for i, entry in enumerate(manifest)]
+
+    result = _component_func(
         pages=comp_pages,
         current_index=current_index,
         click_mode=click_mode,
@@ -81,6 +98,30 @@ def poster_viewer(
         default=None,
         height=height,
     )
+    if isinstance(result, dict) and result.get("type") == "need_pages":
+        return None
+    return result
+
+
+def _manifest_entry(index: int, pg: dict, max_w: int) -> dict:
+    """Component-side description of a page, without image data."""
+    entry = {
+        "key": f"{pg.get('id', index)}",
+        "label": pg.get("label", ""),
+        "hotspots": pg.get("hotspots", []),
+        "width": pg.get("width"),
+        "height": pg.get("height"),
+    }
+    display = pg.get("display")
+    if display:
+        entry.update(display, sizes=f"(max-width: {max_w}px) 100vw, {max_w}px")
+        entry["key"] = display["src"]
+    elif pg.get("png_bytes"):
+        if not entry["width"]:
+            # Sadece başlık okunur, decode yok
+            entry["width"], entry["height"] = Image.open(io.BytesIO(pg["png_bytes"])).size
+        entry["key"] = f"{entry['key']}:{len(pg['png_bytes'])}"
+    return entry
 
 
 def _encode_page(png_bytes: bytes, max_w: int) -> str:
@@ -0,0 +1,257 @@
+"""Günlük urun_master pipeline zamanlayıcısı — process'ler arası tek çalıştırıcı.
+
+Streamlit her rerun'da `kontrol_et()` çağırır; çağrı hiç beklemez, asıl
+kontrol bir daemon thread'de yapılır. Aynı gün içinde pipeline'ı sadece
+bir process çalıştırır:
+
+  - data/pipeline_durum.json bir "lease" tutar: sahibi (host:pid), bitiş
+    zamanı, durum ve ilerleme. Çalıştırıcı lease'i her HEARTBEAT saniyede
+    uzatır; process ölürse lease LEASE_SURESI sonunda düşer ve başka bir
+    process devralabilir.
+  - Lease dosyasının oku-değiştir-yaz adımı data/.pipeline.lock üzerinde
+    fcntl.flock ile korunur (aynı volume'ü paylaşan replikalar/worker'lar).
+
+Pipeline ayrı bir Python process'inde çalışır (900k satırlık iş web
+process'inin belleğini ve GIL'ini meşgul etmesin); stdout satırları
+ilerleme olarak durum dosyasına yazılır. Başarısız denemeler geri çekilmeli
+olarak MAX_DENEME kez tekrarlanır; hepsi başarısızsa aynı gün
+HATA_SONRASI_BEKLEME sonra yeniden denenir.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: sadece lease ile korunur
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = Path("data")
+DURUM_JSON = DATA_DIR / "pipeline_durum.json"
+KILIT_DOSYASI = DATA_DIR / ".pipeline.lock"
+# Pipeline başka bir yoldan (GitHub Actions commit'i vb.) bugün yazıldıysa tekrar çalıştırma
+GUNCELLIK_DOSYALARI = (DATA_DIR / "oneri_listesi.json", DATA_DIR / "urun_master_manifest.json")
+
+# -u: stdout satırları ilerleme olarak anında okunabilsin
+PIPELINE_KOMUTU = [sys.executable, "-u", "urun_master_pipeline.py"]
+
+# Stok sabah 09:00'da yükleniyor, pipeline 10:30'dan sonra çalışsın
+BASLANGIC_SAATI = (10, 30)
+KONTROL_ARALIGI = 5 * 60
+LEASE_SURESI = 5 * 60
+HEARTBEAT = 30
+ZAMAN_ASIMI = 20 * 60
+MAX_DENEME = 3
+GERI_CEKILME = (30, 120)
+HATA_SONRASI_BEKLEME = 30 * 60
+
+
+def _simdi() -> float:
+    return time.time()
+
+
+def _bugun() -> str:
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+@contextmanager
+def _dosya_kilidi():
+    KILIT_DOSYASI.parent.mkdir(parents=True, exist_ok=True)
+    with open(KILIT_DOSYASI, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def durum_oku() -> dict:
+    """Son pipeline durumu (admin paneli de bunu okur)."""
+    try:
+        with DURUM_JSON.open(encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _durum_yaz(durum: dict):
+    DURUM_JSON.parent.mkdir(parents=True, exist_ok=True)
+    tmp = DURUM_JSON.with_name(DURUM_JSON.name + '.tmp')
+    with tmp.open('w', encoding='utf-8') as f:
+        json.dump(durum, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, DURUM_JSON)
+
+
+def _bugun_guncel() -> bool:
+    bugun = _bugun()
+    for p in GUNCELLIK_DOSYALARI:
+        try:
+            if datetime.fromtimestamp(p.stat().st_mtime).strftime('%Y-%m-%d') >= bugun:
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def _lease_al(sahip: str) -> bool:
+    """Bugünün çalıştırma hakkını al; başkası çalışıyorsa/iş bittiyse False."""
+    with _dosya_kilidi():
+        d = durum_oku()
+        simdi, bugun = _simdi(), _bugun()
+        if d.get('durum') == 'calisiyor' and d.get('lease_bitis', 0) > simdi:
+            return False
+        if d.get('gun') == bugun:
+            if d.get('durum') == 'basarili':
+                return False
+            if d.get('durum') == 'hata' and d.get('sonraki_deneme', 0) > simdi:
+                return False
+        elif _bugun_guncel():
+            return False
+        _durum_yaz({
+            **{k: d[k] for k in ('son_basarili', 'son_sure_s') if k in d},
+            'gun': bugun,
+            'durum': 'calisiyor',
+            'sahip': sahip,
+            'baslangic': simdi,
+            'lease_bitis': simdi + LEASE_SURESI,
+            'deneme': 0,
+            'ilerleme': '',
+        })
+        return True
+
+
+def _lease_guncelle(sahip: str, **alanlar) -> bool:
+    """Lease'i uzat ve alanları yaz; lease başkasına geçtiyse False."""
+    with _dosya_kilidi():
+        d = durum_oku()
+        if d.get('sahip') != sahip:
+            return False
+        d.update(alanlar)
+        if d.get('durum') == 'calisiyor':
+            d['lease_bitis'] = _simdi() + LEASE_SURESI
+        _durum_yaz(d)
+        return True
+
+
+def _pipeline_calistir(sahip: str) -> tuple[bool, str]:
+    """Pipeline'ı alt process'te çalıştır; stdout'u ilerleme olarak yaz."""
+    proc = subprocess.Popen(
+        PIPELINE_KOMUTU, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding='utf-8', errors='replace',
+    )
+    son_satirlar: list[str] = []
+
+    def _oku():
+        for satir in proc.stdout:
+            satir = satir.strip()
+            if satir:
+                son_satirlar.append(satir)
+                del son_satirlar[:-20]
+
+    okuyucu = threading.Thread(target=_oku, daemon=True)
+    okuyucu.start()
+
+    baslangic = _simdi()
+    while True:
+        try:
+            proc.wait(timeout=HEARTBEAT)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        if _simdi() - baslangic > ZAMAN_ASIMI:
+            proc.kill()
+            proc.wait()
+            okuyucu.join(timeout=5)
+            return False, f"zaman aşımı ({ZAMAN_ASIMI} s)"
+        ilerleme = son_satirlar[-1] if son_satirlar else ''
+        if not _lease_guncelle(sahip, ilerleme=ilerleme):
+            log.warning("pipeline lease lost; stopping run")
+            proc.kill()
+            proc.wait()
+            return False, "lease kaybedildi"
+
+    okuyucu.join(timeout=5)
+    if proc.returncode == 0:
+        return True, ''
+    return False, (son_satirlar[-1] if son_satirlar else f"çıkış kodu {proc.returncode}")
+
+
+def _calistir(sahip: str):
+    """Lease sahibi olarak pipeline'ı geri çekilmeli tekrar denemelerle çalıştır."""
+    baslangic = _simdi()
+    hata = ''
+    for deneme in range(1, MAX_DENEME + 1):
+        _lease_guncelle(sahip, deneme=deneme, ilerleme='başlıyor')
+        try:
+            ok, hata = _pipeline_calistir(sahip)
+        except Exception as e:
+            ok, hata = False, str(e)
+        if ok:
+            bitis = _simdi()
+            _lease_guncelle(
+                sahip, durum='basarili', bitis=bitis, sure_s=bitis - baslangic,
+                son_basarili=bitis, son_sure_s=bitis - baslangic, hata='', ilerleme='tamamlandı',
+            )
+            log.info("urun_master pipeline finished in %.0f s (deneme %d)", bitis - baslangic, deneme)
+            return
+        log.warning("urun_master pipeline failed (deneme %d/%d): %s", deneme, MAX_DENEME, hata)
+        if deneme < MAX_DENEME:
+            bekle = GERI_CEKILME[min(deneme - 1, len(GERI_CEKILME) - 1)]
+            _lease_guncelle(sahip, hata=hata, ilerleme=f"{bekle} s sonra tekrar denenecek")
+            time.sleep(bekle)
+
+    bitis = _simdi()
+    _lease_guncelle(
+        sahip, durum='hata', bitis=bitis, sure_s=bitis - baslangic, hata=hata,
+        sonraki_deneme=bitis + HATA_SONRASI_BEKLEME,
+    )
+
+
+def calistir_gerekirse() -> bool:
+    """Lease alınabilirse pipeline'ı bu thread'de çalıştır. Çalıştıysa True."""
+    sahip = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    try:
+        if not _lease_al(sahip):
+            return False
+    except OSError:
+        log.exception("pipeline lease check failed")
+        return False
+    _calistir(sahip)
+    return True
+
+
+_kontrol_lock = threading.Lock()
+_son_kontrol: float | None = None
+
+
+def kontrol_et():
+    """Pipeline'ın bugün çalışması gerekiyorsa arka planda başlat (hiç beklemez).
+
+    Process başına en fazla KONTROL_ARALIGI'nda bir kez thread açar; asıl
+    tekilleştirme process'ler arası lease ile yapılır.
+    """
+    global _son_kontrol
+    simdi = datetime.now()
+    if (simdi.hour, simdi.minute) < BASLANGIC_SAATI:
+        return
+    with _kontrol_lock:
+        if _son_kontrol is not None and _simdi() - _son_kontrol < KONTROL_ARALIGI:
+            return
+        _son_kontrol = _simdi()
+    threading.Thread(target=calistir_gerekirse, daemon=True, name="pipeline-scheduler").start()
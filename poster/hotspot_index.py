@@ -0,0 +1,117 @@
+"""Sayfa başına hotspot gruplama ve tıklama için ızgara (grid) index'i.
+
+Afiş görüntüleyici bir haftanın tüm mapping'lerini tek sorguda alır. Eskiden
+her sayfa için bu listenin tamamı taranıyordu (sayfa × mapping, her rerun'da).
+`group_mappings` listeyi bir kez (flyer_filename, page_no) → PageHotspots
+yapısına böler; storage.get_week_hotspots sonucu hafta versiyonu başına
+saklar.
+
+Tıklama çözümü `HotspotGrid` ile yapılır: normalize (0..1) sayfa düzlemi
+n×n hücreye bölünür, her kutu kestiği hücrelere yazılır. Bir nokta için
+sadece kendi hücresindeki kutular denenir; iç içe kutularda en küçüğü
+kazanır. Component (frontend/index.html) aynı ızgarayı JS tarafında kurar.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import Iterable, Sequence
+
+MAX_HUCRE = 32
+
+Box = tuple[float, float, float, float]
+
+
+def _hucre(v: float, n: int) -> int:
+    return min(n - 1, max(0, int(v * n)))
+
+
+class HotspotGrid:
+    """Uniform grid over normalised page coordinates."""
+
+    __slots__ = ("boxes", "n", "_cells")
+
+    def __init__(self, boxes: Sequence[Box], n: int | None = None):
+        # Hücre başına ~1 kutu; yoğun sayfalarda MAX_HUCRE×MAX_HUCRE'de durur
+        self.n = n or max(1, min(MAX_HUCRE, int(math.sqrt(len(boxes))) + 1))
+        self.boxes = [
+            (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            for x0, y0, x1, y1 in boxes
+        ]
+        cells: dict[int, list[int]] = defaultdict(list)
+        n = self.n
+        for i, (x0, y0, x1, y1) in enumerate(self.boxes):
+            for cy in range(_hucre(y0, n), _hucre(y1, n) + 1):
+                for cx in range(_hucre(x0, n), _hucre(x1, n) + 1):
+                    cells[cy * n + cx].append(i)
+        self._cells = dict(cells)
+
+    def hit(self, x: float, y: float) -> int | None:
+        """Index of the smallest box containing (x, y), or None."""
+        if not (0.0 <= x <= 1.0 and 0.0 <= y <= 1.0):
+            return None
+        best, best_area = None, math.inf
+        for i in self._cells.get(_hucre(y, self.n) * self.n + _hucre(x, self.n), ()):
+            x0, y0, x1, y1 = self.boxes[i]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                area = (x1 - x0) * (y1 - y0)
+                if area < best_area:
+                    best, best_area = i, area
+        return best
+
+
+class PageHotspots:
+    """One page's mappings as component-ready hotspot dicts + a lazy grid.
+
+    `hotspots` is the public (search-mode) list: box + urun_kodu only.
+    `admin_hotspots` adds the popup fields and shows "?" for unmapped codes.
+    The dicts are shared between sessions — do not mutate them.
+    """
+
+    __slots__ = ("hotspots", "admin_hotspots", "_grid")
+
+    def __init__(self, mappings: Iterable[dict]):
+        self.hotspots = []
+        self.admin_hotspots = []
+        for m in mappings:
+            kutu = {"x0": m["x0"], "y0": m["y0"], "x1": m["x1"], "y1": m["y1"]}
+            self.hotspots.append({**kutu, "urun_kodu": m.get("urun_kodu") or ""})
+            self.admin_hotspots.append({
+                **kutu,
+                "urun_kodu": m.get("urun_kodu") or "?",
+                "urun_ad": m.get("urun_aciklamasi") or "",
+                "afis_fiyat": m.get("afis_fiyat") or "",
+            })
+        self._grid: HotspotGrid | None = None
+
+    def __len__(self) -> int:
+        return len(self.hotspots)
+
+    @property
+    def grid(self) -> HotspotGrid:
+        if self._grid is None:
+            self._grid = HotspotGrid([(h["x0"], h["y0"], h["x1"], h["y1"]) for h in self.hotspots])
+        return self._grid
+
+    def hit(self, x: float, y: float) -> dict | None:
+        """Hotspot under a normalised click position (innermost wins)."""
+        i = self.grid.hit(x, y)
+        return None if i is None else self.hotspots[i]
+
+
+_BOS = PageHotspots(())
+
+
+def group_mappings(mappings: Iterable[dict]) -> dict[tuple[str, int], PageHotspots]:
+    """Group a week's mappings by (flyer_filename, page_no) in one pass."""
+    by_page: dict[tuple[str, int], list[dict]] = defaultdict(list)
+    for m in mappings:
+        by_page[(m["flyer_filename"], m["page_no"])].append(m)
+    return {k: PageHotspots(v) for k, v in by_page.items()}
+
+
+def page_hotspots(groups: dict[tuple[str, int], PageHotspots],
+                  flyer_filename: str, page_no: int) -> PageHotspots:
+    """groups[(flyer_filename, page_no)], or an empty page."""
+    return groups.get((flyer_filename, page_no), _BOS)
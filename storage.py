@@ -7,14 +7,20 @@ Metadata + mappings live in Supabase PostgreSQL tables.
 from __future__ import annotations
 
 import base64
+import hashlib
 import io
 import logging
 import os
 import re
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 
+from arama.singleflight import SingleFlight
+from poster.hotspot_index import PageHotspots, group_mappings
+
 log = logging.getLogger(__name__)
 
 # Storage path whitelist — path traversal ve kontrol karakterlerine karşı koruma
@@ -113,10 +119,25 @@ def _ensure_bucket():
 # Helper — no-op init_db (kept for backward compat, tables created via SQL)
 # ---------------------------------------------------------------------------
 
+_db_ready = False
+_db_ready_lock = threading.Lock()
+
+
 def init_db(db_path=None):
-    """Ensure storage bucket exists and run lightweight migrations."""
-    _ensure_bucket()
-    _ensure_week_sort_order()
+    """Ensure storage bucket exists and run lightweight migrations.
+
+    Runs once per process; later calls (one per visitor session) are free.
+    """
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_ready_lock:
+        if _db_ready:
+            return
+        _ensure_bucket()
+        _ensure_week_sort_order()
+        _ensure_display_columns()
+        _db_ready = True
 
 
 def _ensure_week_sort_order():
@@ -133,6 +154,25 @@ def _ensure_week_sort_order():
             log.warning("Could not add sort_order column — run migration SQL manually")
 
 
+def _ensure_display_columns():
+    """Add display_rev / img_w / img_h columns to poster_pages if missing."""
+    global _display_rev_column
+    sb = _get_client()
+    if sb is None:
+        return
+    try:
+        sb.table("poster_pages").select("display_rev, img_w, img_h").limit(1).execute()
+    except Exception:
+        try:
+            sb.rpc("exec_sql", {"query": (
+                "ALTER TABLE poster_pages ADD COLUMN IF NOT EXISTS display_rev TEXT, "
+                "ADD COLUMN IF NOT EXISTS img_w INTEGER, ADD COLUMN IF NOT EXISTS img_h INTEGER"
+            )}).execute()
+        except Exception:
+            _display_rev_column = False
+            log.warning("Could not add display columns — run migration SQL manually")
+
+
 # ============================================================================
 # MAPPINGS CRUD
 # ============================================================================
@@ -164,6 +204,7 @@ def save_mapping(m: dict, db_path=None) -> int:
     # Mass assignment koruması — sadece whitelist alanlar DB'ye gitsin
     row = {k: v for k, v in row.items() if k in _MAPPING_ALLOWED_FIELDS}
     res = sb.table("mappings").insert(row).execute()
+    _hotspot_cache.invalidate(m["week_id"])
     return res.data[0]["mapping_id"]
 
 
@@ -213,6 +254,7 @@ def update_mapping(mapping_id: int, fields: dict, db_path=None):
         return
     sb = _get_client()
     sb.table("mappings").update(to_set).eq("mapping_id", mapping_id).execute()
+    _hotspot_cache.invalidate()
 
 
 def delete_mapping(mapping_id: int, db_path=None, week_id: str = None):
@@ -227,6 +269,7 @@ def delete_mapping(mapping_id: int, db_path=None, week_id: str = None):
     if week_id:
         q = q.eq("week_id", week_id)
     q.execute()
+    _hotspot_cache.invalidate(week_id or None)
 
 
 def delete_page_mappings(
@@ -242,6 +285,7 @@ def delete_page_mappings(
         .eq("page_no", page_no)
         .execute()
     )
+    _hotspot_cache.invalidate(week_id)
 
 
 def get_last_mapping_id(week_id: str, db_path=None) -> int | None:
@@ -276,30 +320,37 @@ def get_max_sort_order(week_id: str, db_path=None) -> int:
 # POSTER PAGES — images in Supabase Storage, metadata in DB
 # ============================================================================
 
-def _upload_image(week_id: str, flyer_filename: str, page_no: int,
-                  image_bytes: bytes) -> str:
-    """Upload image to Supabase Storage and return the path."""
+def _put_object(path: str, data: bytes, content_type: str) -> bool:
+    """Upsert an object into the poster bucket; False if both attempts fail."""
     sb = _get_client()
-    # Deterministic path so upsert works. Hem week_id hem filename whitelist
-    # ile normalize edilir (path traversal + kontrol karakterlerine karşı).
-    safe_week = _safe_path_segment(week_id, fallback="week")
-    safe_name = _safe_path_segment(flyer_filename, fallback="file")
-    path = f"{safe_week}/{safe_name}_p{int(page_no)}.jpg"
     try:
         sb.storage.from_(BUCKET).upload(
-            path, image_bytes,
-            file_options={"content-type": "image/jpeg", "upsert": "true"},
+            path, data,
+            file_options={"content-type": content_type, "upsert": "true"},
         )
     except Exception as e:
         # If file exists, update
         log.warning("Upload fallback: %s", e)
         try:
             sb.storage.from_(BUCKET).update(
-                path, image_bytes,
-                file_options={"content-type": "image/jpeg"},
+                path, data,
+                file_options={"content-type": content_type},
             )
         except Exception as e2:
             log.error("Upload failed: %s", e2)
+            return False
+    return True
+
+
+def _upload_image(week_id: str, flyer_filename: str, page_no: int,
+                  image_bytes: bytes) -> str:
+    """Upload image to Supabase Storage and return the path."""
+    # Deterministic path so upsert works. Hem week_id hem filename whitelist
+    # ile normalize edilir (path traversal + kontrol karakterlerine karşı).
+    safe_week = _safe_path_segment(week_id, fallback="week")
+    safe_name = _safe_path_segment(flyer_filename, fallback="file")
+    path = f"{safe_week}/{safe_name}_p{int(page_no)}.jpg"
+    _put_object(path, image_bytes, "image/jpeg")
     return path
 
 
@@ -315,26 +366,330 @@ def _download_image(path: str) -> bytes:
     return sb.storage.from_(BUCKET).download(path)
 
 
+# ---------------------------------------------------------------------------
+# Display derivatives — rendered once at upload, served straight from Storage
+# ---------------------------------------------------------------------------
+
+DISPLAY_WIDTHS = (600, 1200)
+# (uzantı, PIL formatı, content-type, kalite)
+_DISPLAY_FORMATS = (
+    ("jpg", "JPEG", "image/jpeg", 85),
+    ("webp", "WEBP", "image/webp", 80),
+)
+# init_db migration'ı display_rev/img_w/img_h kolonlarını ekleyemezse False olur
+_display_rev_column = True
+
+
+def _display_path(image_path: str, width: int, ext: str) -> str:
+    base = image_path.rsplit(".", 1)[0]
+    return f"{base}_w{int(width)}.{ext}"
+
+
+def _display_paths(image_path: str) -> list[str]:
+    return [_display_path(image_path, w, ext)
+            for w in DISPLAY_WIDTHS for ext, *_ in _DISPLAY_FORMATS]
+
+
+def _render_display_variants(image_bytes: bytes) -> tuple[dict[tuple[int, str], bytes], tuple[int, int]]:
+    """Resize a page image to every DISPLAY_WIDTHS x format pair.
+
+    Returns (variants, original (width, height)). Narrower originals are not
+    upscaled: the wider variant is then the original size, re-encoded.
+    """
+    from PIL import Image
+    pil = Image.open(io.BytesIO(image_bytes))
+    pil.load()
+    if pil.mode not in ("RGB", "L"):
+        pil = pil.convert("RGB")
+    w, h = pil.size
+    out = {}
+    for width in DISPLAY_WIDTHS:
+        dw = min(width, w)
+        img = pil if dw == w else pil.resize((dw, max(1, round(h * dw / w))), Image.LANCZOS)
+        for ext, fmt, _, quality in _DISPLAY_FORMATS:
+            buf = io.BytesIO()
+            img.save(buf, format=fmt, quality=quality)
+            out[(width, ext)] = buf.getvalue()
+    return out, (w, h)
+
+
+def _upload_display_variants(image_path: str, image_bytes: bytes) -> dict:
+    """Render and upload the display variants of a page.
+
+    Returns the poster_pages columns to set: display_rev is a new revision
+    token (appended to the URLs so CDN/browser caches drop the previous
+    upload) and img_w/img_h the original size, which lets the viewer lay
+    out a page before its image arrives. display_rev is None if rendering
+    or any upload failed — the viewer then falls back to encoding the
+    original.
+    """
+    try:
+        variants, (w, h) = _render_display_variants(image_bytes)
+    except Exception as e:
+        log.warning("Display variant render failed for %s: %s", image_path, e)
+        return {"display_rev": None}
+    content_types = {ext: ct for ext, _, ct, _ in _DISPLAY_FORMATS}
+    ok = True
+    for (width, ext), data in variants.items():
+        ok = _put_object(_display_path(image_path, width, ext), data, content_types[ext]) and ok
+    return {"display_rev": uuid.uuid4().hex[:8] if ok else None, "img_w": w, "img_h": h}
+
+
+def _with_rev(url: str, rev: str) -> str:
+    if url.endswith("?"):
+        return f"{url}v={rev}"
+    return f"{url}{'&' if '?' in url else '?'}v={rev}"
+
+
+def display_variants(image_path: str, rev: str | None) -> dict | None:
+    """Public URLs of a page's display variants, or None if it has none.
+
+    {"src": <JPEG url>, "srcset": "<url> 600w, ...", "srcset_webp": "..."}
+    """
+    if not image_path or not rev:
+        return None
+    urls = {(w, ext): _with_rev(_get_image_url(_display_path(image_path, w, ext)), rev)
+            for w in DISPLAY_WIDTHS for ext, *_ in _DISPLAY_FORMATS}
+    return {
+        "src": urls[(DISPLAY_WIDTHS[-1], "jpg")],
+        "srcset": ", ".join(f"{urls[(w, 'jpg')]} {w}w" for w in DISPLAY_WIDTHS),
+        "srcset_webp": ", ".join(f"{urls[(w, 'webp')]} {w}w" for w in DISPLAY_WIDTHS),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Process-wide poster page cache (shared by all Streamlit sessions)
+# ---------------------------------------------------------------------------
+
+POSTER_CACHE_MAX_BYTES = int(os.environ.get("POSTER_CACHE_MB", "256")) * 1024 * 1024
+# Başka replikadaki admin değişikliklerini bu replika görmez; sayfa listesi
+# ve görseller en geç bu sürelerde yeniden okunur.
+POSTER_LIST_TTL = 300
+POSTER_IMAGE_TTL = 3600
+
+
+class _PosterPageCache:
+    """Byte-budgeted LRU of page images + per-week page lists.
+
+    Image keys are (week_id, page_id, image_path, generation). Image paths are
+    deterministic, so a re-upload keeps its path; the per-week generation,
+    bumped by every write through this module, is what retires the old bytes.
+    """
+
+    def __init__(self, max_bytes: int = POSTER_CACHE_MAX_BYTES,
+                 list_ttl: float = POSTER_LIST_TTL, image_ttl: float = POSTER_IMAGE_TTL):
+        self.max_bytes = max_bytes
+        self.list_ttl = list_ttl
+        self.image_ttl = image_ttl
+        self._lock = threading.Lock()
+        self._images: OrderedDict[tuple, tuple[bytes, float]] = OrderedDict()
+        self._bytes = 0
+        self._lists: dict[str, tuple[int, float, list]] = {}
+        self._gen: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, week_id: str) -> int:
+        with self._lock:
+            return self._gen.get(week_id, 0)
+
+    def get_list(self, week_id: str) -> list | None:
+        with self._lock:
+            entry = self._lists.get(week_id)
+            if entry is None:
+                return None
+            gen, ts, rows = entry
+            if gen != self._gen.get(week_id, 0) or time.time() - ts > self.list_ttl:
+                del self._lists[week_id]
+                return None
+            return rows
+
+    def put_list(self, week_id: str, gen: int, rows: list):
+        with self._lock:
+            # Okuma sırasında invalidate edildiyse eski listeyi saklama
+            if gen == self._gen.get(week_id, 0):
+                self._lists[week_id] = (gen, time.time(), rows)
+
+    def get_image(self, key: tuple) -> bytes | None:
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is None or time.time() - entry[1] > self.image_ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put_image(self, key: tuple, data: bytes):
+        if not data or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key[3] != self._gen.get(key[0], 0):
+                return
+            if key in self._images:
+                self._drop(key)
+            self._images[key] = (data, time.time())
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and self._images:
+                self._drop(next(iter(self._images)))
+                self.evictions += 1
+
+    def _drop(self, key: tuple):
+        data, _ = self._images.pop(key)
+        self._bytes -= len(data)
+
+    def invalidate_week(self, week_id: str):
+        """Page images or membership of week_id changed."""
+        with self._lock:
+            self._gen[week_id] = self._gen.get(week_id, 0) + 1
+            self._lists.pop(week_id, None)
+            for key in [k for k in self._images if k[0] == week_id]:
+                self._drop(key)
+            self.invalidations += 1
+
+    def invalidate_lists(self):
+        """Page metadata (title / sort order) changed; images stay valid."""
+        with self._lock:
+            self._lists.clear()
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            for week_id in set(self._gen) | set(self._lists):
+                self._gen[week_id] = self._gen.get(week_id, 0) + 1
+            self._lists.clear()
+            self._images.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "images": len(self._images),
+                "weeks": len(self._lists),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_page_cache = _PosterPageCache()
+# Aynı sayfayı aynı anda açan ziyaretçiler tek indirmeyi paylaşır
+_page_downloads = SingleFlight()
+
+
+def poster_page_cache_stats() -> dict:
+    return _page_cache.stats()
+
+
+def clear_poster_page_cache():
+    _page_cache.clear()
+
+
+class _WeekHotspotCache:
+    """Per-week (flyer_filename, page_no) → PageHotspots grouping.
+
+    Rebuilt only when the week's version changes: every mapping write through
+    this module bumps it (writes that don't know their week bump all weeks).
+    The TTL bounds staleness for writes made by other replicas.
+    """
+
+    def __init__(self, ttl: float = POSTER_LIST_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._weeks: dict[str, tuple[tuple[int, int], float, dict]] = {}
+        self._gen: dict[str, int] = {}
+        self._epoch = 0
+
+    def _version(self, week_id: str) -> tuple[int, int]:
+        return self._epoch, self._gen.get(week_id, 0)
+
+    def get(self, week_id: str, load) -> dict[tuple[str, int], PageHotspots]:
+        with self._lock:
+            version = self._version(week_id)
+            entry = self._weeks.get(week_id)
+            if entry and entry[0] == version and time.time() - entry[1] <= self.ttl:
+                return entry[2]
+        groups = group_mappings(load())
+        with self._lock:
+            # Yükleme sırasında yazma olduysa eski gruplamayı saklama
+            if version == self._version(week_id):
+                self._weeks[week_id] = (version, time.time(), groups)
+        return groups
+
+    def invalidate(self, week_id: str | None = None):
+        with self._lock:
+            if week_id is None:
+                self._epoch += 1
+                self._weeks.clear()
+            else:
+                self._gen[week_id] = self._gen.get(week_id, 0) + 1
+                self._weeks.pop(week_id, None)
+
+
+_hotspot_cache = _WeekHotspotCache()
+
+
+def get_week_hotspots(week_id: str, db_path=None) -> dict[tuple[str, int], PageHotspots]:
+    """A week's mappings grouped per page, as hit-testable hotspot lists.
+
+    Look pages up with poster.hotspot_index.page_hotspots. Shared between
+    sessions — do not mutate.
+    """
+    return _hotspot_cache.get(week_id, lambda: list_all_mappings_for_week(week_id))
+
+
+def _cached_page_image(week_id: str, page_id, image_path: str, gen: int) -> bytes:
+    key = (week_id, page_id, image_path, gen)
+    img = _page_cache.get_image(key)
+    if img is not None:
+        return img
+    try:
+        img = _page_downloads.do(key, lambda: _download_image(image_path))
+    except Exception as e:
+        log.error("Image download failed for %s: %s", image_path, e)
+        return b""
+    _page_cache.put_image(key, img)
+    return img
+
+
 def save_poster_page(
     week_id: str, flyer_filename: str, page_no: int,
     png_data: bytes, title: str = "", sort_order: int = 0,
     db_path=None,
 ):
-    """Save or replace a poster page image."""
+    """Save or replace a poster page image (and its display variants)."""
     image_path = _upload_image(week_id, flyer_filename, page_no, png_data)
-    sb = _get_client()
-    sb.table("poster_pages").upsert({
+    row = {
         "week_id": week_id,
         "flyer_filename": flyer_filename,
         "page_no": page_no,
         "image_path": image_path,
         "title": title,
         "sort_order": sort_order,
-    }, on_conflict="week_id,flyer_filename,page_no").execute()
+    }
+    if _display_rev_column:
+        row.update(_upload_display_variants(image_path, png_data))
+    sb = _get_client()
+    sb.table("poster_pages").upsert(row, on_conflict="week_id,flyer_filename,page_no").execute()
+    _page_cache.invalidate_week(week_id)
+    _weeks_manifest.invalidate()
 
 
 def save_poster_pages_bulk(pages: list[dict], db_path=None):
-    """Save multiple poster pages at once."""
+    """Save multiple poster pages at once.
+
+    Display variants (DISPLAY_WIDTHS, JPEG + WebP) are rendered here, once
+    per upload, so viewers never resize or re-encode on the request path.
+    """
     sb = _get_client()
     _ensure_bucket()
     rows = []
@@ -343,48 +698,96 @@ def save_poster_pages_bulk(pages: list[dict], db_path=None):
             pg["week_id"], pg["flyer_filename"], pg["page_no"],
             pg["png_data"],
         )
-        rows.append({
+        row = {
             "week_id": pg["week_id"],
             "flyer_filename": pg["flyer_filename"],
             "page_no": pg["page_no"],
             "image_path": image_path,
             "title": pg.get("title", ""),
             "sort_order": pg.get("sort_order", 0),
-        })
+        }
+        if _display_rev_column:
+            row.update(_upload_display_variants(image_path, pg["png_data"]))
+        rows.append(row)
     if rows:
         sb.table("poster_pages").upsert(
             rows, on_conflict="week_id,flyer_filename,page_no"
         ).execute()
+    for week_id in {r["week_id"] for r in rows}:
+        _page_cache.invalidate_week(week_id)
+    if rows:
+        _weeks_manifest.invalidate()
+
+
+def _page_columns() -> str:
+    cols = "id, week_id, flyer_filename, page_no, image_path, title, sort_order"
+    return cols + ", display_rev, img_w, img_h" if _display_rev_column else cols
+
+
+def _week_page_rows(week_id: str) -> tuple[int, list[dict]]:
+    """(generation, poster_pages rows) for a week, via the page-list cache."""
+    gen = _page_cache.generation(week_id)
+    rows = _page_cache.get_list(week_id)
+    if rows is None:
+        sb = _get_client()
+        res = (
+            sb.table("poster_pages")
+            .select(_page_columns())
+            .eq("week_id", week_id)
+            .order("sort_order")
+            .order("flyer_filename")
+            .order("page_no")
+            .execute()
+        )
+        rows = res.data or []
+        _page_cache.put_list(week_id, gen, rows)
+    return gen, rows
 
 
 def get_poster_pages(week_id: str, db_path=None) -> list[dict]:
     """Return all poster pages for a week, ordered by sort_order then page_no.
 
-    Downloads images from Storage and adds 'png_data' key for backward compat.
+    Image bytes ('png_data', kept for backward compat) come from the
+    process-wide page cache; only missing pages are downloaded from Storage.
+    The returned bytes are shared between sessions — do not mutate them.
     """
-    sb = _get_client()
-    res = (
-        sb.table("poster_pages")
-        .select("id, week_id, flyer_filename, page_no, image_path, title, sort_order")
-        .eq("week_id", week_id)
-        .order("sort_order")
-        .order("flyer_filename")
-        .order("page_no")
-        .execute()
-    )
+    gen, rows = _week_page_rows(week_id)
     pages = []
-    for r in (res.data or []):
-        try:
-            img_bytes = _download_image(r["image_path"])
-        except Exception as e:
-            log.error("Image download failed for %s: %s", r["image_path"], e)
-            img_bytes = b""
+    for r in rows:
+        pages.append({
+            "id": r["id"],
+            "week_id": r["week_id"],
+            "flyer_filename": r["flyer_filename"],
+            "page_no": r["page_no"],
+            "png_data": _cached_page_image(week_id, r["id"], r["image_path"], gen),
+            "title": r.get("title", ""),
+            "sort_order": r.get("sort_order", 0),
+        })
+    return pages
+
+
+def get_poster_pages_display(week_id: str, db_path=None) -> list[dict]:
+    """Return a week's pages for the viewer, without image work when possible.
+
+    Pages with display variants carry their URLs in 'display' (see
+    display_variants), their original size in 'width'/'height' and an
+    empty 'png_data'. Only pages uploaded before variants existed are
+    downloaded (through the page cache) so the viewer can encode them
+    itself; backfill_display_variants removes that path.
+    """
+    gen, rows = _week_page_rows(week_id)
+    pages = []
+    for r in rows:
+        display = display_variants(r.get("image_path", ""), r.get("display_rev"))
         pages.append({
             "id": r["id"],
             "week_id": r["week_id"],
             "flyer_filename": r["flyer_filename"],
             "page_no": r["page_no"],
-            "png_data": img_bytes,
+            "display": display,
+            "width": r.get("img_w"),
+            "height": r.get("img_h"),
+            "png_data": b"" if display else _cached_page_image(week_id, r["id"], r["image_path"], gen),
             "title": r.get("title", ""),
             "sort_order": r.get("sort_order", 0),
         })
@@ -399,7 +802,7 @@ def get_poster_pages_meta(week_id: str, db_path=None) -> list[dict]:
     sb = _get_client()
     res = (
         sb.table("poster_pages")
-        .select("id, week_id, flyer_filename, page_no, image_path, title, sort_order")
+        .select(_page_columns())
         .eq("week_id", week_id)
         .order("sort_order")
         .order("flyer_filename")
@@ -414,6 +817,8 @@ def get_poster_pages_meta(week_id: str, db_path=None) -> list[dict]:
         "image_path": r.get("image_path", ""),
         "title": r.get("title", ""),
         "sort_order": r.get("sort_order", 0),
+        "display_rev": r.get("display_rev"),
+        "img_w": r.get("img_w"),
     } for r in (res.data or [])]
 
 
@@ -425,6 +830,7 @@ def update_poster_page(page_id: int, fields: dict, db_path=None):
         return
     sb = _get_client()
     sb.table("poster_pages").update(to_set).eq("id", page_id).execute()
+    _page_cache.invalidate_lists()
 
 
 def delete_poster_page(page_id: int, db_path=None, week_id: str = None):
@@ -464,14 +870,18 @@ def delete_poster_page(page_id: int, db_path=None, week_id: str = None):
             .eq("page_no", row["page_no"])
             .execute()
         )
-        # Delete image from storage
+        # Delete image (and its display variants) from storage
         if row.get("image_path"):
             try:
-                sb.storage.from_(BUCKET).remove([row["image_path"]])
+                sb.storage.from_(BUCKET).remove([row["image_path"]] + _display_paths(row["image_path"]))
             except Exception as e:
                 log.warning("Storage delete: %s", e)
     # Delete page record
     sb.table("poster_pages").delete().eq("id", page_id).execute()
+    if res.data:
+        _page_cache.invalidate_week(res.data[0]["week_id"])
+        _hotspot_cache.invalidate(res.data[0]["week_id"])
+        _weeks_manifest.invalidate()
 
 
 def delete_week(week_id: str, db_path=None):
@@ -484,7 +894,10 @@ def delete_week(week_id: str, db_path=None):
         .eq("week_id", week_id)
         .execute()
     )
-    paths = [r["image_path"] for r in (res.data or []) if r.get("image_path")]
+    paths = []
+    for r in res.data or []:
+        if r.get("image_path"):
+            paths += [r["image_path"]] + _display_paths(r["image_path"])
     if paths:
         try:
             sb.storage.from_(BUCKET).remove(paths)
@@ -495,6 +908,40 @@ def delete_week(week_id: str, db_path=None):
     sb.table("mappings").delete().eq("week_id", week_id).execute()
     sb.table("week_products").delete().eq("week_id", week_id).execute()
     sb.table("poster_weeks").delete().eq("week_id", week_id).execute()
+    _page_cache.invalidate_week(week_id)
+    _hotspot_cache.invalidate(week_id)
+    _weeks_manifest.invalidate()
+
+
+def backfill_display_variants(week_id: str, progress_callback=None) -> dict:
+    """Render display variants for pages uploaded before they existed.
+
+    Returns {"total": N, "rendered": M, "skipped": S, "errors": E}
+    """
+    pages = get_poster_pages_meta(week_id)
+    stats = {"total": len(pages), "rendered": 0, "skipped": 0, "errors": 0}
+    if not _display_rev_column:
+        stats["skipped"] = len(pages)
+        return stats
+    todo = [p for p in pages if p["image_path"] and not (p["display_rev"] and p["img_w"])]
+    stats["skipped"] = len(pages) - len(todo)
+    sb = _get_client()
+    for i, pg in enumerate(todo):
+        try:
+            cols = _upload_display_variants(pg["image_path"], _download_image(pg["image_path"]))
+            if cols["display_rev"] is None:
+                stats["errors"] += 1
+            else:
+                sb.table("poster_pages").update(cols).eq("id", pg["id"]).execute()
+                stats["rendered"] += 1
+        except Exception as e:
+            log.error("Display backfill failed for %s: %s", pg["image_path"], e)
+            stats["errors"] += 1
+        if progress_callback:
+            progress_callback(i + 1, len(todo))
+    if stats["rendered"]:
+        _page_cache.invalidate_lists()
+    return stats
 
 
 # ============================================================================
@@ -603,6 +1050,8 @@ def save_mappings_bulk(mappings: list[dict], db_path=None) -> list[int]:
             "created_at": m.get("created_at") or datetime.now(timezone.utc).isoformat(),
         })
     res = sb.table("mappings").insert(rows).execute()
+    for week_id in {r["week_id"] for r in rows}:
+        _hotspot_cache.invalidate(week_id)
     return [r["mapping_id"] for r in (res.data or [])]
 
 
@@ -615,6 +1064,7 @@ def delete_mappings_bulk(mapping_ids: list[int], week_id: str = None, db_path=No
     if week_id:
         q = q.eq("week_id", week_id)
     q.execute()
+    _hotspot_cache.invalidate(week_id or None)
 
 
 def update_mappings_bulk(updates: dict[int, dict], db_path=None):
@@ -639,6 +1089,7 @@ def update_mappings_bulk(updates: dict[int, dict], db_path=None):
         if not to_set:
             continue
         sb.table("mappings").update(to_set).in_("mapping_id", mids).execute()
+    _hotspot_cache.invalidate()
 
 
 def mark_products_mapped_bulk(week_id: str, codes: set[str], mapped: bool = True, db_path=None):
@@ -676,6 +1127,7 @@ def save_week(week_id: str, week_name: str = "", start_date: str = "",
         # sort_order column may not exist yet — retry without it
         row.pop("sort_order", None)
         sb.table("poster_weeks").upsert(row, on_conflict="week_id").execute()
+    _weeks_manifest.invalidate()
 
 
 def get_week(week_id: str, db_path=None) -> dict | None:
@@ -694,6 +1146,7 @@ def update_week_status(week_id: str, status: str, db_path=None):
     """Update week status (draft/published/archived)."""
     sb = _get_client()
     sb.table("poster_weeks").update({"status": status}).eq("week_id", week_id).execute()
+    _weeks_manifest.invalidate()
 
 
 def update_week_sort_order(week_id: str, sort_order: int, db_path=None):
@@ -703,6 +1156,7 @@ def update_week_sort_order(week_id: str, sort_order: int, db_path=None):
         sb.table("poster_weeks").update({"sort_order": sort_order}).eq("week_id", week_id).execute()
     except Exception:
         log.warning("Could not update sort_order for %s — column may not exist yet", week_id)
+    _weeks_manifest.invalidate()
 
 
 def list_weeks_with_meta(db_path=None) -> list[dict]:
@@ -820,7 +1274,15 @@ def list_all_weeks(db_path=None) -> list[str]:
     meta = {}
     for r in (weeks_res.data or []):
         meta[r["week_id"]] = r
+    return _order_week_ids(page_week_ids, meta)
+
+
+def _order_week_ids(page_week_ids, meta: dict[str, dict]) -> list[str]:
+    """Viewer ordering of week ids; meta maps week_id → poster_weeks row.
 
+    sort_order>0 first (ASC, newest first on ties), then unset (0) by newest
+    created_at, then weeks without a poster_weeks row (week_id DESC).
+    """
     # Sort: explicit sort_order>0 first (ASC), then unset (0) by newest created_at
     has_order = []
     no_order = []
@@ -852,6 +1314,96 @@ def list_all_weeks(db_path=None) -> list[str]:
     return [x[-1] for x in has_order] + [wid for _, wid in no_order] + orphans
 
 
+# ---------------------------------------------------------------------------
+# Published weeks manifest — the public viewer's only metadata request
+# ---------------------------------------------------------------------------
+
+class _WeeksManifestCache:
+    """Process-wide copy of the published weeks manifest.
+
+    Week/page writes through this module drop it; the TTL bounds staleness
+    for writes made by other replicas. Concurrent misses share one load.
+    """
+
+    def __init__(self, ttl: float = POSTER_LIST_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._entry: tuple[int, float, dict] | None = None
+        self._gen = 0
+
+    def get(self, load) -> dict:
+        with self._lock:
+            gen, entry = self._gen, self._entry
+            if entry and entry[0] == gen and time.time() - entry[1] <= self.ttl:
+                return entry[2]
+        manifest = self._flight.do(gen, load)
+        with self._lock:
+            if gen == self._gen:
+                self._entry = (gen, time.time(), manifest)
+        return manifest
+
+    def invalidate(self):
+        with self._lock:
+            self._gen += 1
+            self._entry = None
+
+
+_weeks_manifest = _WeeksManifestCache()
+
+
+def _manifest_version(weeks: list[dict]) -> str:
+    # RPC ile aynı özet: sıra + ad + sort_order + sayfa sayısı
+    text = "|".join(
+        f'{w["week_id"]}:{w["week_name"]}:{w["sort_order"]}:{w["page_count"]}' for w in weeks
+    )
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def _load_weeks_manifest() -> dict:
+    sb = _get_client()
+    try:
+        res = sb.rpc("published_weeks_manifest", {}).execute()
+        if isinstance(res.data, dict) and "weeks" in res.data:
+            return res.data
+    except Exception as e:
+        log.warning("published_weeks_manifest RPC unavailable, falling back: %s", e)
+
+    # RPC kurulu değil — 2 sorgu (poster_pages.week_id + poster_weeks).
+    # PostgREST satır limiti sayfa sayılarını kırpabilir; sadece gösterim içindir.
+    page_counts: dict[str, int] = {}
+    for r in sb.table("poster_pages").select("week_id").execute().data or []:
+        page_counts[r["week_id"]] = page_counts.get(r["week_id"], 0) + 1
+    meta = {r["week_id"]: r for r in (sb.table("poster_weeks").select("*").execute().data or [])}
+    weeks = []
+    for wid in _order_week_ids(page_counts, meta):
+        m = meta.get(wid)
+        # poster_weeks kaydı olmayan hafta görünür (geriye uyum)
+        if m is not None and m.get("status") != "published":
+            continue
+        weeks.append({
+            "week_id": wid,
+            "week_name": (m.get("week_name") if m else None) or wid,
+            "status": m.get("status") if m else None,
+            "sort_order": (m.get("sort_order") if m else None) or 0,
+            "page_count": page_counts[wid],
+        })
+    return {"version": _manifest_version(weeks), "weeks": weeks}
+
+
+def get_published_weeks_manifest(db_path=None) -> dict:
+    """Weeks visible on the public viewer, in display order, in one request.
+
+    Returns {"version": str, "weeks": [{week_id, week_name, status,
+    sort_order, page_count}, ...]}. Weeks with pages are listed when they
+    are published or have no poster_weeks row (backward compat). version
+    is a content hash and changes whenever the list, names, order or page
+    counts change. Served from a process-wide cache that publish/unpublish
+    and other week/page writes drop.
+    """
+    return _weeks_manifest.get(_load_weeks_manifest)
+
+
 def list_mappings_for_week(
     week_id: str, flyer_filename: str, page_no: int, db_path=None,
 ) -> list[dict]:
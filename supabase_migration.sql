@@ -32,6 +32,9 @@ CREATE TABLE IF NOT EXISTS poster_pages (
     image_path     TEXT NOT NULL DEFAULT '',
     title          TEXT DEFAULT '',
     sort_order     INTEGER DEFAULT 0,
+    display_rev    TEXT,            -- set when 600/1200px JPEG+WebP variants are uploaded
+    img_w          INTEGER,         -- original page size, for layout before the image loads
+    img_h          INTEGER,
     UNIQUE(week_id, flyer_filename, page_no)
 );
 
@@ -64,6 +67,53 @@ CREATE TABLE IF NOT EXISTS poster_weeks (
 
 -- Migration: add sort_order if table already exists without it
 ALTER TABLE poster_weeks ADD COLUMN IF NOT EXISTS sort_order INTEGER DEFAULT 0;
+ALTER TABLE poster_pages ADD COLUMN IF NOT EXISTS display_rev TEXT;
+ALTER TABLE poster_pages ADD COLUMN IF NOT EXISTS img_w INTEGER;
+ALTER TABLE poster_pages ADD COLUMN IF NOT EXISTS img_h INTEGER;
+
+-- 5. Public viewer manifest (storage.get_published_weeks_manifest)
+-- Sayfası olan ve yayında (ya da poster_weeks kaydı olmayan — geriye uyum)
+-- haftalar, list_all_weeks sıralamasıyla, tek çağrıda. version içerik
+-- özetidir (sıra + ad + sort_order + sayfa sayısı).
+CREATE OR REPLACE FUNCTION published_weeks_manifest()
+RETURNS jsonb
+LANGUAGE sql STABLE AS $$
+    WITH pages AS (
+        SELECT week_id, COUNT(*) AS page_count FROM poster_pages GROUP BY week_id
+    ), weeks AS (
+        SELECT p.week_id,
+               COALESCE(NULLIF(w.week_name, ''), p.week_id) AS week_name,
+               w.status,
+               COALESCE(w.sort_order, 0) AS sort_order,
+               w.created_at,
+               p.page_count,
+               (w.week_id IS NULL) AS orphan
+        FROM pages p
+        LEFT JOIN poster_weeks w USING (week_id)
+        WHERE w.week_id IS NULL OR w.status = 'published'
+    ), ordered AS (
+        SELECT *, ROW_NUMBER() OVER (ORDER BY
+            orphan,
+            (sort_order > 0) DESC,
+            CASE WHEN sort_order > 0 THEN sort_order END,
+            created_at DESC NULLS LAST,
+            week_id DESC
+        ) AS rn
+        FROM weeks
+    )
+    SELECT jsonb_build_object(
+        'version', md5(COALESCE(string_agg(
+            week_id || ':' || week_name || ':' || sort_order || ':' || page_count, '|' ORDER BY rn), '')),
+        'weeks', COALESCE(jsonb_agg(jsonb_build_object(
+            'week_id', week_id,
+            'week_name', week_name,
+            'status', status,
+            'sort_order', sort_order,
+            'page_count', page_count
+        ) ORDER BY rn), '[]'::jsonb)
+    )
+    FROM ordered;
+$$;
 
 -- Storage bucket for poster images (run via Supabase dashboard or API)
 -- INSERT INTO storage.buckets (id, name, public) VALUES ('poster-images', 'poster-images', true);
@@ -0,0 +1,59 @@
+import threading
+
+from arama import artifact
+from arama.artifact import VersiyonluNesne
+
+
+def _yayinla(data_dir, icerik):
+    v = artifact.yeni_versiyon_dizini(data_dir)
+    (v / "oneri_listesi.json").write_text(icerik)
+    artifact.yayinla(v, data_dir, sakla=2)
+    return v
+
+
+def test_current_pointer_and_pruning(tmp_path):
+    assert artifact.artifact_yolu("oneri_listesi.json", tmp_path) == tmp_path / "oneri_listesi.json"
+    v1 = _yayinla(tmp_path, "1")
+    assert artifact.aktif_versiyon(tmp_path) == v1.name
+    assert artifact.artifact_yolu("oneri_listesi.json", tmp_path).read_text() == "1"
+    _yayinla(tmp_path, "2")
+    v3 = _yayinla(tmp_path, "3")
+    assert artifact.artifact_yolu("oneri_listesi.json", tmp_path).read_text() == "3"
+    assert artifact.versiyon_bilgisi(tmp_path)["saklanan"][-1] == v3.name
+    assert len(artifact.versiyon_bilgisi(tmp_path)["saklanan"]) == 2
+    assert not v1.exists()
+
+
+def test_swap_happens_in_background():
+    izin = threading.Event()
+
+    def kur(anahtar):
+        if anahtar == "v2":
+            izin.wait(2)
+        return f"index-{anahtar}"
+
+    nesne = VersiyonluNesne("test", kur)
+    assert nesne.get("v1") == "index-v1"      # ilk yükleme senkron
+    assert nesne.get("v2") == "index-v1"      # yeni versiyon kurulurken eskisi döner
+    izin.set()
+    for _ in range(200):
+        if nesne.get("v2") == "index-v2":
+            break
+        threading.Event().wait(0.01)
+    assert nesne.get("v2") == "index-v2"
+
+
+def test_failed_build_keeps_old_and_is_not_retried():
+    cagri = []
+
+    def kur(anahtar):
+        cagri.append(anahtar)
+        if anahtar == "bozuk":
+            raise ValueError(anahtar)
+        return anahtar
+
+    nesne = VersiyonluNesne("test", kur)
+    nesne.get("v1")
+    assert nesne.reload("bozuk") == "v1"
+    assert nesne.get("bozuk") == "v1"
+    assert cagri == ["v1", "bozuk"]
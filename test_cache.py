@@ -0,0 +1,36 @@
+import pandas as pd
+
+from arama.cache import SonucCache, _df_boyut
+
+df = pd.DataFrame({"urun_kod": ["1", "2"], "stok_adet": [1, 0]})
+
+
+def test_hit_miss_and_stamp_invalidation():
+    damga = ["gun-1"]
+    cache = SonucCache(damga_fn=lambda: damga[0])
+    assert cache.get("klima") is None
+    cache.put("klima", df, "")
+    assert cache.get("klima")[0] is df
+    damga[0] = "gun-2"
+    assert cache.get("klima") is None
+    s = cache.stats()
+    assert (s["hits"], s["misses"], s["invalidations"]) == (1, 2, 1)
+
+
+def test_byte_budget_evicts_least_recent():
+    cache = SonucCache(max_bytes=_df_boyut(df) * 2, damga_fn=lambda: 0)
+    cache.put("a", df)
+    cache.put("b", df)
+    cache.get("a")
+    cache.put("c", df)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_ttl_expiry():
+    cache = SonucCache(ttl=-1, damga_fn=lambda: 0)
+    cache.put("a", df, "uyari")
+    assert cache.get("a") is None
+    # Kısıtlı modda süresi dolmuş sonuç hâlâ verilebilir
+    bayat_df, uyari, yas = cache.bayat_getir("a")
+    assert bayat_df is df and uyari == "uyari" and yas >= 0
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from arama import fallback
+from arama.fallback import fallback_sorgulari, ilk_sonuc
+
+
+def test_variants_keep_legacy_priority_order():
+    assert fallback_sorgulari("seg klima 18000 btu") == [
+        "seg 18000", "seg", "18000", "seg klima 18 btu", "klima",
+    ]
+    assert fallback_sorgulari("waffle makine") == ["waffle"]
+    assert fallback_sorgulari("tv") == []
+
+
+def test_highest_priority_non_empty_wins():
+    gecikme = {"a": 0.15, "b": 0.0, "c": 0.0}
+    sonuc = {"a": [], "b": [{"id": "b"}], "c": [{"id": "c"}]}
+
+    def rpc(terim):
+        time.sleep(gecikme[terim])
+        return sonuc[terim]
+
+    assert ilk_sonuc(["a", "b", "c"], rpc) == ("b", [{"id": "b"}])
+
+
+def test_errors_count_as_empty():
+    def rpc(terim):
+        if terim == "a":
+            raise RuntimeError("canceling statement due to statement timeout (57014)")
+        return [terim]
+
+    assert ilk_sonuc(["a", "b"], rpc) == ("b", ["b"])
+    assert ilk_sonuc([], rpc) is None
+
+
+def test_inflight_rpcs_are_capped():
+    aktif = 0
+    en_fazla = 0
+    lock = threading.Lock()
+
+    def rpc(terim):
+        nonlocal aktif, en_fazla
+        with lock:
+            aktif += 1
+            en_fazla = max(en_fazla, aktif)
+        time.sleep(0.02)
+        with lock:
+            aktif -= 1
+        return []
+
+    threads = [threading.Thread(target=ilk_sonuc, args=([f"t{i}" for i in range(5)], rpc)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert en_fazla <= fallback.MAX_INFLIGHT
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from arama.gruplama import fiyat_metni, magaza_kayitlari, sonucu_grupla
+
+
+def test_fiyat_metni():
+    assert fiyat_metni(1234.5) == "1.234,50 ₺"
+    assert fiyat_metni(0) == ""
+    assert fiyat_metni(np.nan) == ""
+    assert fiyat_metni(None) == ""
+
+
+def test_sonucu_grupla_ilk_n_urun():
+    df = pd.DataFrame({
+        "urun_kod": [f"{i}" for i in range(50)],
+        "urun_ad": ["" if i == 3 else f"ÜRÜN {i}" for i in range(50)],
+        "stoklu_magaza": range(50),
+        "toplam_stok": range(50),
+        "max_stok": range(50),
+        "birim_fiyat": [np.nan] + [10.0] * 49,
+    })
+    sonuc = sonucu_grupla(df, top_n=40)
+    assert sonuc["toplam"] == 50
+    assert len(sonuc["urunler"]) == 40
+    assert sonuc["urunler"][0]["fiyat_str"] == ""
+    assert sonuc["urunler"][1] == {
+        "urun_kod": "1", "urun_ad": "ÜRÜN 1", "stoklu_magaza": 1, "toplam_stok": 1, "fiyat_str": "10,00 ₺",
+        "stok_bilinmiyor": False,
+    }
+    assert sonuc["urunler"][3]["urun_ad"] == "3"
+    assert sonucu_grupla(df.iloc[:0]) == {"toplam": 0, "urunler": [], "magaza_html": {}}
+
+
+def test_magaza_kayitlari():
+    df = pd.DataFrame({"magaza_kod": ["M1", "M2"], "magaza_ad": ["A", None], "stok_adet": [7, 2],
+                       "urun_kod": ["1", "1"]})
+    assert magaza_kayitlari(df) == [
+        {"magaza_kod": "M1", "magaza_ad": "A", "stok_adet": 7},
+        {"magaza_kod": "M2", "magaza_ad": None, "stok_adet": 2},
+    ]
+    assert magaza_kayitlari(df.iloc[:0]) == []
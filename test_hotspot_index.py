@@ -0,0 +1,54 @@
+import random
+
+import storage
+from poster.hotspot_index import HotspotGrid, group_mappings, page_hotspots
+
+
+def _m(fn, pno, x0, y0, x1, y1, kod):
+    return {"flyer_filename": fn, "page_no": pno, "x0": x0, "y0": y0, "x1": x1, "y1": y1, "urun_kodu": kod}
+
+
+def test_gruplama_ve_tiklama():
+    gruplar = group_mappings([
+        _m("a.pdf", 1, 0.0, 0.0, 0.5, 0.5, "BUYUK"),
+        _m("a.pdf", 1, 0.1, 0.1, 0.2, 0.2, "KUCUK"),
+        _m("a.pdf", 2, 0.6, 0.6, 0.9, 0.9, None),
+    ])
+    s1 = page_hotspots(gruplar, "a.pdf", 1)
+    assert len(s1) == 2 and len(page_hotspots(gruplar, "b.pdf", 1)) == 0
+    # İç içe kutularda en küçüğü kazanır
+    assert s1.hit(0.15, 0.15)["urun_kodu"] == "KUCUK"
+    assert s1.hit(0.4, 0.4)["urun_kodu"] == "BUYUK"
+    assert s1.hit(0.7, 0.7) is None and s1.hit(1.5, 0.1) is None
+    s2 = page_hotspots(gruplar, "a.pdf", 2)
+    # Public liste sadece kutu + kod taşır; admin önizleme "?" ve popup alanlarını gösterir
+    assert s2.hotspots == [{"x0": 0.6, "y0": 0.6, "x1": 0.9, "y1": 0.9, "urun_kodu": ""}]
+    assert s2.admin_hotspots[0]["urun_kodu"] == "?" and "urun_ad" in s2.admin_hotspots[0]
+
+
+def test_grid_kaba_tarama_ile_ayni():
+    rnd = random.Random(3)
+    kutular = []
+    for _ in range(400):
+        x, y = rnd.random() * 0.95, rnd.random() * 0.95
+        kutular.append((x, y, x + rnd.random() * 0.05, y + rnd.random() * 0.05))
+    grid = HotspotGrid(kutular)
+    for _ in range(2000):
+        px, py = rnd.random(), rnd.random()
+        icerenler = [i for i, (x0, y0, x1, y1) in enumerate(kutular) if x0 <= px <= x1 and y0 <= py <= y1]
+        beklenen = min(icerenler, key=lambda i: (kutular[i][2] - kutular[i][0]) * (kutular[i][3] - kutular[i][1]),
+                       default=None)
+        assert grid.hit(px, py) == beklenen
+
+
+def test_hafta_cache_yazmada_duser(monkeypatch):
+    yuklenen = []
+    monkeypatch.setattr(storage, "_hotspot_cache", storage._WeekHotspotCache())
+    monkeypatch.setattr(storage, "list_all_mappings_for_week",
+                        lambda w: yuklenen.append(w) or [_m("a.pdf", 1, 0, 0, 1, 1, "X")])
+    ilk = storage.get_week_hotspots("w1")
+    assert storage.get_week_hotspots("w1") is ilk and yuklenen == ["w1"]
+    storage._hotspot_cache.invalidate("w2")
+    assert storage.get_week_hotspots("w1") is ilk
+    storage._hotspot_cache.invalidate()
+    assert storage.get_week_hotspots("w1") is not ilk and yuklenen == ["w1", "w1"]
@@ -0,0 +1,74 @@
+import pytest
+
+from arama.koruma import ACIK, KAPALI, YARI_ACIK, KorumaAcik, RpcKoruma
+
+
+class _Saat:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def _hata():
+    raise RuntimeError("57014 statement timeout")
+
+
+def test_basari_siniri_artirir_hata_yariya_indirir():
+    saat = _Saat()
+    k = RpcKoruma(baslangic=4, saat=saat)
+    for _ in range(4):
+        k.cagir(lambda: 1)
+    assert k.limit == pytest.approx(5, abs=0.1)
+    with pytest.raises(RuntimeError):
+        k.cagir(_hata)
+    assert k.limit == pytest.approx(2.5, abs=0.1)
+    # Aynı saniyedeki ikinci hata bir daha yarıya indirmez
+    with pytest.raises(RuntimeError):
+        k.cagir(_hata)
+    assert k.limit == pytest.approx(2.5, abs=0.1)
+
+
+def test_sinir_doluysa_reddedilir():
+    k = RpcKoruma(baslangic=1, bekleme=0.01)
+    with pytest.raises(KorumaAcik) as e:
+        k.cagir(lambda: k.cagir(lambda: 1))
+    assert e.value.neden == "limit"
+    assert k.ucusta == 0
+
+
+def test_devre_acilir_ve_deneme_ile_kapanir():
+    saat = _Saat()
+    k = RpcKoruma(esik=3, acik_sure=10, saat=saat)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            k.cagir(_hata)
+    assert k.durum == ACIK
+    with pytest.raises(KorumaAcik) as e:
+        k.cagir(lambda: 1)
+    assert e.value.neden == "devre"
+
+    saat.t += 11
+    # Yarı açık: deneme başarısız → yeniden açık
+    with pytest.raises(RuntimeError):
+        k.cagir(_hata)
+    assert k.durum == ACIK
+
+    saat.t += 11
+    sonuc = []
+    # Deneme sürerken gelen ikinci çağrı reddedilir
+    def _deneme():
+        assert k.durum == YARI_ACIK
+        with pytest.raises(KorumaAcik):
+            k.cagir(lambda: 1)
+        return "ok"
+    sonuc.append(k.cagir(_deneme))
+    assert sonuc == ["ok"] and k.durum == KAPALI
+
+
+def test_sayilmayan_hata_devreyi_acmaz():
+    k = RpcKoruma(esik=1, hata_sayilir=lambda e: "PGRST202" not in str(e))
+    with pytest.raises(RuntimeError):
+        k.cagir(lambda: (_ for _ in ()).throw(RuntimeError("PGRST202")))
+    assert k.durum == KAPALI and k.hatalar == 0
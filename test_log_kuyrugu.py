@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from arama.log_kuyrugu import AramaLogKuyrugu, KismiYazim
+
+ZAMAN = datetime(2026, 10, 18, 11, 0, 0)
+
+
+class Yazici:
+    def __init__(self, hata=0):
+        self.batchler = []
+        self.hata = hata
+
+    def __call__(self, kayitlar):
+        if self.hata:
+            self.hata -= 1
+            raise RuntimeError("db yok")
+        self.batchler.append([dict(k) for k in kayitlar])
+
+
+def test_ayni_terim_tek_kayitta_toplanir():
+    yaz = Yazici()
+    k = AramaLogKuyrugu(yaz, aralik=3600)
+    for sonuc in (3, 5, 4):
+        k.ekle("mama", sonuc, ZAMAN)
+    k.ekle("tv", 0, ZAMAN)
+    assert k.flush() == 2
+    mama = next(r for r in yaz.batchler[0] if r["arama_terimi"] == "mama")
+    assert mama == {"tarih": "2026-10-18", "arama_terimi": "mama", "adet": 3,
+                    "sonuc_sayisi": 4, "son_arama_zamani": ZAMAN.isoformat()}
+    assert k.stats()["bekleyen"] == 0
+    assert k.flush() == 0
+
+
+def test_hata_sonrasi_kayitlar_geri_katilir():
+    yaz = Yazici(hata=1)
+    k = AramaLogKuyrugu(yaz, aralik=3600)
+    k.ekle("mama", 2, ZAMAN)
+    assert k.flush() == 0
+    k.ekle("mama", 7, ZAMAN)
+    assert k.stats()["hatalar"] == 1
+    assert k.flush() == 1
+    assert yaz.batchler == [[{"tarih": "2026-10-18", "arama_terimi": "mama", "adet": 2,
+                              "sonuc_sayisi": 7, "son_arama_zamani": ZAMAN.isoformat()}]]
+
+
+def test_batch_siniri_ve_kapatirken_bosaltma():
+    yaz = Yazici()
+    k = AramaLogKuyrugu(yaz, aralik=3600, max_batch=4)
+    for i in range(10):
+        k.ekle(f"terim {i}", 1, ZAMAN)
+    k.kapat()
+    assert [len(b) for b in yaz.batchler] == [4, 4, 2]
+    assert k.stats()["yazilan"] == 10
+
+
+def test_bekleyen_siniri():
+    k = AramaLogKuyrugu(Yazici(), aralik=3600, max_bekleyen=2)
+    for terim in ("a1", "b2", "c3", "a1"):
+        k.ekle(terim, 1, ZAMAN)
+    st = k.stats()
+    assert (st["bekleyen"], st["bekleyen_arama"], st["dusurulen"]) == (2, 3, 1)
+    k.kapat()
+
+
+def test_kismi_yazimda_sadece_yazilamayanlar_geri_katilir():
+    yazilan = []
+
+    def yaz(kayitlar):
+        for i, kayit in enumerate(kayitlar):
+            if kayit["arama_terimi"] == "tv":
+                raise KismiYazim(kayitlar[i:], RuntimeError("db yok"))
+            yazilan.append(kayit["arama_terimi"])
+
+    k = AramaLogKuyrugu(yaz, aralik=3600)
+    for terim in ("mama", "tv", "kedi"):
+        k.ekle(terim, 1, ZAMAN)
+    assert k.flush() == 0
+    st = k.stats()
+    assert yazilan == ["mama"] and (st["bekleyen"], st["yazilan"]) == (2, 1)
+    k.kapat()
+
+
+def test_geri_katma_bekleyen_sinirina_uyar():
+    def yaz(kayitlar):
+        # Yazma sürerken boşalan yere yeni terimler girer; geri katılanlar sığmaz
+        k.ekle("c3", 1, ZAMAN)
+        k.ekle("d4", 1, ZAMAN)
+        raise RuntimeError("db yok")
+
+    k = AramaLogKuyrugu(yaz, aralik=3600, max_bekleyen=2)
+    k.ekle("a1", 1, ZAMAN)
+    k.ekle("b2", 1, ZAMAN)
+    k.ekle("b2", 1, ZAMAN)
+    assert k.flush() == 0
+    st = k.stats()
+    assert (st["bekleyen"], st["bekleyen_arama"], st["dusurulen"]) == (2, 2, 3)
+    k.kapat(timeout=0.1)
@@ -0,0 +1,41 @@
+import pytest
+
+from arama import metrikler
+
+
+@pytest.fixture(autouse=True)
+def temiz():
+    metrikler.sifirla()
+    metrikler.etkinlestir(True)
+    yield
+    metrikler.sifirla()
+    metrikler.etkinlestir(True)
+
+
+def test_yuzdelikler():
+    for ms in range(1, 101):
+        metrikler.kaydet("skor", float(ms))
+    (ozet,) = metrikler.asama_ozeti()
+    assert ozet["adet"] == 100
+    assert ozet["p50_ms"] == 50
+    assert ozet["p95_ms"] == 95
+    assert ozet["p99_ms"] == 99
+    assert ozet["max_ms"] == 100
+
+
+def test_olc_hatayi_sayar_ve_yukari_iletir():
+    with pytest.raises(ValueError):
+        with metrikler.olc("rpc:x"):
+            raise ValueError
+    assert [a["ad"] for a in metrikler.asama_ozeti()] == ["rpc:x"]
+    assert metrikler.sayaclar() == {"hata": {"rpc:x": 1}}
+
+
+def test_kapaliyken_kayit_yok():
+    metrikler.etkinlestir(False)
+    with metrikler.olc("skor"):
+        pass
+    metrikler.say("timeout", "hizli_urun_ara_ozet")
+    assert metrikler.olc("a") is metrikler.olc("b")
+    assert metrikler.asama_ozeti() == []
+    assert metrikler.sayaclar() == {}
@@ -0,0 +1,156 @@
+import pytest
+
+from arama import motor
+from arama.cache import get_sonuc_cache
+
+
+class _Client:
+    """client.rpc(fn, params).execute().data — çağrıları kaydeder."""
+
+    def __init__(self, cevap):
+        self.cevap = cevap
+        self.cagrilar = []
+
+    def rpc(self, fn, params):
+        self.cagrilar.append(fn)
+        client = self
+
+        class _Istek:
+            def execute(self):
+                sonuc = client.cevap(fn, params)
+                if isinstance(sonuc, Exception):
+                    raise sonuc
+                return type("Yanit", (), {"data": sonuc})()
+
+        return _Istek()
+
+
+def _ozet(kod, ad, stok):
+    return {"out_urun_kod": kod, "out_urun_ad": ad, "out_stoklu_magaza": 1 if stok else 0,
+            "out_toplam_stok": stok, "out_max_stok": stok, "out_birim_fiyat": 10}
+
+
+@pytest.fixture(autouse=True)
+def temiz(monkeypatch):
+    monkeypatch.setattr(motor, "_yerel_aday_kodlar", lambda sorgu, kod_mu: [])
+    monkeypatch.setattr(motor, "_oneri_ad_to_kod", lambda metin: "")
+    monkeypatch.setattr(motor, "_yazim_duzelt", lambda sorgu: sorgu)
+    monkeypatch.setattr(motor, "_ozet_rpc_yok", set())
+    get_sonuc_cache().clear()
+    yield
+    get_sonuc_cache().clear()
+
+
+def test_sonuc_cachelenir():
+    client = _Client(lambda fn, p: [_ozet("1", "Termos Kale", 3)])
+    df, uyari, hata = motor.ara(client, "termos")
+    assert (list(df["urun_kod"]), uyari, hata) == (["1"], "", None)
+    motor.ara(client, "Termos")
+    assert client.cagrilar == ["hizli_urun_ara_ozet"]
+
+
+def test_timeout_cachelenmez():
+    client = _Client(lambda fn, p: RuntimeError("57014 canceling statement due to statement timeout"))
+    df, uyari, hata = motor.ara(client, "kale")
+    assert df.empty and uyari == motor.UYARI_SONUC_YOK and hata == "timeout"
+    assert get_sonuc_cache().get("kale") is None
+
+
+def test_fallback_varyanti():
+    def cevap(fn, p):
+        return [_ozet("2", "Seg Klima", 5)] if p["arama_terimi"] == "seg" else []
+
+    df, _, hata = motor.ara(_Client(cevap), "seg klima")
+    assert list(df["urun_kod"]) == ["2"] and hata is None
+
+
+def test_ozet_rpc_yoksa_satirlardan_ozet():
+    def cevap(fn, p):
+        if fn.endswith("_ozet"):
+            return RuntimeError("PGRST202 Could not find the function")
+        return [{"out_urun_kod": "3", "out_urun_ad": "Mama", "out_magaza_kod": "M1",
+                 "out_stok_adet": 4, "out_birim_fiyat": 5}]
+
+    df, _, hata = motor.ara(_Client(cevap), "mama")
+    assert list(df["stoklu_magaza"]) == [1] and hata is None
+
+
+def test_devre_acikken_kisitli_sonuc(monkeypatch):
+    from arama.koruma import RpcKoruma
+    from arama.urun_index import UrunIndex
+    import arama.urun_index as urun_index
+
+    koruma = RpcKoruma(esik=1)
+    monkeypatch.setattr(motor, "_koruma", koruma)
+    index = UrunIndex(["5", "6"], ["kedi mama", "kopek mama"], ["KEDİ MAMA", "KÖPEK MAMA"], [10.0, 12.0])
+    monkeypatch.setattr(motor, "_yerel_aday_kodlar", lambda sorgu, kod_mu: index.ara(sorgu))
+    monkeypatch.setattr(urun_index, "get_urun_index", lambda: index)
+
+    client = _Client(lambda fn, p: RuntimeError("57014 statement timeout"))
+    motor.ara(client, "mama")
+    cagri = len(client.cagrilar)
+    # Devre açık: veritabanına gitmeden yerel index'ten, stok bilgisi olmadan
+    df, _, hata = motor.ara(client, "kedi mama")
+    assert len(client.cagrilar) == cagri
+    assert hata == "koruma"
+    assert list(df["urun_kod"]) == ["5"] and df["stoklu_magaza"].isna().all()
+
+
+def test_yazim_duzeltme_ilk_rpcden_once(monkeypatch):
+    duzeltme = {"tencerr": "tencere", "avize": "alize", "nutella": "nutela"}
+    monkeypatch.setattr(motor, "_yazim_duzelt", lambda sorgu: duzeltme.get(sorgu, sorgu))
+    # Yerel index "avize"yi tanıyor: düzeltilmeden aranır
+    monkeypatch.setattr(motor, "_yerel_aday_kodlar", lambda sorgu, kod_mu: ["8"] if sorgu == "avize" else [])
+    terimler = []
+
+    def cevap(fn, p):
+        terimler.append(p.get("arama_terimi") or p.get("p_urun_kodlari"))
+        if fn == "urun_kodlari_ozet":
+            return [_ozet("8", "Avize", 1)]
+        sonuclar = {"tencere": [_ozet("7", "Tencere", 2)], "nutella": [_ozet("9", "Nutella", 3)]}
+        return sonuclar.get(p["arama_terimi"], [])
+
+    df, uyari, _ = motor.ara(_Client(cevap), "avize")
+    assert list(df["urun_kod"]) == ["8"] and uyari == "" and terimler == [["8"]]
+
+    # Index'te aday yok: düzeltilmiş sorgu ilk RPC'de bulunur, kaskad çalışmaz
+    terimler.clear()
+    df, uyari, hata = motor.ara(_Client(cevap), "tencerr")
+    assert terimler == ["tencere"] and list(df["urun_kod"]) == ["7"] and hata is None
+    assert uyari == motor.UYARI_DUZELTME.format(duzeltilmis="tencere")
+
+    # Düzeltme ıskalarsa yazıldığı gibi aranır (kaskaddan önce)
+    terimler.clear()
+    df, uyari, _ = motor.ara(_Client(cevap), "nutella")
+    assert terimler == ["nutela", "nutella"] and list(df["urun_kod"]) == ["9"] and uyari == ""
+
+
+def test_genis_aday_kumesi_parcalarla_kod_ozetine_gider(monkeypatch):
+    monkeypatch.setattr(motor, "KOD_PARCASI", 2)
+    monkeypatch.setattr(motor, "_yerel_aday_kodlar", lambda sorgu, kod_mu: ["1", "2", "3", "4", "5"])
+    parcalar = []
+
+    def cevap(fn, p):
+        parcalar.append(p.get("p_urun_kodlari"))
+        return [_ozet(kod, f"Mama {kod}", 1) for kod in p["p_urun_kodlari"]]
+
+    client = _Client(cevap)
+    df, _, hata = motor.ara(client, "mama")
+    assert client.cagrilar == ["urun_kodlari_ozet"] * 3
+    assert parcalar == [["1", "2"], ["3", "4"], ["5"]]
+    assert sorted(df["urun_kod"]) == ["1", "2", "3", "4", "5"] and hata is None
+
+
+def test_sinir_reddi_kisitli_moda_gecmez(monkeypatch):
+    from arama.koruma import KorumaAcik
+
+    class _DoluSinir:
+        def cagir(self, fn):
+            raise KorumaAcik("limit")
+
+    # Sınır dolu ama devre kapalı: kısıtlı moda geçilmez, sonuç cache'lenmez
+    monkeypatch.setattr(motor, "_koruma", _DoluSinir())
+    monkeypatch.setattr(motor, "kisitli_sonuc", lambda sorgu: pytest.fail("kısıtlı mod"))
+    df, _, hata = motor.ara(_Client(lambda fn, p: []), "mama")
+    assert df.empty and hata == "mesgul"
+    assert get_sonuc_cache().get("mama") is None
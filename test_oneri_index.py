@@ -0,0 +1,49 @@
+from arama.oneri_index import MAX_ONERI, OneriIndex
+
+ONERILER = [
+    "25004470 - KEDİ MAMASI KURU 1.5 KG - 525",
+    "26047452 - MAMA TABAĞI FİL - 29.50",
+    "25001896 - KEDİ MAMASI YAŞ 400 G - 164.95",
+    "22002258 - BULAŞIK MAKİNESİ TUZU 1,3 KG - 124.90",
+    "19000886 - AYÇİÇEK YAĞI 1,25 L - 205",
+    "MAMA",
+]
+
+
+def test_tiers_then_frequency_order():
+    idx = OneriIndex(ONERILER)
+    assert idx.tamamla("mama") == [
+        "MAMA",                                 # tam eşleşme
+        "26047452 - MAMA TABAĞI FİL - 29.50",   # ad başı
+        "25004470 - KEDİ MAMASI KURU 1.5 KG - 525",  # kelime başı, liste sırası
+        "25001896 - KEDİ MAMASI YAŞ 400 G - 164.95",
+    ]
+
+
+def test_normalized_prefix_infix_and_code():
+    idx = OneriIndex(ONERILER)
+    assert idx.tamamla("Ayçiçek")[0].startswith("19000886")
+    assert idx.tamamla("makinesi")[0].startswith("22002258")
+    assert idx.tamamla("ciçek") == ["19000886 - AYÇİÇEK YAĞI 1,25 L - 205"]  # ad içinde
+    assert idx.tamamla("2500") == [ONERILER[0], ONERILER[2]]
+    assert idx.tamamla("k") == []
+
+
+def test_bounded_payload_and_stats():
+    idx = OneriIndex([f"{i} - URUN {i}" for i in range(100)])
+    assert len(idx.tamamla("urun", k=50)) == MAX_ONERI
+    s = idx.stats()
+    assert s["lookups"] == 1 and s["max_ms"] >= s["avg_ms"] >= 0
+
+
+def test_ad_to_kod():
+    idx = OneriIndex(ONERILER)
+    assert idx.ad_to_kod("KEDİ MAMASI KURU 1.5 KG") == "25004470"
+
+
+def test_infix_trigram_index():
+    idx = OneriIndex(ONERILER + ["30000470 - FİLTRE KAHVE - 99"])
+    assert idx.tamamla("abağ") == ["26047452 - MAMA TABAĞI FİL - 29.50"]
+    assert idx.tamamla("470") == ["25004470 - KEDİ MAMASI KURU 1.5 KG - 525",
+                                   "30000470 - FİLTRE KAHVE - 99"]
+    assert idx.tamamla("mbx") == []
@@ -0,0 +1,161 @@
+"""urun_master_pipeline paralel fetch testleri (sahte Supabase istemcisiyle)."""
+
+import hashlib
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import urun_master_pipeline as pipeline
+
+
+class _Sorgu:
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+        self.filtreler, self.desc, self.n = [], False, None
+
+    def select(self, _cols):
+        return self
+
+    def order(self, _col, desc=False):
+        self.desc = desc
+        return self
+
+    def gt(self, _col, v):
+        self.filtreler.append(lambda r: r['id'] > v)
+        return self
+
+    def lt(self, _col, v):
+        self.filtreler.append(lambda r: r['id'] < v)
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        out = [r for r in self.rows if all(f(r) for f in self.filtreler)]
+        out.sort(key=lambda r: r['id'], reverse=self.desc)
+        with self.log['lock']:
+            self.log['calls'] += 1
+        return SimpleNamespace(data=out[:self.n])
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.log = {'calls': 0, 'lock': threading.Lock()}
+
+    def table(self, _name):
+        return _Sorgu(self.rows, self.log)
+
+    def rpc(self, name, params):
+        """stok_aralik_ozet'in Python karşılığı."""
+        assert name == 'stok_aralik_ozet'
+        w = params['p_genislik']
+        gruplar = {}
+        for r in sorted(self.rows, key=lambda r: r['id']):
+            gruplar.setdefault(r['id'] // w * w, []).append(r)
+        data = []
+        for lo, rs in sorted(gruplar.items()):
+            metin = "\n".join(
+                f"{r['id']}|{r['urun_kod'] or ''}|{r['urun_ad'] or ''}|{r['birim_fiyat'] or ''}" for r in rs
+            )
+            data.append({'out_lo': lo, 'out_satir': len(rs), 'out_max_id': rs[-1]['id'],
+                         'out_checksum': hashlib.md5(metin.encode()).hexdigest()})
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+
+def _rows():
+    rows = []
+    for i in range(1, 2300, 3):  # seyrek id'ler
+        rows.append({
+            'id': i,
+            'urun_kod': 25000000 + i % 50,
+            'urun_ad': f" ÜRÜN {i % 50} " if i % 97 else None,
+            'birim_fiyat': str(i % 13) if i % 5 else i * 1.5,
+        })
+    return rows
+
+
+def test_parallel_ranges_match_single_range():
+    client = FakeClient(_rows())
+    paralel = pipeline._fetch_urunler_raw(client, page_size=37, paralel=4, aralik=200)
+    tek = pipeline._fetch_urunler_raw(client, page_size=10_000, paralel=1, aralik=10_000)
+    pd.testing.assert_frame_equal(paralel, tek)
+    assert len(tek) == sum(1 for r in client.rows if r['urun_ad'])
+    assert tek['urun_kod'].iloc[0] == '25000001'
+
+
+def test_id_ranges_are_aligned():
+    assert pipeline._id_araliklari(5, 14, genislik=4) == [(4, 8), (8, 12), (12, 16)]
+
+
+def test_empty_table():
+    assert pipeline._fetch_urunler_raw(FakeClient([])).empty
+
+
+@pytest.fixture
+def veri_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, 'ID_ARALIK', 200)
+    for ad in ('MASTER_PARQUET', 'MASTER_JSON', 'ONERI_JSON', 'YAZIM_JSON', 'MANIFEST_JSON'):
+        monkeypatch.setattr(pipeline, ad, tmp_path / getattr(pipeline, ad).name)
+    monkeypatch.setattr(pipeline, 'ARALIK_ONBELLEK_DIR', tmp_path / 'stok_araliklari')
+    monkeypatch.setattr(pipeline, 'DATA_DIR', tmp_path)
+    return tmp_path
+
+
+def _ciktilar(d):
+    return {p.name: p.read_bytes() for p in sorted(d.iterdir())
+            if p.is_file() and p.name not in (pipeline.MANIFEST_JSON.name, 'CURRENT')}
+
+
+def test_incremental_skips_and_matches_full_rebuild(veri_dir, monkeypatch):
+    client = FakeClient(_rows())
+    monkeypatch.setattr(pipeline, 'get_supabase_client', lambda: client)
+
+    pipeline.build_and_save_urun_master()
+    manifest = pipeline._manifest_oku()
+    assert manifest['satir'] == len(client.rows)
+
+    # Değişiklik yok → tablo hiç okunmaz, commit'lenen manifest de değişmez
+    client.log['calls'] = 0
+    onceki = pipeline.MANIFEST_JSON.read_bytes()
+    pipeline.build_and_save_urun_master()
+    assert client.log['calls'] == 0
+    assert pipeline.MANIFEST_JSON.read_bytes() == onceki
+
+    # Tek aralıkta değişiklik → sadece o aralık çekilir
+    client.rows[5]['urun_ad'] = 'YENİ ÜRÜN'
+    client.log['calls'] = 0
+    pipeline.build_and_save_urun_master()
+    assert client.log['calls'] == 1
+    artimli = _ciktilar(veri_dir)
+
+    pipeline.build_and_save_urun_master(tam=True)
+    assert _ciktilar(veri_dir) == artimli
+
+
+def test_fetch_sirasinda_degisen_aralik_onbellege_yazilmaz(tmp_path):
+    client = FakeClient(_rows())
+    ozet = pipeline._aralik_ozetleri(client, 200)
+    # Özetten sonra, satır sayısı değişmeden bir satır düzenlenir
+    client.rows[5]['urun_ad'] = 'DÜZENLENDİ'
+    pipeline._fetch_urunler_raw(client, aralik=200, ozet=ozet, onbellek_dir=tmp_path)
+    yazilan = {p.name for p in tmp_path.glob('aralik_*.parquet')}
+    degisen = pipeline._onbellek_yolu(tmp_path, 0, ozet['0']['checksum']).name
+    assert degisen not in yazilan
+    assert len(yazilan) == len(ozet) - 1
+
+
+def test_vectorized_oneri_format_matches_apply():
+    raw = pd.DataFrame({
+        'urun_kod': ['1', '1', '2', '', '3', '4', '4', '5', '2'],
+        'urun_ad': ['A', 'A', 'B', 'C', 'D', 'E', 'E', 'İĞ', 'B'],
+        'birim_fiyat': [10.0, 12.5, None, 3.0, 0.0, 7.999, float('nan'), 19.9, None],
+    })
+    oneri_df = pipeline._oneri_grupla(raw)
+    beklenen = oneri_df.apply(pipeline._format_oneri, axis=1).drop_duplicates().tolist()
+    assert pipeline._oneri_metinleri(oneri_df) == beklenen
+    assert pipeline._oneri_metinleri(oneri_df.iloc[:0]) == []
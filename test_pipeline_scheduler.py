@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+import pipeline_scheduler as ps
+
+
+@pytest.fixture
+def zamanlayici(tmp_path, monkeypatch):
+    monkeypatch.setattr(ps, "DURUM_JSON", tmp_path / "pipeline_durum.json")
+    monkeypatch.setattr(ps, "KILIT_DOSYASI", tmp_path / ".pipeline.lock")
+    monkeypatch.setattr(ps, "GUNCELLIK_DOSYALARI", (tmp_path / "oneri_listesi.json",))
+    monkeypatch.setattr(ps, "GERI_CEKILME", (0,))
+    monkeypatch.setattr(ps, "HEARTBEAT", 0.05)
+    return tmp_path
+
+
+def test_lease_tek_sahip(zamanlayici):
+    assert ps._lease_al("a:1")
+    assert not ps._lease_al("b:2")
+    assert ps.durum_oku()["sahip"] == "a:1"
+
+
+def test_suresi_dolan_lease_devralinir(zamanlayici, monkeypatch):
+    assert ps._lease_al("a:1")
+    simdi = ps._simdi()
+    monkeypatch.setattr(ps, "_simdi", lambda: simdi + ps.LEASE_SURESI + 1)
+    assert ps._lease_al("b:2")
+    # Eski sahip artık lease'i güncelleyemez
+    assert not ps._lease_guncelle("a:1", ilerleme="x")
+
+
+def test_basarili_calisma_gun_icinde_tekrarlanmaz(zamanlayici, monkeypatch):
+    monkeypatch.setattr(ps, "PIPELINE_KOMUTU", [sys.executable, "-c", "print('adim 1')"])
+    assert ps.calistir_gerekirse()
+    durum = ps.durum_oku()
+    assert durum["durum"] == "basarili"
+    assert durum["deneme"] == 1
+    assert durum["sure_s"] >= 0
+    assert not ps.calistir_gerekirse()
+
+
+def test_hata_tekrar_denenir_ve_geri_cekilir(zamanlayici, monkeypatch):
+    monkeypatch.setattr(ps, "PIPELINE_KOMUTU", [
+        sys.executable, "-c", "import sys; print('kaynak yok'); sys.exit(1)",
+    ])
+    assert ps.calistir_gerekirse()
+    durum = ps.durum_oku()
+    assert durum["durum"] == "hata"
+    assert durum["deneme"] == ps.MAX_DENEME
+    assert durum["hata"] == "kaynak yok"
+    assert durum["sonraki_deneme"] > ps._simdi()
+    # Bekleme süresi dolmadan kimse yeniden başlatmaz
+    assert not ps.calistir_gerekirse()
+
+
+def test_bugun_baska_yoldan_guncellendiyse_atlanir(zamanlayici):
+    (zamanlayici / "oneri_listesi.json").write_text("[]", encoding="utf-8")
+    assert not ps._lease_al("a:1")
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+from PIL import Image
+
+import storage
+
+
+class _Sorgu:
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+
+    def __getattr__(self, ad):
+        return lambda *a, **k: self
+
+    def execute(self):
+        self.log.append("sorgu")
+        return type("Yanit", (), {"data": self.rows})()
+
+
+class _Client:
+    def __init__(self, rows):
+        self.rows, self.log = rows, []
+
+    def table(self, ad):
+        return _Sorgu(self.rows, self.log)
+
+
+@pytest.fixture
+def sahte(monkeypatch):
+    client = _Client([
+        {"id": 1, "week_id": "w1", "flyer_filename": "a.pdf", "page_no": 1, "image_path": "w1/a_p1.jpg"},
+        {"id": 2, "week_id": "w1", "flyer_filename": "a.pdf", "page_no": 2, "image_path": "w1/a_p2.jpg"},
+    ])
+    indirilen = []
+    monkeypatch.setattr(storage, "_get_client", lambda: client)
+    monkeypatch.setattr(storage, "_download_image", lambda p: indirilen.append(p) or p.encode())
+    monkeypatch.setattr(storage, "_page_cache", storage._PosterPageCache(max_bytes=1024))
+    return client, indirilen
+
+
+def test_sessionlar_arasi_paylasilir(sahte):
+    client, indirilen = sahte
+    ilk = storage.get_poster_pages("w1")
+    ikinci = storage.get_poster_pages("w1")
+    assert [p["png_data"] for p in ikinci] == [b"w1/a_p1.jpg", b"w1/a_p2.jpg"]
+    assert ilk[0]["png_data"] is ikinci[0]["png_data"]
+    assert indirilen == ["w1/a_p1.jpg", "w1/a_p2.jpg"]
+    assert client.log == ["sorgu"]
+
+
+def test_yazma_haftayi_dusurur(sahte):
+    client, indirilen = sahte
+    storage.get_poster_pages("w1")
+    storage.update_poster_page(1, {"title": "x"})
+    storage.get_poster_pages("w1")
+    # Sadece başlık değişti: liste yeniden okunur (select, update, select), görseller indirilmez
+    assert len(indirilen) == 2 and len(client.log) == 3
+
+    storage._page_cache.invalidate_week("w1")
+    storage.get_poster_pages("w1")
+    assert len(indirilen) == 4
+
+
+def test_bayt_butcesi(sahte):
+    cache = storage._PosterPageCache(max_bytes=10)
+    cache.put_image(("w", 1, "p", 0), b"123456")
+    cache.put_image(("w", 2, "p", 0), b"123456")
+    assert cache.get_image(("w", 1, "p", 0)) is None
+    assert cache.get_image(("w", 2, "p", 0)) == b"123456"
+    assert cache.stats()["evictions"] == 1
+    # Eski nesilden gelen geç yazma saklanmaz
+    cache.invalidate_week("w")
+    cache.put_image(("w", 3, "p", 0), b"1")
+    assert cache.stats()["images"] == 0
+
+
+def test_display_varyantlari(monkeypatch):
+    buf = io.BytesIO()
+    Image.new("RGB", (900, 1200), "red").save(buf, format="PNG")
+    varyantlar, boyut = storage._render_display_variants(buf.getvalue())
+    assert boyut == (900, 1200)
+    assert set(varyantlar) == {(600, "jpg"), (600, "webp"), (1200, "jpg"), (1200, "webp")}
+    assert Image.open(io.BytesIO(varyantlar[(600, "webp")])).size == (600, 800)
+    # Dar orijinal büyütülmez
+    assert Image.open(io.BytesIO(varyantlar[(1200, "jpg")])).size == (900, 1200)
+
+    monkeypatch.setattr(storage, "_get_image_url", lambda p: f"https://cdn/{p}?")
+    d = storage.display_variants("w1/a_p1.jpg", "abc")
+    assert d["src"] == "https://cdn/w1/a_p1_w1200.jpg?v=abc"
+    assert d["srcset_webp"].startswith("https://cdn/w1/a_p1_w600.webp?v=abc 600w")
+    assert storage.display_variants("w1/a_p1.jpg", None) is None
+
+
+def test_display_sayfalari_indirilmez(sahte, monkeypatch):
+    client, indirilen = sahte
+    client.rows[0]["display_rev"] = "abc"
+    monkeypatch.setattr(storage, "_get_image_url", lambda p: f"https://cdn/{p}")
+    sayfalar = storage.get_poster_pages_display("w1")
+    assert sayfalar[0]["display"]["src"] == "https://cdn/w1/a_p1_w1200.jpg?v=abc"
+    assert sayfalar[0]["png_data"] == b""
+    # Varyantı olmayan eski sayfa indirilip viewer'a bayt olarak gider
+    assert sayfalar[1]["display"] is None and sayfalar[1]["png_data"] == b"w1/a_p2.jpg"
+    assert indirilen == ["w1/a_p2.jpg"]
@@ -0,0 +1,38 @@
+import io
+
+import pytest
+from PIL import Image
+
+import components.poster_viewer as pv
+
+
+def _png(w=400, h=600):
+    buf = io.BytesIO()
+    Image.new("RGB", (w, h), "white").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def bilesen(monkeypatch):
+    durum, cagrilar = {}, []
+    monkeypatch.setattr(pv.st, "session_state", durum)
+    monkeypatch.setattr(pv, "_component_func", lambda **k: cagrilar.append(k) or durum.get(k["key"]))
+    return durum, cagrilar
+
+
+def test_manifest_sadece_yakin_sayfalari_kodlar(bilesen):
+    durum, cagrilar = bilesen
+    sayfalar = [{"id": i, "png_bytes": _png(), "label": f"S{i}", "hotspots": []} for i in range(5)]
+    sayfalar[4] = {"id": 4, "display": {"src": "https://cdn/p4_w1200.jpg?v=a", "srcset": "x 600w"},
+                   "width": 900, "height": 1200, "png_bytes": b"", "label": "S4", "hotspots": []}
+
+    pv.poster_viewer(sayfalar, current_index=0, key="k")
+    props = cagrilar[-1]["pages"]
+    assert [("image_b64" in p) for p in props] == [True, True, False, False, False]
+    assert props[2]["width"] == 400 and props[2]["height"] == 600
+    assert props[4]["src"].endswith("?v=a") and "image_b64" not in props[4]
+
+    # Kaydırınca frontend eksik sayfaları ister; cevap arayana sızmaz
+    durum["k"] = {"type": "need_pages", "indices": [2, 3]}
+    assert pv.poster_viewer(sayfalar, current_index=0, key="k") is None
+    assert [("image_b64" in p) for p in cagrilar[-1]["pages"]] == [True, True, True, True, False]
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import pytest
+
+from arama.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    sf = SingleFlight()
+    cagri = []
+    basla = threading.Event()
+
+    def rpc():
+        cagri.append(1)
+        basla.wait(1)
+        return ["satir"]
+
+    sonuclar = []
+    threads = [threading.Thread(target=lambda: sonuclar.append(sf.do("klima", rpc))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    basla.set()
+    for t in threads:
+        t.join()
+
+    assert len(cagri) == 1
+    assert sonuclar == [["satir"]] * 5
+    s = sf.stats()
+    assert (s["calls"], s["executed"], s["collapsed"], s["inflight"]) == (5, 1, 4, 0)
+
+
+def test_error_is_shared_and_key_released():
+    sf = SingleFlight()
+
+    def hata():
+        raise RuntimeError("57014")
+
+    with pytest.raises(RuntimeError):
+        sf.do("a", hata)
+    assert sf.do("a", lambda: 1) == 1
+    assert sf.stats()["executed"] == 2
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from arama.skor import alaka_skoru, calculate_relevance
+
+rows = pd.DataFrame([
+    {"urun_kod": "26047079", "urun_ad": "1,5 LT TERMOS KALE", "magaza_kod": "M1", "stok_adet": 3},
+    {"urun_kod": "26047079", "urun_ad": "1,5 LT TERMOS KALE", "magaza_kod": "M2", "stok_adet": 0},
+    {"urun_kod": "26047080", "urun_ad": "TERMOS 1 LT", "magaza_kod": "M1", "stok_adet": 1},
+    {"urun_kod": "25004657", "urun_ad": "KEDİ MAMASI ETLİ", "magaza_kod": "M1", "stok_adet": 2},
+    {"urun_kod": "12604707", "urun_ad": None, "magaza_kod": "M3", "stok_adet": None},
+])
+
+
+def _legacy(df, query):
+    qw = set(query.lower().split())
+    return df.apply(lambda r: calculate_relevance(r, query, qw), axis=1).astype("int64")
+
+
+def test_matches_row_by_row_scoring():
+    for query in ["termos", "1,5 lt termos", "kedi mama", "mamasi etli", "2604707", "26047079", "lt"]:
+        assert alaka_skoru(rows, query).tolist() == _legacy(rows, query).tolist(), query
+
+
+def test_missing_columns_and_empty_frame():
+    df = rows[["urun_kod", "urun_ad"]]
+    assert alaka_skoru(df, "termos").tolist() == _legacy(df, "termos").tolist()
+    assert alaka_skoru(rows.iloc[:0], "termos").empty
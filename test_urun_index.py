@@ -0,0 +1,43 @@
+import pandas as pd
+
+from arama.urun_index import UrunIndex
+
+master = pd.DataFrame([
+    {"urun_kod": "26047079", "urun_ad_normalized": "1,5 lt termos kale"},
+    {"urun_kod": "26034307", "urun_ad_normalized": "termos 1 lt"},
+    {"urun_kod": "25005118", "urun_ad_normalized": "kedi mamasi tavuklu 400 g"},
+    {"urun_kod": "25007449", "urun_ad_normalized": "kedi kumu 10 lt"},
+    {"urun_kod": "26069065", "urun_ad_normalized": "samsung tv 55 qled"},
+])
+
+
+def test_token_intersection_and_prefix():
+    idx = UrunIndex.from_dataframe(master)
+    assert idx.ara("kedi mama") == ["25005118"]
+    assert set(idx.ara("termos")) == {"26047079", "26034307"}
+    assert idx.ara("1,5 lt termos") == ["26047079"]
+
+
+def test_exact_tokens_rank_first():
+    idx = UrunIndex.from_dataframe(master)
+    assert idx.ara("kedi")[0] in {"25005118", "25007449"}
+    assert idx.ara("tv 55") == ["26069065"]
+
+
+def test_no_match_returns_empty():
+    idx = UrunIndex.from_dataframe(master)
+    assert idx.ara("buzdolabi") == []
+    assert idx.ara("kedi buzdolabi") == []
+    assert idx.ara("") == []
+
+
+def test_code_index():
+    idx = UrunIndex.from_dataframe(master)
+    assert idx.kod_var_mi("26069065")
+    assert not idx.kod_var_mi("99999999")
+
+
+def test_broad_query_returns_full_candidate_set():
+    idx = UrunIndex.from_dataframe(master)
+    # Kısa adlı adaylara göre kesilmez; tamamı özet RPC'sine gider
+    assert idx.ara("lt") == ["26047079", "26034307", "25007449"]
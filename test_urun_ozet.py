@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from arama.skor import alaka_skoru
+from arama.urun_ozet import magaza_df, ozet_df, ozet_sirala, satirlardan_ozet
+
+
+def _satirlar(seed=3):
+    rng = np.random.default_rng(seed)
+    adlar = ["KEDİ MAMA 1 KG", "KÖPEK MAMA", "MAMA KABI", "TV ÜNİTESİ", "KEDİ KUMU", "MAMA SANDALYESİ"]
+    rows = []
+    for u, ad in enumerate(adlar):
+        for m in range(int(rng.integers(1, 30))):
+            rows.append({
+                "urun_kod": f"2500{u:04d}",
+                "urun_ad": ad,
+                "magaza_kod": f"M{m:03d}",
+                "magaza_ad": f"Mağaza {m}",
+                "stok_adet": int(rng.integers(-2, 9)),
+                "birim_fiyat": float(rng.choice([0, 49.9, 52.5, np.nan])),
+            })
+    # aynı mağaza için tekrarlı satır
+    rows.append(dict(rows[0], stok_adet=50))
+    return pd.DataFrame(rows)
+
+
+def _eski_urun_sirasi(df, query):
+    """Eski satır yolu: satırları skorla, sırala, tekilleştir, ürünleri ilk görünüşe göre al."""
+    df = df.assign(alaka=alaka_skoru(df, query))
+    if len(query) <= 2:
+        df = df[df["alaka"] > 0]
+    df = df.sort_values(by=["alaka", "stok_adet"], ascending=[False, False])
+    df = df.drop_duplicates(subset=["magaza_kod", "urun_kod"])
+    return df, df["urun_kod"].drop_duplicates().tolist()
+
+
+def test_ozet_siralamasi_satir_yoluyla_ayni():
+    satirlar = _satirlar()
+    for query in ("mama", "kedi mama", "ma", "25000003"):
+        eski_df, eski_sira = _eski_urun_sirasi(satirlar, query)
+        yeni = ozet_sirala(satirlardan_ozet(satirlar), query)
+        assert yeni["urun_kod"].tolist() == eski_sira
+
+        for _, u in yeni.iterrows():
+            stoklu = eski_df[(eski_df["urun_kod"] == u["urun_kod"]) & (eski_df["stok_adet"] > 0)]
+            assert u["stoklu_magaza"] == len(stoklu)
+            assert u["toplam_stok"] == stoklu["stok_adet"].sum()
+
+
+def test_ozet_rpc_satirlari():
+    ozet = ozet_df([
+        {"out_urun_kod": 25000001, "out_urun_ad": "A", "out_stoklu_magaza": 3,
+         "out_toplam_stok": "12", "out_max_stok": 6, "out_birim_fiyat": "19.90"},
+    ])
+    assert ozet.loc[0, "urun_kod"] == "25000001"
+    assert ozet.loc[0, "toplam_stok"] == 12
+    assert ozet.loc[0, "birim_fiyat"] == 19.9
+    assert ozet_df([]).empty
+
+
+def test_magaza_df_stoklu_ve_tekil():
+    satirlar = _satirlar()
+    kod = satirlar.loc[0, "urun_kod"]
+    data = [{f"out_{k}": v for k, v in r.items()} for r in satirlar[satirlar["urun_kod"] == kod].to_dict("records")]
+    magazalar = magaza_df(data)
+    assert (magazalar["stok_adet"] > 0).all()
+    assert magazalar["magaza_kod"].is_unique
+    assert magazalar["stok_adet"].is_monotonic_decreasing
+    assert magazalar["stok_adet"].iloc[0] == 50
@@ -0,0 +1,76 @@
+"""normalize_tr_search parity testleri.
+
+`_sql_referans` SQL normalize_tr_search'ün (docstring'deki adım sırası) ve
+eski urun_ara_app/urun_master_pipeline implementasyonunun satır satır
+Python karşılığıdır; hızlı yol her girdide bununla aynı sonucu vermeli.
+"""
+
+import re
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils_text import normalize_tr_search, normalize_tr_search_series
+
+
+def _sql_referans(text):
+    if not text:
+        return ""
+    result = text
+    for tr_char, ascii_char in {
+        'İ': 'i', 'I': 'i', 'ı': 'i', 'Ğ': 'g', 'ğ': 'g', 'Ü': 'u', 'ü': 'u',
+        'Ş': 's', 'ş': 's', 'Ö': 'o', 'ö': 'o', 'Ç': 'c', 'ç': 'c',
+    }.items():
+        result = result.replace(tr_char, ascii_char)
+    result = unicodedata.normalize('NFKD', result)
+    result = ''.join(c for c in result if not unicodedata.combining(c))
+    result = result.lower()
+    result = result.replace('makinasi', 'makine')
+    result = result.replace('makinesi', 'makine')
+    result = result.replace('makina', 'makine')
+    for c, r in {'\u201c': '', '\u201d': '', '\u2019': '', '\u00a0': ' ', '\u0307': ''}.items():
+        result = result.replace(c, r)
+    result = re.sub(r'(tv|televizyon)(\d)', r'\1 \2', result)
+    return re.sub(r'\s+', ' ', result).strip()
+
+
+ORNEKLER = [
+    ("terlik", "terlik"),
+    ("waffle makinesi", "waffle makine"),
+    ("akıllı saat", "akilli saat"),
+    ("ÇAMAŞIR MAKİNASI", "camasir makine"),
+    ("Kahve Makinası", "kahve makine"),
+    ("makinasisi", "makine"),
+    ("Samsung TV65 Crème Brûlée", "samsung tv 65 creme brulee"),
+    ("  \u201cŞık\u201d\u00a0Çanta  ", "sik canta"),
+    ("televizyon55", "televizyon 55"),
+    ("ﬁlm ½ kg", "film 1⁄2 kg"),
+    ("İSTANBUL ılık", "istanbul ilik"),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("girdi,beklenen", ORNEKLER)
+def test_documented_examples(girdi, beklenen):
+    assert normalize_tr_search(girdi) == beklenen
+    assert _sql_referans(girdi) == beklenen
+
+
+def test_series_matches_scalar():
+    girdiler = [g for g, _ in ORNEKLER] * 3 + [None]
+    s = pd.Series(girdiler, name="urun_ad")
+    out = normalize_tr_search_series(s)
+    assert out.tolist() == [normalize_tr_search(g) for g in girdiler[:-1]] + [""]
+    assert out.name == "urun_ad"
+
+
+MASTER = Path("data/urun_master.parquet")
+
+
+@pytest.mark.skipif(not MASTER.exists(), reason="urun_master.parquet yok")
+def test_parity_on_master_names():
+    adlar = pd.read_parquet(MASTER, columns=["urun_ad"])["urun_ad"].dropna().astype(str)
+    beklenen = [_sql_referans(a) for a in adlar]
+    assert normalize_tr_search_series(adlar).tolist() == beklenen
@@ -0,0 +1,66 @@
+import pytest
+
+import storage
+
+
+class _Sorgu:
+    def __init__(self, client, tablo):
+        self.client, self.tablo = client, tablo
+
+    def __getattr__(self, ad):
+        return lambda *a, **k: self
+
+    def execute(self):
+        self.client.log.append(self.tablo)
+        return type("Yanit", (), {"data": self.client.tablolar.get(self.tablo, [])})()
+
+
+class _Client:
+    def __init__(self, tablolar, rpc_var=False):
+        self.tablolar, self.rpc_var, self.log = tablolar, rpc_var, []
+
+    def table(self, ad):
+        return _Sorgu(self, ad)
+
+    def rpc(self, ad, params):
+        self.log.append(f"rpc:{ad}")
+        if not self.rpc_var:
+            raise RuntimeError("PGRST202 function not found")
+        return _Sorgu(self, "rpc")
+
+
+@pytest.fixture
+def sahte(monkeypatch):
+    client = _Client({
+        "poster_pages": [{"week_id": w} for w in ("w1", "w1", "w2", "w3", "eski")],
+        "poster_weeks": [
+            {"week_id": "w1", "week_name": "Hafta 1", "status": "published", "sort_order": 0, "created_at": "2026-01-01"},
+            {"week_id": "w2", "week_name": "", "status": "published", "sort_order": 1, "created_at": "2025-12-01"},
+            {"week_id": "w3", "week_name": "Taslak", "status": "draft", "sort_order": 0, "created_at": "2026-02-01"},
+        ],
+    })
+    monkeypatch.setattr(storage, "_get_client", lambda: client)
+    monkeypatch.setattr(storage, "_weeks_manifest", storage._WeeksManifestCache())
+    return client
+
+
+def test_yedek_manifest_ve_cache(sahte):
+    m = storage.get_published_weeks_manifest()
+    # sort_order>0 önce, sonra en yeni; kaydı olmayan hafta en sonda görünür
+    assert [(w["week_id"], w["week_name"], w["page_count"]) for w in m["weeks"]] == [
+        ("w2", "w2", 1), ("w1", "Hafta 1", 2), ("eski", "eski", 1)]
+    sorgu = len(sahte.log)
+    assert storage.get_published_weeks_manifest() is m and len(sahte.log) == sorgu
+
+    # Yayınlama manifesti düşürür; içerik değişince version da değişir
+    sahte.tablolar["poster_weeks"][2]["status"] = "published"
+    storage.update_week_status("w3", "published")
+    yeni = storage.get_published_weeks_manifest()
+    assert yeni["weeks"][1]["week_id"] == "w3" and yeni["version"] != m["version"]
+
+
+def test_rpc_tek_istek(sahte):
+    sahte.rpc_var = True
+    sahte.tablolar["rpc"] = {"version": "abc", "weeks": [{"week_id": "w1"}]}
+    assert storage.get_published_weeks_manifest()["version"] == "abc"
+    assert sahte.log == ["rpc:published_weeks_manifest", "rpc"]
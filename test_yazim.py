@@ -0,0 +1,40 @@
+import pandas as pd
+
+from arama.yazim import YazimIndex, mesafe, yazim_frekanslari
+
+
+def _index():
+    adlar = pd.Series([
+        "tefal tencere seti", "korkmaz tencere", "samsung buzdolabi",
+        "samsung tv 55", "arcelik camasir makine", "kedi mama",
+        "tencere kapagi", "tercih paketi",
+    ])
+    return YazimIndex(yazim_frekanslari(adlar))
+
+
+def test_frequency_weights_products():
+    frek = yazim_frekanslari(pd.Series(["tv tv samsung", "samsung 55"]), pd.Series([3, 2]))
+    assert frek == {"samsung": 5}  # "tv" kısa, "55" sayısal → sözlük dışı
+
+
+def test_osa_distance():
+    assert mesafe("samsnug", "samsung", 2) == 1
+    assert mesafe("tencre", "tencere", 2) == 1
+    assert mesafe("abc", "xyz", 1) == 2
+
+
+def test_corrects_unknown_words_only():
+    idx = _index()
+    assert idx.duzelt("tencre") == "tencere"
+    assert idx.duzelt("samsnug buzdolbi") == "samsung buzdolabi"
+    assert idx.duzelt("camasr makine") == "camasir makine"
+    # sözlükte olan, kısa, sayısal ve yazılmakta olan (prefix) kelimeler kalır
+    assert idx.duzelt("kedi mama") == "kedi mama"
+    assert idx.duzelt("tv 55") == "tv 55"
+    assert idx.duzelt("buzdol") == "buzdol"
+    assert idx.duzelt("xqzwvk") == "xqzwvk"
+
+
+def test_frequency_breaks_ties():
+    idx = YazimIndex({"kasa": 1, "masa": 9})
+    assert idx.oner("lasa") == "masa"
@@ -15,18 +15,25 @@ import streamlit as st
 import pandas as pd
 import os
 import re
-import json
-import unicodedata
 import html
 import hmac
 import time
 import logging
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Optional
 from PIL import Image
-import threading
-import subprocess
-from pathlib import Path
+
+from arama.cache import get_magaza_cache, get_sonuc_cache
+from arama.gruplama import magaza_kayitlari, sonucu_grupla
+from arama.log_kuyrugu import KismiYazim, get_log_kuyrugu
+from arama import metrikler
+from arama.metrikler import olc
+from arama import motor as arama_motoru
+from arama.motor import arama_rpc, rpc_bulunamadi_mi
+from arama.singleflight import get_rpc_group
+from arama.urun_ozet import magaza_df
+import pipeline_scheduler
 
 # Kontrol karakterlerini temizle (null byte, vb. — Streamlit InvalidCharacterError'ı önler)
 _CTRL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
@@ -60,47 +67,16 @@ def _latin1_safe(html_str: str) -> str:
     return ''.join(out)
 
 # --- Günlük Pipeline (günde 1 kez, lazy tetikleme) ---
-def _pipeline_gunluk_guncelle():
-    """oneri_listesi.json bugün güncellenmemişse pipeline'ı arka planda çalıştırır."""
-    from datetime import date
-    json_path = Path("data/oneri_listesi.json")
-    if json_path.exists():
-        son_degisim = datetime.fromtimestamp(json_path.stat().st_mtime).date()
-        if son_degisim >= date.today():
-            return  # Bugün zaten güncellendi
+# Zamanlama, process'ler arası kilit ve tekrar denemeler pipeline_scheduler'da;
+# kontrol_et() hiç beklemez, iş arka plan thread'inde yürür.
+def _pipeline_kontrol():
     try:
-        subprocess.run(
-            ["python", "urun_master_pipeline.py"],
-            timeout=600,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False,
-        )
-    except subprocess.TimeoutExpired:
-        logging.warning("urun_master_pipeline timeout (600s)")
+        pipeline_scheduler.kontrol_et()
     except Exception as e:
-        logging.warning("urun_master_pipeline failed: %s", e)
-
-def _pipeline_kontrol():
-    from datetime import date
-    now = datetime.now()
-    # Stok sabah 09:00'da yükleniyor, pipeline 10:30'dan sonra çalışsın
-    if now.hour < 10 or (now.hour == 10 and now.minute < 30):
-        return
-    bugun = str(date.today())
-    if getattr(st, '_pipeline_last_check', None) != bugun:
-        st._pipeline_last_check = bugun
-        threading.Thread(target=_pipeline_gunluk_guncelle, daemon=True).start()
+        logging.warning("pipeline scheduler check failed: %s", e)
 
 _pipeline_kontrol()
 
-
-# --- Performans için Önceden Derlenmiş Regexler ---
-RE_TV_NEGATIF = re.compile(
-    r'battaniye|battanıye|ünite|unite|sehpa|koltuk|kılıf|kumanda|askı|aparat|kablo|atv|oyuncak|lisanslı|tvk',
-    re.IGNORECASE
-)
-
 # Ikonu yukle (Favicon icin)
 try:
     img_icon = Image.open("static/icon-192.png")
@@ -283,140 +259,26 @@ def get_stok_seviye(adet: int) -> tuple:
         return "Yüksek", "stok-yuksek", "#27ae60"
 
 
-def temizle_ve_kok_bul(text: str) -> str:
-    """
-    SQL normalize_tr_search ile birebir uyumlu normalize.
-
-    SQL fonksiyonu sırası:
-      1. translate(text, 'İIıĞğÜüŞşÖöÇç', 'iiigguussoocc')
-      2. unaccent(...)       → â→a gibi accent temizliği
-      3. lower(...)
-      4. replace('makinasi','makine')
-      5. replace('makinesi','makine')
-      6. replace('makina','makine')
-
-    Örnekler:
-      "terlik"           → "terlik"          (ESKİ: "ter" ❌)
-      "waffle makinesi"  → "waffle makine"   ✅
-      "akıllı saat"      → "akilli saat"     (ESKİ: "akil saat" ❌)
-      "nescaffe gold"    → "nescafe gold"    ✅ (yazım düzeltme)
-    """
-    if not text:
-        return ""
-
-    # 1. Türkçe karakter dönüşümü (SQL: translate)
-    tr_map = {
-        'İ': 'i', 'I': 'i', 'ı': 'i',
-        'Ğ': 'g', 'ğ': 'g',
-        'Ü': 'u', 'ü': 'u',
-        'Ş': 's', 'ş': 's',
-        'Ö': 'o', 'ö': 'o',
-        'Ç': 'c', 'ç': 'c',
-    }
-    result = text
-    for tr_char, ascii_char in tr_map.items():
-        result = result.replace(tr_char, ascii_char)
-
-    # 2. Accent temizliği (SQL: unaccent) - â→a, é→e gibi
-    result = unicodedata.normalize('NFKD', result)
-    result = ''.join(c for c in result if not unicodedata.combining(c))
-
-    # 3. Lowercase (SQL: lower)
-    result = result.lower()
-
-    # 4-6. Makine dönüşümleri (SQL: replace)
-    result = result.replace('makinasi', 'makine')
-    result = result.replace('makinesi', 'makine')
-    result = result.replace('makina', 'makine')
-
-    # Smart quote ve özel karakter temizliği
-    for c, r in {
-        '\u201c': '', '\u201d': '', '\u2019': '',
-        '\u00a0': ' ', '\u0307': '',
-    }.items():
-        result = result.replace(c, r)
-
-    # Bitişik tv+sayı ayır: "tv65" → "tv 65"
-    result = re.sub(r'(tv|televizyon)(\d)', r'\1 \2', result)
-
-    # Çoklu boşlukları tekle
-    result = re.sub(r'\s+', ' ', result).strip()
-
-    # 7. Yazım hatası düzeltme (kelime bazlı)
-    words = result.split()
-    corrected = [YAZIM_DUZELTME.get(w, w) for w in words]
-    result = ' '.join(corrected)
-
-    return result
-
-
-# ============================================================================
-# YAZIM HATASI SÖZLÜĞÜ
-# ============================================================================
-# Arama loglarından tespit edilen yaygın yazım hataları.
-# Yeni hatalar tespit edildikçe buraya eklenebilir.
-# Format: 'yanlis_yazim': 'dogru_yazim'
-# ============================================================================
-
-YAZIM_DUZELTME = {
-    # Marka yazım hataları
-    'nescaffe': 'nescafe', 'nescfe': 'nescafe', 'nesacfe': 'nescafe',
-    'cold': 'gold',
-    'philps': 'philips', 'phlips': 'philips', 'plips': 'philips',
-    'samsun': 'samsung', 'samgung': 'samsung', 'smasung': 'samsung',
-    'tosiba': 'toshiba', 'toshbia': 'toshiba', 'tosihba': 'toshiba',
-    'grundik': 'grundig', 'grunding': 'grundig',
-    'sinbo': 'sinbo',
-
-    # Ürün kategorisi yazım hataları
-    'tercere': 'tencere', 'tencre': 'tencere', 'tenecre': 'tencere',
-    'blendir': 'blender', 'belnder': 'blender', 'blnder': 'blender',
-    'wafle': 'waffle', 'vafle': 'waffle', 'wafle': 'waffle',
-    'aklli': 'akilli', 'akkilli': 'akilli', 'aklili': 'akilli',
-    'buzdobali': 'buzdolabi', 'buzdolbi': 'buzdolabi',
-    'televizon': 'televizyon', 'televzyon': 'televizyon', 'teleivzyon': 'televizyon',
-    'makarana': 'makarna', 'maknara': 'makarna',
-    'bibron': 'biberon', 'bbiron': 'biberon',
-    'termoss': 'termos',
-    'kulaklik': 'kulaklik',
-    'supurge': 'supurge', 'spurge': 'supurge', 'surpuge': 'supurge',
-    'camasir': 'camasir', 'camaisr': 'camasir',
-    'bulasik': 'bulasik', 'bualsik': 'bulasik',
-    'mikrodlga': 'mikrodalga', 'mikrdalga': 'mikrodalga',
-    'sampuan': 'sampuan', 'sampuvan': 'sampuan',
-    'rejisor': 'rejisör',
-}
-
-
 # ============================================================================
 # URUN ARAMA (SERVER-SIDE)
 # ============================================================================
 
-@st.cache_data(ttl=3600)
-def _build_oneri_lookup():
-    """Öneri listesinden ad→kod reverse lookup tablosu oluştur"""
-    lookup = {}
+def magaza_satirlari(urun_kod: str) -> Optional[pd.DataFrame]:
+    """2. aşama: ürünün stoklu mağaza satırları (kart açılınca, cache'li). Hata → None."""
+    cache = get_magaza_cache()
+    cached = cache.get(urun_kod)
+    if cached is not None:
+        return cached[0]
+    client = get_supabase_client()
+    if not client:
+        return None
     try:
-        oneri_path = Path('data/oneri_listesi.json')
-        if oneri_path.exists():
-            with oneri_path.open('r', encoding='utf-8') as f:
-                data = json.load(f)
-            for entry in data:
-                if isinstance(entry, str) and ' - ' in entry:
-                    parts = entry.split(' - ')
-                    kod = parts[0].strip()
-                    ad = parts[1].strip() if len(parts) >= 2 else ''
-                    if kod.isdigit() and ad:
-                        lookup[ad.lower()] = kod
+        df = magaza_df(arama_rpc(client, 'urun_kodlari_stok', {'p_urun_kodlari': [urun_kod]}) or [])
     except Exception:
-        pass
-    return lookup
-
-
-def _oneri_ad_to_kod(arama_text: str) -> str:
-    """Dropdown'dan gelen ürün adını koda çevir. Bulamazsa boş string döner."""
-    lookup = _build_oneri_lookup()
-    return lookup.get(arama_text.strip().lower(), '')
+        logging.exception("magaza satirlari failed (%s)", urun_kod)
+        return None
+    cache.put(urun_kod, df)
+    return df
 
 
 def ara_urun(arama_text: str) -> Optional[pd.DataFrame]:
@@ -424,179 +286,35 @@ def ara_urun(arama_text: str) -> Optional[pd.DataFrame]:
     SERVER-SIDE SEARCH - Tüm arama SQL'de yapılır.
     Python sadece normalize + negatif filtre uygular.
 
-    Query Router: Kod araması (exact) vs Metin araması (relevance) ayrımı yapar.
+    Query Router: Kod araması (exact) vs Metin araması (relevance) ayrımı yapar
+    (bkz. arama/motor.py). Sonuçlar normalize sorgu anahtarıyla process genelinde cache'lenir
+    (bkz. arama/cache.py — stok yüklemesi / oneri_listesi değişince düşer).
+    Aşama süreleri arama/metrikler.py'ye kaydedilir.
     """
     if not arama_text or len(arama_text) < 2:
         return None
 
+    with olc("ara_urun"):
+        return _ara_urun(arama_text)
+
+
+def _ara_urun(arama_text: str) -> Optional[pd.DataFrame]:
     try:
         client = get_supabase_client()
         if not client:
             return None
 
-        # Başta ürün kodu varsa sadece onu kullan ("25006169 - ÜRÜN ADI" gibi)
-        arama_raw = arama_text.strip()
-        kod_prefix_match = re.match(r'^\s*(\d{5,})\s*(?:-|–)\s*', arama_raw)
-
-        if kod_prefix_match:
-            optimize_sorgu = kod_prefix_match.group(1)
-        elif arama_raw.isdigit():
-            optimize_sorgu = arama_raw
-        else:
-            # Öneri listesinden seçilen ürün adını koda çevir (reverse lookup)
-            resolved_kod = _oneri_ad_to_kod(arama_raw)
-            if resolved_kod:
-                optimize_sorgu = resolved_kod
-            else:
-                optimize_sorgu = temizle_ve_kok_bul(arama_raw)
-
-        # --- Query Router: Kod mu, metin mi? ---
-        is_kod_araması = optimize_sorgu.isdigit() and len(optimize_sorgu) >= 7
-
-        def process_results(data, query):
-            df = pd.DataFrame(data)
-            df.columns = [col.replace('out_', '') for col in df.columns]
-
-            # --- Akıllı Sıralama (Relevance Scoring) ---
-            query_words = set(query.lower().split())
-
-            def calculate_relevance(row):
-                score = 0
-                urun_ad = str(row.get('urun_ad', '')).lower()
-                urun_kod = str(row.get('urun_kod', ''))
-
-                # Kod eşleşme (en yüksek öncelik)
-                if query.isdigit():
-                    if urun_kod == query:
-                        score += 1000
-                    elif urun_kod.startswith(query):
-                        score += 600
-                    elif len(query) >= 6 and query in urun_kod:
-                        score += 200
-
-                # Tam eşleşme (metin)
-                if query.lower() in urun_ad:
-                    score += 100
-
-                # Kelime bazlı eşleşme
-                urun_words = set(urun_ad.split())
-                common_words = query_words.intersection(urun_words)
-                score += len(common_words) * 10
-
-                # Stok puanı (Bonus)
-                stok = row.get('stok_adet', 0)
-                if stok > 0:
-                    score += 5
-
-                return score
-
-            df['alaka'] = df.apply(calculate_relevance, axis=1)
-
-            # TV Filtresi (sadece bağımsız kelime olarak "tv" veya "televizyon" varsa)
-            query_words_set = set(query.lower().split())
-            if query_words_set.intersection({'tv', 'televizyon'}):
-                df = df[~df['urun_ad'].str.contains(RE_TV_NEGATIF, na=False, regex=True)]
-
-            # Kısa sorgularda alakasızları (substring) temizle
-            if len(query) <= 2:
-                df = df[df['alaka'] > 0]
-
-            # Hem alakaya hem de stok durumuna göre sırala
-            df = df.sort_values(by=['alaka', 'stok_adet'], ascending=[False, False])
-            df = df.drop_duplicates(subset=['magaza_kod', 'urun_kod'])
-            return df
-
-        # RPC Çağrısı (Zaman aşımı kontrolü ile)
-        try:
-            result = client.rpc('hizli_urun_ara', {'arama_terimi': optimize_sorgu}).execute()
-            if result.data:
-                df = process_results(result.data, optimize_sorgu)
-
-                # Kod araması: exact varsa SADECE exact dön
-                if is_kod_araması and not df.empty:
-                    exact = df[df['urun_kod'].astype(str) == optimize_sorgu]
-                    if not exact.empty:
-                        return exact
-
-                return df
-        except Exception as e:
-            if not ("timeout" in str(e).lower() or "57014" in str(e)):
-                logging.exception("ara_urun RPC call failed")
-                st.error("Arama servisi şu an yanıt vermedi. Lütfen kısa süre sonra tekrar deneyin.")
-
-        # Hata kontrolü (result nesnesi üzerinden)
-        if 'result' in locals() and getattr(result, 'error', None):
-            err_msg = str(result.error)
-            if not ("timeout" in err_msg.lower() or "57014" in err_msg):
-                logging.error("ara_urun RPC returned error: %s", result.error)
-                st.error("Arama servisi şu an yanıt vermedi. Lütfen kısa süre sonra tekrar deneyin.")
-
-        # Kod aramasında fallback yapma - kod ya var ya yok
-        if is_kod_araması:
-            st.warning("Bu ürün kodu bulunamadı. Kodu kontrol edip tekrar deneyin.")
-            return pd.DataFrame()
-
-        # ---- FALLBACK SEARCH (Google-like) ----
-        # 1. Kategori temizleyip tekrar dene (Örn: "Seg klima" -> "Seg")
-        kategoriler = {
-            'klima', 'televizyon', 'tv', 'telefon', 'supurge', 'buzdolabi',
-            'camasir', 'bulasik', 'makine', 'makinesi', 'makinası', 'ucretsiz', 'teslimat',
-            'btu', 'inv', 'inverter'
-        }
-        sorgu_kelimeleri = optimize_sorgu.split()
-        yeni_sorgu_kelimeleri = [w for w in sorgu_kelimeleri if w not in kategoriler]
-
-        if 0 < len(yeni_sorgu_kelimeleri) < len(sorgu_kelimeleri):
-            yeni_sorgu = " ".join(yeni_sorgu_kelimeleri)
-            try:
-                fallback_result = client.rpc('hizli_urun_ara', {'arama_terimi': yeni_sorgu}).execute()
-                if fallback_result.data:
-                    return process_results(fallback_result.data, optimize_sorgu)
-            except: pass
-
-        # 2. Kelimeleri Tek Tek Dene (Eğer çok kelimeliyse ve sonuç yoksa)
-        if len(sorgu_kelimeleri) > 1:
-            for w in sorgu_kelimeleri:
-                if len(w) >= 3 and w not in kategoriler:
-                    try:
-                        fallback_result = client.rpc('hizli_urun_ara', {'arama_terimi': w}).execute()
-                        if fallback_result.data:
-                            return process_results(fallback_result.data, optimize_sorgu)
-                    except: pass
-
-        # 3. Kapasite temizleyip tekrar dene (Örn: "18000" -> "18")
-        if "000" in optimize_sorgu:
-            yeni_sorgu = optimize_sorgu.replace("000", "").strip()
-            if len(yeni_sorgu) >= 2:
-                try:
-                    fallback_result = client.rpc('hizli_urun_ara', {'arama_terimi': yeni_sorgu}).execute()
-                    if fallback_result.data:
-                        return process_results(fallback_result.data, optimize_sorgu)
-                except: pass
-
-        # 4. İlk Kelimeyi Dene (Marka odaklı)
-        if len(sorgu_kelimeleri) > 1:
-            ilk_kelime = sorgu_kelimeleri[0]
-            if len(ilk_kelime) >= 3 and ilk_kelime not in kategoriler:
-                try:
-                    fallback_result = client.rpc('hizli_urun_ara', {'arama_terimi': ilk_kelime}).execute()
-                    if fallback_result.data:
-                        return process_results(fallback_result.data, optimize_sorgu)
-                except: pass
-
-        # 5. En Uzun Kelimeyi Dene (Son çare)
-        if len(sorgu_kelimeleri) > 1:
-            en_uzun_kelime = max(sorgu_kelimeleri, key=len)
-            if len(en_uzun_kelime) >= 4:
-                try:
-                    fallback_result = client.rpc('hizli_urun_ara', {'arama_terimi': en_uzun_kelime}).execute()
-                    if fallback_result.data:
-                        return process_results(fallback_result.data, optimize_sorgu)
-                except: pass
-
-        # Timeout uyarısı (Eğer buraya kadar gelip sonuç yoksa ve timeout olmuşsa)
-        st.warning("Aradığınız kriterlerde sonuç bulunamadı veya veri tabanı meşgul. Lütfen daha kısa/farklı kelimeler deneyin.")
-        return pd.DataFrame()
+        df, uyari, hata = arama_motoru.ara(client, arama_text)
+        if hata == "koruma":
+            st.warning("⚠️ Arama servisi şu an yoğun — kısıtlı moddasınız. Sonuçlar önbellekten "
+                       "ya da ürün kataloğundan geliyor; stoklar güncel olmayabilir.")
+        if hata == "mesgul":
+            st.warning("⏳ Arama servisi şu an çok yoğun. Lütfen birkaç saniye sonra tekrar deneyin.")
+        if hata == "servis":
+            st.error("Arama servisi şu an yanıt vermedi. Lütfen kısa süre sonra tekrar deneyin.")
+        if uyari:
+            st.warning(uyari)
+        return df
 
     except Exception:
         logging.exception("ara_urun unhandled error")
@@ -617,38 +335,68 @@ def _sanitize_log_term(term: str) -> str:
     return s[:100]
 
 
+def _arama_log_eski(client, kayit: dict):
+    """arama_log_artir RPC'si kurulu değilse: terim başına SELECT + UPDATE/INSERT."""
+    result = client.table('arama_log')\
+        .select('id, arama_sayisi')\
+        .eq('tarih', kayit['tarih'])\
+        .eq('arama_terimi', kayit['arama_terimi'])\
+        .execute()
+
+    simdi = kayit['son_arama_zamani']
+
+    if result.data:
+        mevcut = result.data[0]
+        veri = {'arama_sayisi': mevcut['arama_sayisi'] + kayit['adet'], 'sonuc_sayisi': kayit['sonuc_sayisi']}
+        try:
+            client.table('arama_log').update({**veri, 'son_arama_zamani': simdi}).eq('id', mevcut['id']).execute()
+        except Exception:
+            client.table('arama_log').update(veri).eq('id', mevcut['id']).execute()
+    else:
+        veri = {'tarih': kayit['tarih'], 'arama_terimi': kayit['arama_terimi'],
+                'arama_sayisi': kayit['adet'], 'sonuc_sayisi': kayit['sonuc_sayisi']}
+        try:
+            client.table('arama_log').insert({**veri, 'son_arama_zamani': simdi}).execute()
+        except Exception:
+            client.table('arama_log').insert(veri).execute()
+
+
+_arama_log_rpc_yok = False
+
+
+def _arama_log_yaz(kayitlar: list):
+    """Log kuyruğunun toplu yazıcısı (arka plan thread'inde çalışır)."""
+    global _arama_log_rpc_yok
+    client = get_supabase_client()
+    if not client:
+        raise RuntimeError("Supabase bağlantısı yok")
+    if not _arama_log_rpc_yok:
+        try:
+            client.rpc('arama_log_artir', {'p_kayitlar': kayitlar}).execute()
+            return
+        except Exception as e:
+            if not rpc_bulunamadi_mi(e):
+                raise
+            logging.warning("arama_log_artir RPC missing, using per-term writes: %s", e)
+            _arama_log_rpc_yok = True
+    for i, kayit in enumerate(kayitlar):
+        try:
+            _arama_log_eski(client, kayit)
+        except Exception as e:
+            # Yazılmış terimler geri kuyruğa girerse iki kez sayılır
+            raise KismiYazim(kayitlar[i:], e) from e
+
+
 def log_arama(arama_terimi: str, sonuc_sayisi: int):
-    """Arama logla (sessiz çalışır)"""
+    """Aramayı log kuyruğuna ekle (I/O yok; bkz. arama/log_kuyrugu.py)"""
     try:
-        client = get_supabase_client()
-        if client and arama_terimi:
-            terim = _sanitize_log_term(arama_terimi)
-            if not terim or len(terim) < 2:
-                return
-            bugun = datetime.now().strftime('%Y-%m-%d')
-
-            # Bugün bu terim arandı mı?
-            result = client.table('arama_log')\
-                .select('id, arama_sayisi')\
-                .eq('tarih', bugun)\
-                .eq('arama_terimi', terim)\
-                .execute()
-
-            simdi = datetime.now().isoformat()
-
-            if result.data:
-                kayit = result.data[0]
-                veri = {'arama_sayisi': kayit['arama_sayisi'] + 1, 'sonuc_sayisi': sonuc_sayisi}
-                try:
-                    client.table('arama_log').update({**veri, 'son_arama_zamani': simdi}).eq('id', kayit['id']).execute()
-                except Exception:
-                    client.table('arama_log').update(veri).eq('id', kayit['id']).execute()
-            else:
-                veri = {'tarih': bugun, 'arama_terimi': terim, 'arama_sayisi': 1, 'sonuc_sayisi': sonuc_sayisi}
-                try:
-                    client.table('arama_log').insert({**veri, 'son_arama_zamani': simdi}).execute()
-                except Exception:
-                    client.table('arama_log').insert(veri).execute()
+        if not arama_terimi:
+            return
+        terim = _sanitize_log_term(arama_terimi)
+        if not terim or len(terim) < 2:
+            return
+        with olc("log_arama"):
+            get_log_kuyrugu(_arama_log_yaz).ekle(terim, sonuc_sayisi)
     except Exception:
         logging.exception("log_arama failed")
 
@@ -660,22 +408,19 @@ def get_populer_terimler():
         client = get_supabase_client()
         if not client: return []
 
-        # Son 3 günün en çok aranan 10 terimi (en az 1 sonuç getirmiş olanlar)
-        baslangic = (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
-        result = client.table('arama_log')\
-            .select('arama_terimi, arama_sayisi')\
-            .gte('tarih', baslangic)\
-            .gt('sonuc_sayisi', 0)\
-            .order('arama_sayisi', desc=True)\
-            .limit(10)\
-            .execute()
-
-        if result.data:
+        # Son 3 günün en çok aranan 10 terimi (en az 1 sonuç getirmiş olanlar),
+        # sunucudaki 3 günlük terim rollup'undan (filtrelenecek kodlar için payla)
+        result = client.rpc('arama_top_terimler', {
+            'p_pencere': 3, 'p_limit': 20, 'p_sonuc': 'sonuclu',
+        }).execute()
+        satirlar = [r.get('out_arama_terimi') for r in (result.data or [])]
+
+        if satirlar:
             # Defensive: DB'de eski/kötü biçimli terim varsa tekrar sanitize et.
             # Saf ürün kodlarını (tam sayı) filtrele (kullanıcıya anlamsız).
             terimler = []
-            for r in result.data:
-                raw = r.get('arama_terimi') or ""
+            for raw in satirlar:
+                raw = raw or ""
                 safe = _sanitize_log_term(raw)
                 if not safe or len(safe) < 2 or safe.isdigit():
                     continue
@@ -686,52 +431,161 @@ def get_populer_terimler():
     return ["tv", "klima", "supurge", "mama", "tuvalet kagidi"]
 
 
-def _get_oneri_listesi_impl():
-    """Autocomplete için ürün önerilerini dosya tabanlı kaynaktan getir."""
-    debug_info = []
+# st.fragment (>=1.37) / experimental_fragment: tuş vuruşu sadece bu bloğu yeniden çalıştırır
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
+
+@_fragment
+def _autocomplete_fragment():
+    """Arama kutusu autocomplete'i — öneriler her tuşta sunucuda hesaplanır."""
+    from arama.oneri_index import get_oneri_index
+    from components.autocomplete import autocomplete
+
+    istek = st.session_state.get("ac_oneri")
+    if not isinstance(istek, dict):
+        istek = {}
+    sorgu = istek.get("q", "")
+    oneriler = []
+    if sorgu:
+        try:
+            index = get_oneri_index()
+            if index is not None:
+                oneriler = index.tamamla(sorgu)
+        except Exception:
+            logging.exception("autocomplete lookup failed")
+    autocomplete(oneriler, seq=istek.get("seq", 0), key="ac_oneri")
+
+
+@contextmanager
+def _urun_expander(baslik: str, urun_kod: str, acik_baslat: bool = False):
+    """Ürün kartı; `acik()` kart açıksa True döner (mağaza satırları o zaman çekilir).
+
+    Streamlit açılma durumunu izleyebiliyorsa (on_change) expander.open
+    kullanılır; eski sürümlerde kart içeriği her zaman çalıştığı için
+    satırlar bir butonla istenir.
+    """
     try:
-        oneri_json_path = Path('data/oneri_listesi.json')
-        if oneri_json_path.exists():
-            with oneri_json_path.open('r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                liste = [x for x in data if isinstance(x, str) and x.strip()]
-                if liste:
-                    debug_info.append(f"oneri_listesi.json OK: {len(liste)} öneri")
-                    return liste, debug_info
-    except Exception as e:
-        debug_info.append(f"Genel hata: {e}")
+        exp = st.expander(baslik, expanded=acik_baslat, key=f"urun_exp_{urun_kod}", on_change="rerun")
+    except TypeError:
+        exp = st.expander(baslik, expanded=acik_baslat)
+
+    def acik() -> bool:
+        durum = getattr(exp, 'open', None)
+        if durum is not None:
+            return durum
+        acilanlar = st.session_state.setdefault('_acik_urunler', set())
+        if acik_baslat or urun_kod in acilanlar:
+            return True
+        if st.button("🏪 Mağaza stoklarını göster", key=f"magaza_btn_{urun_kod}"):
+            acilanlar.add(urun_kod)
+            return True
+        return False
+
+    with exp:
+        yield acik
+
+
+def _magaza_kartlari_html(magazalar: list) -> str:
+    """Mağaza dict'lerinden (bkz. arama/gruplama.magaza_kayitlari) kart HTML'i."""
+    html_cards = []
+    for row in magazalar:
+        try:
+            seviye, _, renk = get_stok_seviye(row['stok_adet'])
+        except:
+            seviye, renk = "Normal", "#3498db"
 
-    debug_info.append('oneri_listesi.json bulunamadı veya geçersiz')
-    return [], debug_info
+        magaza_ad = _safe_html(row.get('magaza_ad') or row.get('magaza_kod'))
 
-@st.cache_data(ttl=3600)
-def get_oneri_listesi():
-    """Cached wrapper — pipeline'ın ürettiği dosyadan okur."""
-    liste, _ = _get_oneri_listesi_impl()
-    return liste
+        # Güvenli Veri Çekme
+        sm = _safe_html(row.get('sm_kod') or "-")
+        bs = _safe_html(row.get('bs_kod') or "-")
+        magaza_kod = _safe_html(row.get('magaza_kod') or "-")
+        seviye_escaped = _safe_html(seviye)
 
+        # Harita Linki
+        lat = row.get('latitude')
+        lon = row.get('longitude')
 
+        harita_ikonu = ""
+        if lat and lon:
+            try:
+                lat_f = float(lat)
+                lon_f = float(lon)
+                harita_ikonu = (
+                    f'<a href="https://www.google.com/maps?q={lat_f},{lon_f}" '
+                    'target="_blank" '
+                    'rel="noopener noreferrer" '
+                    'style="text-decoration:none; margin-left:8px; padding:4px 8px; '
+                    'border-radius:12px; background:#eef2ff; color:#374151; font-size:0.78rem;" '
+                    'title="Yol tarifi al">'
+                    '📍 Yol tarifi</a>'
+                )
+            except (TypeError, ValueError):
+                harita_ikonu = ""
+
+        html_cards.append(f"""
+        <div style="
+            background: linear-gradient(135deg, {renk}22 0%, {renk}11 100%);
+            border-left: 4px solid {renk};
+            border-radius: 8px;
+            padding: 12px 16px;
+            margin-bottom: 8px;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            flex-wrap: wrap;
+            gap: 8px;
+        ">
+            <div style="flex: 1; min-width: 200px;">
+                <div style="font-weight: 600; font-size: 1rem; color: #1e3a5f; display:flex; align-items:center;">
+                    {magaza_ad}
+                    {harita_ikonu}
+                </div>
+                <div style="font-size: 0.85rem; color: #666; margin-top: 4px;">
+                    <b>SM:</b> {sm}  •  <b>BS:</b> {bs}  •  <i>{magaza_kod}</i>
+                </div>
+            </div>
+            <div style="background: {renk}; color: white; padding: 6px 14px; border-radius: 20px; font-weight: 600; font-size: 0.85rem;">
+                {seviye_escaped}
+            </div>
+        </div>
+        """)
+    return _latin1_safe("".join(html_cards))
 
-def goster_sonuclar(df: pd.DataFrame, arama_text: str):
-    """Sonuçları kartlar halinde göster"""
-    # Hata varsa (None) sessizce çık - hata mesajı zaten basıldı
-    if df is None:
-        return
 
-    sonuc_sayisi = 0 if df.empty else len(df['urun_kod'].unique())
+def arama_sonucunu_kaydet(df: Optional[pd.DataFrame], arama_text: str):
+    """Arama sonucunu gösterime hazır hale getirip session'a yaz ve bir kez logla.
+
+    goster_sonuclar her rerun'da sadece bu hazır yapıyı çizer.
+    """
+    with olc("gruplama"):
+        sonuc = None if df is None else sonucu_grupla(df)
+    st.session_state["_fe_search_result"] = {"sonuc": sonuc, "term": arama_text}
+    if sonuc is None:
+        return  # Hata — mesaj zaten basıldı, loglanmaz
 
-    # Arka planda logla (UI bloklamaması için)
+    # Log kuyruğa girer, toplu olarak arka planda yazılır
     # Kod aramasını ürün adına çevir (popüler aramalar çöplüğünü önler)
     log_terimi = arama_text
-    if arama_text.strip().isdigit():
+    if arama_text.strip().isdigit() and sonuc["urunler"]:
         # Kod araması → sonuçlardan ürün adını al
-        if not df.empty and 'urun_ad' in df.columns:
-            log_terimi = str(df.iloc[0]['urun_ad']).strip()
-    threading.Thread(target=log_arama, args=(log_terimi, sonuc_sayisi), daemon=True).start()
+        log_terimi = sonuc["urunler"][0]["urun_ad"].strip()
+    log_arama(log_terimi, sonuc["toplam"])
+
+
+def goster_sonuclar(sonuc: Optional[dict], arama_text: str):
+    """Sonuçları kartlar halinde göster (arama_sonucunu_kaydet'in hazırladığı yapıdan)"""
+    with olc("goster_sonuclar"):
+        _goster_sonuclar(sonuc, arama_text)
+
+
+def _goster_sonuclar(sonuc: Optional[dict], arama_text: str):
+    # Hata varsa (None) sessizce çık - hata mesajı zaten basıldı
+    if sonuc is None:
+        return
 
     # Sonuç yoksa (empty) kullanıcıya bildir
-    if df.empty:
+    if not sonuc["urunler"]:
         arama_raw = arama_text.strip()
         # "KOD - AD" formatını temizle
         if ' - ' in arama_raw:
@@ -744,58 +598,31 @@ def goster_sonuclar(df: pd.DataFrame, arama_text: str):
             st.warning(f"'{arama_text}' için sonuç bulunamadı.")
         return
 
-    # Pandas Gruplama - SQL'den dönen sırayı koru
-    # SQL rank DESC ile sıralı gelir, groupby bunu bozar
-    # Bu yüzden ilk görünüş sırasını (SQL sırası) saklıyoruz
-    urun_sirasi = df['urun_kod'].drop_duplicates().reset_index(drop=True)
-
-    urunler = df.groupby('urun_kod').agg({
-        'urun_ad': 'first',
-        'stok_adet': lambda x: (x > 0).sum()
-    }).reset_index()
-
-    urunler.columns = ['urun_kod', 'urun_ad', 'stoklu_magaza']
-
-    # SQL sırasına göre sırala
-    urunler['sira'] = urunler['urun_kod'].map(
-        {kod: i for i, kod in enumerate(urun_sirasi)}
-    )
-    urunler = urunler.sort_values('sira').drop('sira', axis=1)
-
-    # Performans için sonuçları sınırla
-    top_n = 40
-    gosterilecek_urunler = urunler.head(top_n)
-
-    if len(urunler) > top_n:
-        st.info(f"🔍 Toplam {len(urunler)} ürün bulundu, en alakalı {top_n} ürün gösteriliyor.")
+    urunler = sonuc["urunler"]
+    if sonuc["toplam"] > len(urunler):
+        st.info(f"🔍 Toplam {sonuc['toplam']} ürün bulundu, en alakalı {len(urunler)} ürün gösteriliyor.")
     else:
-        st.success(f"**{len(urunler)}** farklı ürün bulundu")
-
-    for _, urun in gosterilecek_urunler.iterrows():
-        urun_kod = _safe_str(urun['urun_kod'])
-        urun_ad = _safe_str(urun['urun_ad']) if urun['urun_ad'] else urun_kod
-        stoklu_magaza = int(urun['stoklu_magaza'])
+        st.success(f"**{sonuc['toplam']}** farklı ürün bulundu")
 
-        urun_df = df[df['urun_kod'] == urun_kod].copy()
-        urun_df_stoklu = urun_df[urun_df['stok_adet'] > 0].sort_values('stok_adet', ascending=False)
+    # Tek ürün (kod araması vb.) doğrudan açık gelsin
+    tek_urun = len(urunler) == 1
+    magaza_html = sonuc["magaza_html"]
 
-        # Toplam bölge stoku
-        toplam_stok = int(urun_df_stoklu['stok_adet'].sum()) if not urun_df_stoklu.empty else 0
+    for urun in urunler:
+        urun_kod = _safe_str(urun['urun_kod'])
+        urun_ad = _safe_str(urun['urun_ad'])
+        stoklu_magaza = urun['stoklu_magaza']
+        toplam_stok = urun['toplam_stok']
+        fiyat_str = urun['fiyat_str']
 
-        # Fiyatı ürün seviyesinde al (ilk geçerli fiyat)
-        ham_fiyat = urun_df_stoklu['birim_fiyat'].dropna()
-        ham_fiyat = ham_fiyat[ham_fiyat > 0]
-        if not ham_fiyat.empty:
-            fiyat_val = float(ham_fiyat.iloc[0])
-            fiyat_str = f"{fiyat_val:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " ₺"
-        else:
-            fiyat_str = ""
+        stok_bilinmiyor = urun.get('stok_bilinmiyor', False)
 
-        icon = "📦" if stoklu_magaza > 0 else "❌"
+        icon = "⏳" if stok_bilinmiyor else ("📦" if stoklu_magaza > 0 else "❌")
         fiyat_badge = f"  ⸱  {fiyat_str}" if fiyat_str else ""
-        baslik = f"{icon} {urun_kod}  •  {urun_ad[:40]}  •  🏪 {stoklu_magaza} mağaza{fiyat_badge}"
+        magaza_badge = "" if stok_bilinmiyor else f"  •  🏪 {stoklu_magaza} mağaza"
+        baslik = f"{icon} {urun_kod}  •  {urun_ad[:40]}{magaza_badge}{fiyat_badge}"
 
-        with st.expander(baslik, expanded=False):
+        with _urun_expander(baslik, urun_kod, tek_urun) as acik:
             # Üst bilgi satırı: Fiyat + Toplam Bölge Stoku
             badges_html = ""
             if fiyat_str:
@@ -808,73 +635,25 @@ def goster_sonuclar(df: pd.DataFrame, arama_text: str):
                      font-size:1.05rem; margin-left:8px;">📊 Toplam Bölge Stok: {toplam_stok}</div>"""
             if badges_html:
                 st.markdown(_latin1_safe(f'<div style="margin-bottom:12px;">{badges_html}</div>'), unsafe_allow_html=True)
-            if urun_df_stoklu.empty:
+            if stok_bilinmiyor:
+                st.info("Stok bilgisi şu an alınamıyor. Lütfen kısa süre sonra tekrar arayın.")
+            elif stoklu_magaza == 0:
                 st.error("Bu ürün hiçbir mağazada stokta yok!")
-            else:
-                html_cards = []
-                for _, row in urun_df_stoklu.iterrows():
-                    try:
-                        seviye, _, renk = get_stok_seviye(row['stok_adet'])
-                    except:
-                        seviye, renk = "Normal", "#3498db"
-
-                    magaza_ad = _safe_html(row['magaza_ad'] or row['magaza_kod'])
-
-                    # Güvenli Veri Çekme
-                    sm = _safe_html(row.get('sm_kod') or "-")
-                    bs = _safe_html(row.get('bs_kod') or "-")
-                    magaza_kod = _safe_html(row.get('magaza_kod') or "-")
-                    seviye_escaped = _safe_html(seviye)
-
-                    # Harita Linki
-                    lat = row.get('latitude')
-                    lon = row.get('longitude')
-
-                    harita_ikonu = ""
-                    if lat and lon:
-                        try:
-                            lat_f = float(lat)
-                            lon_f = float(lon)
-                            harita_ikonu = (
-                                f'<a href="https://www.google.com/maps?q={lat_f},{lon_f}" '
-                                'target="_blank" '
-                                'rel="noopener noreferrer" '
-                                'style="text-decoration:none; margin-left:8px; padding:4px 8px; '
-                                'border-radius:12px; background:#eef2ff; color:#374151; font-size:0.78rem;" '
-                                'title="Yol tarifi al">'
-                                '📍 Yol tarifi</a>'
-                            )
-                        except (TypeError, ValueError):
-                            harita_ikonu = ""
-
-                    html_cards.append(f"""
-                    <div style="
-                        background: linear-gradient(135deg, {renk}22 0%, {renk}11 100%);
-                        border-left: 4px solid {renk};
-                        border-radius: 8px;
-                        padding: 12px 16px;
-                        margin-bottom: 8px;
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        flex-wrap: wrap;
-                        gap: 8px;
-                    ">
-                        <div style="flex: 1; min-width: 200px;">
-                            <div style="font-weight: 600; font-size: 1rem; color: #1e3a5f; display:flex; align-items:center;">
-                                {magaza_ad}
-                                {harita_ikonu}
-                            </div>
-                            <div style="font-size: 0.85rem; color: #666; margin-top: 4px;">
-                                <b>SM:</b> {sm}  •  <b>BS:</b> {bs}  •  <i>{magaza_kod}</i>
-                            </div>
-                        </div>
-                        <div style="background: {renk}; color: white; padding: 6px 14px; border-radius: 20px; font-weight: 600; font-size: 0.85rem;">
-                            {seviye_escaped}
-                        </div>
-                    </div>
-                    """)
-                st.markdown(_latin1_safe("".join(html_cards)), unsafe_allow_html=True)
+            elif acik():
+                # 2. aşama: mağaza satırları ilk açılışta çekilir, HTML'i sonuçta saklanır
+                if urun_kod not in magaza_html:
+                    with olc("magaza_satirlari"):
+                        magaza_satir_df = magaza_satirlari(urun_kod)
+                    if magaza_satir_df is None:
+                        st.warning("Mağaza stokları şu an alınamadı. Lütfen kısa süre sonra tekrar deneyin.")
+                        continue
+                    kayitlar = magaza_kayitlari(magaza_satir_df)
+                    with olc("kart_html"):
+                        magaza_html[urun_kod] = _magaza_kartlari_html(kayitlar) if kayitlar else ""
+                if magaza_html[urun_kod]:
+                    st.markdown(magaza_html[urun_kod], unsafe_allow_html=True)
+                else:
+                    st.error("Bu ürün hiçbir mağazada stokta yok!")
 
 
 # ============================================================================
@@ -910,138 +689,8 @@ def main():
         )
         ara_btn = st.form_submit_button("🔍 Ara", use_container_width=True, type="primary")
 
-    # Autocomplete önerileri (client-side, performans dostu)
-    oneriler = get_oneri_listesi()
-    if oneriler:
-        import json
-        import streamlit.components.v1 as components
-        # json.dumps default olarak </ ve <! escape etmez → inline <script>
-        # içine embed ederken script-tag break / HTML comment başlangıcı riskine
-        # karşı bu iki pattern'i nötralize ediyoruz.
-        _ac_data = (
-            json.dumps(oneriler, ensure_ascii=True)
-            .replace("</", "<\\/")
-            .replace("<!--", "<\\!--")
-        )
-        _ac_js = """
-<script>
-(function(){
-try{
-var S=__DATA__;
-var pd=window.parent.document;
-var inp=pd.querySelector('input[placeholder*="Ürün kodu"]');
-if(!inp)return;
-var old=pd.getElementById('ac-dd');if(old)old.remove();
-if(inp._acIn)inp.removeEventListener('input',inp._acIn);
-if(inp._acFo)inp.removeEventListener('focus',inp._acFo);
-if(inp._acKu)inp.removeEventListener('keyup',inp._acKu);
-
-var dd=pd.createElement('div');dd.id='ac-dd';
-dd.style.cssText='display:none;position:absolute;left:0;right:0;top:100%;background:white;border:1px solid #e0e0e0;border-top:none;border-radius:0 0 12px 12px;box-shadow:0 4px 12px rgba(0,0,0,0.1);max-height:280px;overflow-y:auto;z-index:9999;';
-var wr=inp.closest('[data-testid="stTextInput"]')||inp.parentElement;
-wr.style.position='relative';wr.appendChild(dd);
-
-dd.addEventListener('click',function(e){
-  var it=e.target.closest('[data-t]');if(!it)return;
-  var t=it.getAttribute('data-t') || '';
-  var parts=t.split(' - ');
-  var kod=parts.length>=2?parts[0].trim():'';
-  var ad=parts.length>=2?parts[1].trim():t.trim();
-  // Set product name in input
-  var st=Object.getOwnPropertyDescriptor(HTMLInputElement.prototype,'value').set;
-  st.call(inp,ad);
-  // Store selected code in hidden attribute
-  inp.setAttribute('data-selected-kod', kod);
-  inp.dispatchEvent(new Event('input',{bubbles:true}));
-  setTimeout(function(){inp.dispatchEvent(new Event('change',{bubbles:true}));inp.blur();},50);
-  dd.style.display='none';
-});
-
-function esc(s){return s.replace(/&/g,'&amp;').replace(/"/g,'&quot;').replace(/</g,'&lt;');}
-function norm(s){
-  var map={'\\u0130':'i','I':'i','\\u0131':'i','\\u011e':'g','\\u011f':'g','\\u00dc':'u','\\u00fc':'u','\\u015e':'s','\\u015f':'s','\\u00d6':'o','\\u00f6':'o','\\u00c7':'c','\\u00e7':'c'};
-  var out='';
-  for(var i=0;i<s.length;i++){out+=map[s[i]]||s[i];}
-  if(out.normalize){out=out.normalize('NFD').replace(/[\u0300-\u036f]/g,'');}
-  return out.toLowerCase().replace(/\\s+/g,' ').trim();
-}
-
-var IDX=S.map(function(raw){
-  var parts=raw.split(' - ');
-  var kod=parts.length>=2?parts[0].trim():'';
-  var ad=parts.length>=2?parts[1].trim():raw;
-  var fiyat=parts.length>=3?parts[2].trim():'';
-  var nKod=norm(kod);
-  var nAd=norm(ad);
-  return {raw:raw,kod:kod,ad:ad,fiyat:fiyat,nKod:nKod,nAd:nAd};
-});
-
-function show(v){
-  if(v.length<2){dd.style.display='none';return;}
-  var q=norm(v);
-  if(!q){dd.style.display='none';return;}
-
-  function score(it){
-    var ad=it.nAd, kod=it.nKod;
-    if(!ad && !kod) return -1;
-    if(ad===q) return 1000;
-    if(ad.indexOf(q)===0) return 920;
-
-    var isShort=q.length<=2;
-    var adWords=ad.split(' ');
-    for(var i=0;i<adWords.length;i++){
-      if(adWords[i].indexOf(q)===0) return 820;
-    }
-
-    // Short queries: only match word-start to reduce noise
-    if(!isShort && ad.indexOf(q)!==-1) return 560;
-
-    if(kod && kod.indexOf(q)===0) return isShort ? 280 : 320;
-    if(!isShort && kod && kod.indexOf(q)!==-1) return 180;
-
-    // Short query: try compact match
-    if(isShort){
-      var compact=ad.replace(/\s+/g,'');
-      if(compact.indexOf(q)===0) return 700;
-    }
-
-    return -1;
-  }
-
-  var m=[];
-  for(var i=0;i<IDX.length;i++){
-    var it=IDX[i];
-    var sc=score(it);
-    if(sc>0){m.push({it:it,sc:sc});}
-  }
-  m.sort(function(a,b){return b.sc-a.sc || a.it.raw.length-b.it.raw.length;});
-  m=m.slice(0,12).map(function(x){return x.it;});
-  if(!m.length){dd.style.display='none';return;}
-  dd.innerHTML=m.map(function(it){
-    var kod=it.kod,ad=it.ad,fiyat=it.fiyat,s=it.raw;
-    var label='<span style="color:#333;font-size:0.92rem;">';
-    if(kod) label+=esc(kod)+'-'+esc(ad);
-    else label+=esc(ad);
-    if(fiyat) label+='<span style="color:#e53935;font-weight:600;margin-left:4px;">'+esc(fiyat)+'TL</span>';
-    label+='</span>';
-    return '<div data-t="'+esc(s)+'" style="padding:9px 14px;cursor:pointer;display:flex;align-items:center;gap:8px;border-bottom:1px solid #f5f5f5;transition:background 0.15s;" onmouseover="this.style.background=\\'#f5f5fa\\'" onmouseout="this.style.background=\\'white\\'">'
-    +'<svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="#bbb" stroke-width="2" stroke-linecap="round"><circle cx="11" cy="11" r="8"/><line x1="21" y1="21" x2="16.65" y2="16.65"/></svg>'
-    +label+'</div>';
-  }).join('');
-  dd.style.display='block';
-}
-
-inp._acIn=function(e){show(e.target.value);};
-inp._acFo=function(){if(inp.value.length>=2)show(inp.value);};
-inp._acKu=function(){show(inp.value);};
-inp.addEventListener('input',inp._acIn);
-inp.addEventListener('focus',inp._acFo);
-inp.addEventListener('keyup',inp._acKu);
-pd.addEventListener('click',function(e){if(!dd.contains(e.target)&&e.target!==inp)dd.style.display='none';});
-}catch(e){}
-})();
-</script>""".replace('__DATA__', _ac_data)
-        components.html(_ac_js, height=0, scrolling=False)
+    # Autocomplete önerileri (sunucu tarafı prefix index, bkz. arama/oneri_index.py)
+    _autocomplete_fragment()
 
     # Popüler Aramalar (Yatay kaydırmalı pill butonlar)
     def set_search_and_run(term):
@@ -1062,12 +711,12 @@ pd.addEventListener('click',function(e){if(!dd.contains(e.target)&&e.target!==in
         with st.spinner("Aranıyor..."):
             df = ara_urun(pop_term)
             # Sonuçları session state'e kaydet (poster rerun'larına dayanıklı)
-            st.session_state["_fe_search_result"] = {"df": df, "term": pop_term}
+            arama_sonucunu_kaydet(df, pop_term)
     elif ara_btn:
         if arama_text and len(arama_text) >= 2:
             with st.spinner("Aranıyor..."):
                 df = ara_urun(arama_text)
-                st.session_state["_fe_search_result"] = {"df": df, "term": arama_text}
+                arama_sonucunu_kaydet(df, arama_text)
         elif arama_text:
             st.info("En az 2 karakter girin.")
 
@@ -1080,7 +729,7 @@ pd.addEventListener('click',function(e){if(!dd.contains(e.target)&&e.target!==in
     # Hotspot tıklandı → aramayı yap, sonucu kaydet
     if click_result:
         df = ara_urun(click_result)
-        st.session_state["_fe_search_result"] = {"df": df, "term": click_result}
+        arama_sonucunu_kaydet(df, click_result)
 
     # Kaydedilmiş arama sonuçlarını göster (poster üstünde placeholder'a)
     if "_fe_search_result" in st.session_state:
@@ -1091,7 +740,7 @@ pd.addEventListener('click',function(e){if(!dd.contains(e.target)&&e.target!==in
                 if st.button("Temizle", key="fe_clear_results", use_container_width=True):
                     st.session_state.pop("_fe_search_result", None)
                     st.rerun()
-            goster_sonuclar(sr["df"], sr["term"])
+            goster_sonuclar(sr.get("sonuc"), sr["term"])
 
 
 # ============================================================================
@@ -1103,38 +752,26 @@ def _frontend_poster_viewer():
 
     Performans:
     - Poster resimleri DB'den okunur (session bağımsız, her kullanıcı görür)
-    - Sadece aktif sayfanın image'ı component'a gönderilir
+    - Component'a sadece sayfa manifesti gider (etiket, URL, boyut, hotspot);
+      tarayıcı aktif sayfayı ve ±1 komşusunu yükler, gerisi kaydırdıkça gelir
     - Hotspot tıklayınca mevcut _pop_arama mekanizması tetiklenir (kod değişmez)
     """
     from components.poster_viewer import poster_viewer
-    from storage import init_db, list_all_weeks, list_mappings_for_week, list_all_mappings_for_week, get_poster_pages, get_week
+    from storage import init_db, get_published_weeks_manifest, get_week_hotspots, get_poster_pages_display
+    from poster.hotspot_index import page_hotspots
 
-    # DB hazır mı
+    # DB hazır mı (process başına bir kez çalışır)
     if "fe_db_ready" not in st.session_state:
         init_db()
         st.session_state["fe_db_ready"] = True
 
-    weeks = list_all_weeks()
+    # Yayındaki haftalar (meta yoksa göster — geriye uyum), sıralı, adlarıyla:
+    # tek RPC, process genelinde cache'li; yayınla/geri al cache'i düşürür
+    manifest = get_published_weeks_manifest()
+    weeks = [w["week_id"] for w in manifest["weeks"]]
     if not weeks:
-        return  # Henüz poster yok, sessizce geç
-
-    # Sadece yayında olan haftaları göster (meta yoksa göster — geriye uyum)
-    visible_weeks = []
-    week_meta_cache = {}
-    for w in weeks:
-        meta = get_week(w)
-        week_meta_cache[w] = meta
-        if meta is None or meta.get("status") == "published":
-            visible_weeks.append(w)
-    weeks = visible_weeks
-    if not weeks:
-        return
-
-    # Hafta adlarını al (cached metadata kullan)
-    week_names = {}
-    for w in weeks:
-        meta = week_meta_cache.get(w)
-        week_names[w] = (meta.get("week_name") if meta else None) or w
+        return  # Henüz yayında poster yok, sessizce geç
+    week_names = {w["week_id"]: w["week_name"] or w["week_id"] for w in manifest["weeks"]}
 
     # İlk hafta varsayılan olarak seçili
     if "fe_week_select" not in st.session_state or st.session_state["fe_week_select"] not in weeks:
@@ -1153,12 +790,9 @@ def _frontend_poster_viewer():
                 st.session_state.pop("_pv_cache_fe_poster_viewer", None)
                 st.rerun()
 
-    # Poster sayfalarını DB'den yükle (cache)
-    cache_key = f"_fe_dbpages_{selected_week}"
-    if cache_key not in st.session_state:
-        st.session_state[cache_key] = get_poster_pages(selected_week)
-
-    poster_pages = st.session_state[cache_key]
+    # Sayfa listesi process genelindeki cache'ten; görseller upload'ta üretilmiş
+    # display varyantlarının URL'leri (tarayıcı doğrudan Storage'dan çeker)
+    poster_pages = get_poster_pages_display(selected_week)
     if not poster_pages:
         return
 
@@ -1175,21 +809,19 @@ def _frontend_poster_viewer():
 
     pg = poster_pages[cur_idx]
 
-    # Tüm sayfaları component'a gönder — navigasyon tamamen component içinde
-    # Tek sorguda tüm mapping'leri al (7 ayrı HTTP yerine 1)
-    all_mappings = list_all_mappings_for_week(selected_week)
+    # Tüm sayfaların manifesti component'a — navigasyon tamamen component içinde
+    # Mapping'ler hafta versiyonu başına bir kez sayfalara gruplanır (tüm session'lar paylaşır)
+    week_hotspots = get_week_hotspots(selected_week)
     all_comp_pages = []
     for i, pp in enumerate(poster_pages):
-        fn, pno = pp["flyer_filename"], pp["page_no"]
-        m = [mx for mx in all_mappings if mx.get("flyer_filename") == fn and mx.get("page_no") == pno]
-        hs = [{
-            "x0": mx["x0"], "y0": mx["y0"], "x1": mx["x1"], "y1": mx["y1"],
-            "urun_kodu": mx.get("urun_kodu") or "",
-        } for mx in m]
         all_comp_pages.append({
+            "id": pp["id"],
+            "display": pp["display"],
+            "width": pp["width"],
+            "height": pp["height"],
             "png_bytes": pp["png_data"],
             "label": pp["title"] or f'Sayfa {i + 1}',
-            "hotspots": hs,
+            "hotspots": page_hotspots(week_hotspots, pp["flyer_filename"], pp["page_no"]).hotspots,
         })
 
     # Component: search mode — navigasyon component içinde, hotspot tıklayınca urun_kodu döner
@@ -1206,11 +838,20 @@ def _frontend_poster_viewer():
     if result and isinstance(result, dict):
         if result.get("type") == "hotspot_click":
             urun_kodu = (result.get("urun_kodu") or "").strip()
+            page_idx = result.get("page_index")
+            # Tıklama noktası güncel gruplamayla da çözülür: sayfa çizildikten
+            # sonra mapping değiştiyse component'taki kopya eski kalmış olabilir
+            x, y = result.get("x"), result.get("y")
+            if x is not None and y is not None and page_idx is not None and 0 <= page_idx < total_pages:
+                pp = poster_pages[page_idx]
+                hit = page_hotspots(week_hotspots, pp["flyer_filename"], pp["page_no"]).hit(
+                    float(x), float(y))
+                if hit and hit["urun_kodu"]:
+                    urun_kodu = hit["urun_kodu"].strip()
             click_ts = result.get("ts", 0)
             if urun_kodu and click_ts != st.session_state.get("_fe_last_click_ts"):
                 st.session_state["_fe_last_click_ts"] = click_ts
                 st.session_state["_fe_scroll_top"] = True
-                page_idx = result.get("page_index")
                 if page_idx is not None:
                     st.session_state["fe_pv_idx"] = page_idx
                 return urun_kodu
@@ -1735,7 +1376,7 @@ def _mapping_tool_tab():
 def _clear_week_session_state(week_id: str | None = None):
     """Hafta silindiğinde tüm ilişkili session state'i temizle."""
     # Prefix-based temizlik
-    prefixes = ("_fe_dbpages_", "_pv_cache_", "_confirm_del_page_",
+    prefixes = ("_pv_cache_", "_confirm_del_page_",
                 "_confirm_del_week", "_confirm_del_wl_")
     for k in list(st.session_state.keys()):
         if any(k.startswith(p) for p in prefixes):
@@ -1766,7 +1407,7 @@ def _poster_viewer_tab():
     from components.poster_viewer import poster_viewer
     from storage import (
         list_mappings as _pv_list,
-        get_poster_pages, get_poster_pages_meta,
+        get_poster_pages_display, get_poster_pages_meta, get_week_hotspots,
         update_poster_page, delete_poster_page,
         delete_week, list_all_weeks, get_week, update_week_status,
         list_weeks_with_meta, get_mapped_product_codes, get_week_products,
@@ -1892,6 +1533,23 @@ def _poster_viewer_tab():
                     f"{stats['skipped']} atlandı, {stats['errors']} hata"
                 )
 
+    # --- Görüntüleme varyantları (eski yüklemeler için backfill) ---
+    _eksik_varyant = [p for p in poster_pages_meta if p["image_path"] and not (p.get("display_rev") and p.get("img_w"))]
+    if _eksik_varyant:
+        with st.expander(f"Görüntüleme Varyantlarını Oluştur ({len(_eksik_varyant)} sayfa)", expanded=False):
+            st.caption("Bu sayfalar varyantlardan önce yüklenmiş; ziyaretçide her seferinde yeniden boyutlanıyor. "
+                       "600/1200 px JPEG + WebP kopyaları bir kez üretilip Supabase'e yüklenir.")
+            if st.button("Varyantları Oluştur", key="pv_backfill_display", type="primary", use_container_width=True):
+                from storage import backfill_display_variants
+                progress = st.progress(0, text="Başlıyor...")
+                def _update_display_progress(current, total):
+                    progress.progress(current / total, text=f"{current}/{total} işlendi...")
+                stats = backfill_display_variants(selected_week, progress_callback=_update_display_progress)
+                progress.empty()
+                st.success(f"Tamamlandı: {stats['rendered']} sayfa, {stats['errors']} hata")
+                st.session_state.pop("_pv_cache_poster_viewer_admin", None)
+                st.session_state.pop("_pv_cache_fe_poster_viewer", None)
+
     # --- Yeni Afiş Ekleme (mevcut haftaya) ---
     with st.expander("Bu Haftaya Yeni Afiş Ekle", expanded=False):
         new_pdfs = st.file_uploader("Afiş Dosyası (PDF / JPEG / PNG)", type=["pdf", "jpeg", "jpg", "png"],
@@ -2005,29 +1663,22 @@ def _poster_viewer_tab():
     st.markdown("---")
     st.markdown("#### Önizleme")
 
-    # Cache full poster pages (with images) in session_state to avoid re-downloading
-    _pv_cache_key = f"_pv_cache_{selected_week}"
-    if _pv_cache_key not in st.session_state:
-        st.session_state[_pv_cache_key] = get_poster_pages(selected_week)
-    poster_pages_full = st.session_state[_pv_cache_key]
+    # Display varyantı olan sayfalar URL ile, eskiler sayfa cache'inden gelir
+    poster_pages_full = get_poster_pages_display(selected_week)
 
-    # Group mappings by (flyer_filename, page_no) for O(1) lookup
-    from collections import defaultdict
-    _mappings_by_page = defaultdict(list)
-    for m in all_week_mappings:
-        _mappings_by_page[(m["flyer_filename"], m["page_no"])].append(m)
+    # Hotspot'lar hafta versiyonu başına bir kez gruplanır; mapping yazımları düşürür
+    from poster.hotspot_index import page_hotspots
+    week_hotspots = get_week_hotspots(selected_week)
 
     viewer_pages = []
     for pg in poster_pages_full:
-        page_mappings = _mappings_by_page.get((pg["flyer_filename"], pg["page_no"]), [])
-        hotspots = [{
-            "x0": m["x0"], "y0": m["y0"], "x1": m["x1"], "y1": m["y1"],
-            "urun_kodu": m.get("urun_kodu") or "?",
-            "urun_ad": m.get("urun_aciklamasi") or "",
-            "afis_fiyat": m.get("afis_fiyat") or "",
-        } for m in page_mappings]
+        hotspots = page_hotspots(week_hotspots, pg["flyer_filename"], pg["page_no"]).admin_hotspots
         label = pg["title"] or f'{pg["flyer_filename"]} - Sayfa {pg["page_no"]}'
         viewer_pages.append({
+            "id": pg["id"],
+            "display": pg["display"],
+            "width": pg["width"],
+            "height": pg["height"],
             "png_bytes": pg["png_data"],
             "label": label,
             "hotspots": hotspots,
@@ -2314,7 +1965,7 @@ def admin_panel():
         return output.getvalue()
 
     # ---- Conditional router (replaces st.tabs to avoid executing all tabs on every rerun) ----
-    _ADMIN_SECTIONS = ["Haftalar", "Eşleştir", "Poster Yönetimi", "Halk Günü", "Analitikler"]
+    _ADMIN_SECTIONS = ["Haftalar", "Eşleştir", "Poster Yönetimi", "Halk Günü", "Analitikler", "Performans"]
     if "admin_section" not in st.session_state:
         st.session_state["admin_section"] = "Eşleştir"
     active = st.segmented_control(
@@ -2337,6 +1988,8 @@ def admin_panel():
         _admin_halkgunu()
     elif active == "Analitikler":
         _admin_tab_analytics(df_to_xlsx)
+    elif active == "Performans":
+        _admin_tab_performans()
 
     # ---- Çıkış ----
     st.markdown("---")
@@ -4257,29 +3910,55 @@ def _admin_halkgunu_photos(event_id: str, event_meta: dict | None):
 # ADMIN TAB: Analitikler (mevcut arama log paneli)
 # ---------------------------------------------------------------------------
 
+# Terim listeleri (ekranda ilk 20, indirmede tamamı) için RPC üst sınırı
+_ANALITIK_TERIM_LIMIT = 1000
+
+
+def _rpc_df(fn: str, params: dict) -> pd.DataFrame:
+    client = get_supabase_client()
+    if not client:
+        return pd.DataFrame()
+    df = pd.DataFrame(client.rpc(fn, params).execute().data or [])
+    df.columns = [col.replace('out_', '') for col in df.columns]
+    return df
+
+
 @st.cache_data(ttl=300)
-def _fetch_analytics_data(baslangic: str):
-    """Fetch analytics data with 5-min cache to avoid re-querying on every rerun."""
+def _fetch_analytics_data(gun_sayisi: int, baslangic: str) -> dict:
+    """Sunucuda toplanmış analitik (5 dk cache): özet, terim listeleri, gün/saat hacmi.
+
+    arama_log taranmaz — rollup tabloları ve aggregate RPC'ler (arama_schema.sql §5-6).
+    gun_sayisi arama_pencere_durum'daki terim pencerelerinden biri olmalı (7/14/30).
+    """
     client = get_supabase_client()
     if not client:
-        return []
-    all_data = []
-    page_size = 1000
-    offset = 0
-    while True:
-        result = client.table('arama_log')\
-            .select('*')\
-            .gte('tarih', baslangic)\
-            .order('id', desc=True)\
-            .range(offset, offset + page_size - 1)\
-            .execute()
-        if not result.data:
-            break
-        all_data.extend(result.data)
-        if len(result.data) < page_size:
-            break
-        offset += page_size
-    return all_data
+        return {}
+    ozet = _rpc_df('arama_donem_ozet', {'p_pencere': gun_sayisi})
+    gunluk = client.table('arama_gunluk')\
+        .select('tarih, arama_sayisi, sonucsuz_arama')\
+        .gte('tarih', baslangic)\
+        .order('tarih')\
+        .execute()
+    saatlik = client.table('arama_saatlik')\
+        .select('saat, arama_sayisi')\
+        .gte('tarih', baslangic)\
+        .execute()
+    bugun = client.table('arama_log')\
+        .select('arama_terimi, arama_sayisi, sonuc_sayisi, son_arama_zamani')\
+        .eq('tarih', datetime.now().strftime('%Y-%m-%d'))\
+        .order('son_arama_zamani', desc=True)\
+        .limit(_ANALITIK_TERIM_LIMIT)\
+        .execute()
+    return {
+        'ozet': ozet.iloc[0].to_dict() if not ozet.empty else {},
+        'top': _rpc_df('arama_top_terimler', {
+            'p_pencere': gun_sayisi, 'p_limit': _ANALITIK_TERIM_LIMIT, 'p_sonuc': 'hepsi'}),
+        'sonucsuz': _rpc_df('arama_top_terimler', {
+            'p_pencere': gun_sayisi, 'p_limit': _ANALITIK_TERIM_LIMIT, 'p_sonuc': 'sonucsuz'}),
+        'gunluk': pd.DataFrame(gunluk.data or []),
+        'saatlik': pd.DataFrame(saatlik.data or []),
+        'bugun': pd.DataFrame(bugun.data or []),
+    }
 
 
 def _admin_tab_analytics(df_to_xlsx):
@@ -4297,54 +3976,66 @@ def _admin_tab_analytics(df_to_xlsx):
         today = datetime.now().strftime('%Y-%m-%d')
         baslangic = (datetime.now() - timedelta(days=gun_sayisi)).strftime('%Y-%m-%d')
 
-        all_data = _fetch_analytics_data(baslangic)
+        veri = _fetch_analytics_data(gun_sayisi, baslangic)
+        ozet = veri.get('ozet') or {}
 
-        if not all_data:
+        if not ozet.get('arama_sayisi'):
             st.warning("Henüz veri yok")
             return
 
-        df = pd.DataFrame(all_data)
-
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Toplam Arama", f"{df['arama_sayisi'].sum():,}")
+            st.metric("Toplam Arama", f"{int(ozet['arama_sayisi']):,}")
         with col2:
-            st.metric("Benzersiz Terim", f"{len(df['arama_terimi'].unique()):,}")
+            st.metric("Benzersiz Terim", f"{int(ozet['terim_sayisi']):,}")
         with col3:
-            sonucsuz = df[df['sonuc_sayisi'] == 0]['arama_sayisi'].sum()
-            st.metric("Sonuçsuz", f"{sonucsuz:,}")
+            st.metric("Sonuçsuz", f"{int(ozet['sonucsuz_arama']):,}")
+
+        # ---- GÜN / SAAT HACMİ ----
+        gunluk = veri['gunluk']
+        saatlik = veri['saatlik']
+        if not gunluk.empty or not saatlik.empty:
+            gcol, scol = st.columns(2)
+            if not gunluk.empty:
+                with gcol:
+                    st.caption("Günlük arama")
+                    st.bar_chart(gunluk.set_index('tarih')[['arama_sayisi', 'sonucsuz_arama']].rename(
+                        columns={'arama_sayisi': 'Arama', 'sonucsuz_arama': 'Sonuçsuz'}))
+            if not saatlik.empty:
+                with scol:
+                    st.caption("Saate göre arama")
+                    saat = saatlik.groupby('saat')['arama_sayisi'].sum().reindex(range(24), fill_value=0)
+                    st.bar_chart(saat.rename('Arama'))
 
         st.markdown("---")
 
         # ---- EN ÇOK ARANANLAR ----
         st.subheader("En Çok Arananlar")
-        top_full = df.groupby('arama_terimi').agg(
-            {'arama_sayisi': 'sum', 'sonuc_sayisi': 'last'}
-        ).reset_index()
-        top_full = top_full.sort_values('arama_sayisi', ascending=False)
-        top_full.columns = ['Terim', 'Arama', 'Sonuç']
-
-        st.dataframe(top_full.head(20), use_container_width=True, hide_index=True)
-
-        st.download_button(
-            "Tümünü İndir (xlsx)",
-            data=df_to_xlsx(top_full),
-            file_name=f"en_cok_arananlar_{today}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            key="dl_top"
-        )
+        top_full = veri['top']
+        if not top_full.empty:
+            top_full = top_full[['arama_terimi', 'arama_sayisi', 'sonuc_sayisi']]
+            top_full.columns = ['Terim', 'Arama', 'Sonuç']
+
+            st.dataframe(top_full.head(20), use_container_width=True, hide_index=True)
+
+            st.download_button(
+                "Tümünü İndir (xlsx)",
+                data=df_to_xlsx(top_full),
+                file_name=f"en_cok_arananlar_{today}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="dl_top"
+            )
 
         # ---- SONUÇ BULUNAMAYANLAR ----
         st.subheader("Sonuç Bulunamayanlar")
-        sonucsuz_full = df[df['sonuc_sayisi'] == 0].groupby('arama_terimi').agg(
-            {'arama_sayisi': 'sum'}
-        ).reset_index()
-        sonucsuz_full = sonucsuz_full.sort_values('arama_sayisi', ascending=False)
-        sonucsuz_full.columns = ['Terim', 'Arama']
+        sonucsuz_full = veri['sonucsuz']
 
         if sonucsuz_full.empty:
             st.success("Tüm aramalarda sonuç bulunmuş!")
         else:
+            sonucsuz_full = sonucsuz_full[['arama_terimi', 'arama_sayisi']]
+            sonucsuz_full.columns = ['Terim', 'Arama']
+
             st.dataframe(sonucsuz_full.head(20), use_container_width=True, hide_index=True)
 
             st.download_button(
@@ -4357,14 +4048,11 @@ def _admin_tab_analytics(df_to_xlsx):
 
         # ---- BUGÜN ARANANLAR ----
         st.subheader("Bugün Arananlar")
-        bugun = datetime.now().strftime('%Y-%m-%d')
-        bugun_full = df[df['tarih'] == bugun].copy()
+        bugun_full = veri['bugun']
 
         if bugun_full.empty:
             st.info("Bugün henüz arama yapılmamış")
         else:
-            sort_col = 'son_arama_zamani' if 'son_arama_zamani' in bugun_full.columns else 'id'
-            bugun_full = bugun_full.sort_values(sort_col, ascending=False)
             bugun_show = bugun_full[['arama_terimi', 'arama_sayisi', 'sonuc_sayisi']].copy()
             bugun_show.columns = ['Terim', 'Arama', 'Sonuç']
 
@@ -4379,7 +4067,203 @@ def _admin_tab_analytics(df_to_xlsx):
             )
 
     except Exception as e:
-        st.error(f"Hata: {e}")
+        if rpc_bulunamadi_mi(e):
+            st.error("Analitik RPC'leri bulunamadı — arama_schema.sql (bölüm 5-6) Supabase'de çalıştırılmalı.")
+        else:
+            st.error(f"Hata: {e}")
+
+
+# ---------------------------------------------------------------------------
+# ADMIN TAB: Performans (arama cache'i ve process içi sayaçlar)
+# ---------------------------------------------------------------------------
+
+def _format_bytes(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / (1024 * 1024):.1f} MB"
+    return f"{n / 1024:.0f} KB"
+
+
+def _format_sure(saniye) -> str:
+    if saniye is None:
+        return "-"
+    if saniye >= 3600:
+        return f"{saniye / 3600:.1f} sa"
+    return f"{saniye / 60:.0f} dk"
+
+
+def _admin_tab_performans():
+    """Process içi arama metrikleri — bu sayaçlar sadece çalışan replikaya aittir."""
+    from arama.artifact import versiyon_bilgisi, yuklu_nesneler
+
+    st.subheader("Veri Versiyonu")
+    vb = versiyon_bilgisi()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Aktif Versiyon", vb["versiyon"] or "düz dosyalar")
+    col2.metric("Yaş", _format_sure(vb["yas_saniye"]))
+    col3.metric("Saklanan", f"{len(vb['saklanan'])}")
+    if vb["yayinlandi"]:
+        st.caption(f"Yayınlandı: {vb['yayinlandi']:%d.%m.%Y %H:%M}")
+    nesneler = yuklu_nesneler()
+    if nesneler:
+        st.dataframe(pd.DataFrame([{
+            "Yapı": n["ad"],
+            "Kaynak": n["kaynak"] or "-",
+            "Kuruldu": f"{n['kuruldu']:%H:%M:%S}" if n["kuruldu"] else "-",
+            "Kurulum (ms)": round(n["kurulum_ms"]) if n["kurulum_ms"] is not None else None,
+            "Durum": "kuruluyor" if n["kuruluyor"] else ("yüklü" if n["yuklu"] else "yüklenmedi"),
+        } for n in nesneler]), hide_index=True, use_container_width=True)
+
+    st.subheader("Günlük Pipeline")
+    pd_durum = pipeline_scheduler.durum_oku()
+    if not pd_durum:
+        st.caption("Bu sunucuda henüz pipeline çalıştırılmadı.")
+    else:
+        etiket = {"calisiyor": "çalışıyor", "basarili": "başarılı", "hata": "hata"}
+        sure = pd_durum.get("sure_s")
+        if pd_durum.get("durum") == "calisiyor" and pd_durum.get("baslangic"):
+            sure = time.time() - pd_durum["baslangic"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Durum", etiket.get(pd_durum.get("durum"), "-"))
+        col2.metric("Gün", pd_durum.get("gun", "-"))
+        col3.metric("Süre", f"{sure:.0f} sn" if sure is not None else "-")
+        col4.metric("Deneme", f"{pd_durum.get('deneme', 0)}/{pipeline_scheduler.MAX_DENEME}")
+        bilgi = [f"Çalıştıran: {pd_durum.get('sahip', '-')}"]
+        if pd_durum.get("ilerleme"):
+            bilgi.append(f"Son adım: {pd_durum['ilerleme']}")
+        if pd_durum.get("son_basarili"):
+            bilgi.append(
+                f"Son başarılı: {datetime.fromtimestamp(pd_durum['son_basarili']):%d.%m.%Y %H:%M} "
+                f"({pd_durum.get('son_sure_s', 0):.0f} sn)"
+            )
+        st.caption(" • ".join(bilgi))
+        if pd_durum.get("durum") == "hata" and pd_durum.get("hata"):
+            sonraki = pd_durum.get("sonraki_deneme")
+            st.warning(
+                f"Son hata: {pd_durum['hata']}"
+                + (f" — tekrar deneme {datetime.fromtimestamp(sonraki):%H:%M}" if sonraki else "")
+            )
+
+    st.subheader("Arama Aşama Süreleri")
+    st.caption("Aşama başına son 2000 ölçüm (ms). Kapalıyken ölçüm yapılmaz.")
+    acik = st.toggle("Ölçüm açık", value=metrikler.etkin(), key="perf_metrik_acik")
+    if acik != metrikler.etkin():
+        metrikler.etkinlestir(acik)
+    asamalar = metrikler.asama_ozeti()
+    if not asamalar:
+        st.caption("Henüz ölçüm yok.")
+    else:
+        st.dataframe(pd.DataFrame([{
+            "Aşama": a["ad"],
+            "Adet": a["adet"],
+            "Ort.": round(a["ort_ms"], 1),
+            "p50": round(a["p50_ms"], 1),
+            "p95": round(a["p95_ms"], 1),
+            "p99": round(a["p99_ms"], 1),
+            "Max": round(a["max_ms"], 1),
+        } for a in sorted(asamalar, key=lambda a: -a["p95_ms"])]), hide_index=True, use_container_width=True)
+    sayac = metrikler.sayaclar()
+    etiketler = {"fallback_derinlik": "Sonucu veren basamak", "timeout": "Timeout",
+                 "hata": "Hata", "sonuc_cache": "Sonuç cache"}
+    for ad, degerler in sayac.items():
+        st.caption(f"{etiketler.get(ad, ad)}: " + " • ".join(
+            f"{etiket or '-'} {adet:,}" for etiket, adet in sorted(degerler.items(), key=lambda x: -x[1])
+        ))
+    if st.button("Ölçümleri Sıfırla", key="perf_metrik_sifirla"):
+        metrikler.sifirla()
+        st.rerun()
+
+    st.subheader("Arama RPC Koruması")
+    st.caption("Veritabanına aynı anda giden arama RPC'si uyarlanır bir sınırla tutulur; "
+               "ardışık hatalarda devre açılır ve aramalar kısıtlı moda geçer.")
+    kr = arama_motoru.get_rpc_koruma().stats()
+    durum_etiketi = {"kapali": "normal", "acik": "AÇIK (kısıtlı)", "yari_acik": "deneniyor"}
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Devre", durum_etiketi.get(kr["durum"], kr["durum"]))
+    col2.metric("Eşzamanlılık Sınırı", f"{kr['limit']:.1f}", help=f"uçuşta {kr['ucusta']}")
+    col3.metric("Reddedilen", f"{kr['reddedilen']:,}")
+    col4.metric("Devre Açılma", f"{kr['acilma']:,}")
+    bilgi = [f"başarılı {kr['basarili']:,}", f"hata {kr['hatalar']:,}"]
+    if kr["durum"] == "acik":
+        bilgi.append(f"deneme {kr['acik_kalan']:.0f} sn sonra")
+    st.caption(" • ".join(bilgi))
+
+    st.subheader("Arama Sonuç Önbelleği")
+    st.caption("Tüm oturumlar arasında paylaşılır. Stok yüklemesi (09:00) veya yeni veri versiyonu yayınlanınca temizlenir.")
+
+    stats = get_sonuc_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("İsabet (hit)", f"{stats['hits']:,}")
+    col2.metric("Iska (miss)", f"{stats['misses']:,}")
+    col3.metric("İsabet Oranı", f"%{stats['hit_rate'] * 100:.1f}")
+    col4.metric("Kayıt", f"{stats['entries']:,}")
+    st.caption(
+        f"Bellek: {_format_bytes(stats['bytes'])} / {_format_bytes(stats['max_bytes'])} • "
+        f"TTL: {int(stats['ttl'] // 60)} dk • Çıkarılan: {stats['evictions']:,} • "
+        f"Geçersizleştirme: {stats['invalidations']:,} • Kısıtlı modda bayat: {stats['bayat_hits']:,}"
+    )
+    mc = get_magaza_cache().stats()
+    st.caption(
+        f"Mağaza satırları (kart açılınca): {mc['entries']:,} ürün • "
+        f"{_format_bytes(mc['bytes'])} • isabet %{mc['hit_rate'] * 100:.1f}"
+    )
+    if st.button("Önbelleği Temizle", key="perf_cache_clear"):
+        get_sonuc_cache().clear()
+        get_magaza_cache().clear()
+        st.rerun()
+
+    st.subheader("Afiş Sayfa Önbelleği")
+    st.caption("Afiş sayfa görselleri tüm oturumlar arasında paylaşılır; sayfa kaydet/güncelle/sil işlemleri ilgili haftayı düşürür.")
+    from storage import clear_poster_page_cache, poster_page_cache_stats
+    ps = poster_page_cache_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Sayfa", f"{ps['images']:,}", help=f"{ps['weeks']:,} hafta listesi")
+    col2.metric("Bellek", _format_bytes(ps["bytes"]), help=f"bütçe {_format_bytes(ps['max_bytes'])}")
+    col3.metric("İsabet Oranı", f"%{ps['hit_rate'] * 100:.1f}")
+    col4.metric("İndirme", f"{ps['misses']:,}")
+    st.caption(f"Çıkarılan: {ps['evictions']:,} • Geçersizleştirme: {ps['invalidations']:,}")
+    if st.button("Afiş Önbelleğini Temizle", key="perf_poster_cache_clear"):
+        clear_poster_page_cache()
+        st.rerun()
+
+    st.subheader("Arama Log Kuyruğu")
+    st.caption("Aramalar bellekte sayılır, birkaç saniyede bir tek RPC ile arama_log'a yazılır.")
+    lk = get_log_kuyrugu(_arama_log_yaz).stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Bekleyen", f"{lk['bekleyen_arama']:,}", help=f"{lk['bekleyen']:,} farklı terim")
+    col2.metric("Yazılan Kayıt", f"{lk['yazilan']:,}")
+    col3.metric("Toplu Yazma", f"{lk['flush']:,}")
+    col4.metric("Hata", f"{lk['hatalar']:,}")
+    bilgi = [f"Aralık: {lk['aralik']:.0f} sn"]
+    if lk["son_flush_ms"] is not None:
+        bilgi.append(f"son yazma {lk['son_flush_ms']:.0f} ms")
+    if lk["dusurulen"]:
+        bilgi.append(f"düşürülen {lk['dusurulen']:,}")
+    st.caption(" • ".join(bilgi))
+    if lk["son_hata"]:
+        st.warning(f"Son hata: {lk['son_hata']}")
+
+    st.subheader("RPC Birleştirme (single-flight)")
+    st.caption("Aynı anda aynı terimle gelen aramalar tek Supabase isteğini paylaşır.")
+    sf = get_rpc_group().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("RPC Çağrısı", f"{sf['calls']:,}")
+    col2.metric("Giden İstek", f"{sf['executed']:,}")
+    col3.metric("Birleştirilen", f"{sf['collapsed']:,}")
+    col4.metric("Birleştirme Oranı", f"%{sf['collapse_rate'] * 100:.1f}")
+
+    st.subheader("Autocomplete")
+    from arama.oneri_index import get_oneri_index
+    oneri_index = get_oneri_index()
+    if oneri_index is None:
+        st.caption("oneri_listesi.json yüklenemedi.")
+    else:
+        ac = oneri_index.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Sorgu", f"{ac['lookups']:,}")
+        col2.metric("Ortalama", f"{ac['avg_ms']:.2f} ms")
+        col3.metric("p95", f"{ac['p95_ms']:.2f} ms")
+        col4.metric("En Yavaş", f"{ac['max_ms']:.2f} ms")
+        st.caption(f"Index: {len(oneri_index):,} öneri • son 1000 sorgu üzerinden")
 
 
 # ---------------------------------------------------------------------------
@@ -10,55 +10,36 @@ from __future__ import annotations
 
 import json
 import os
-import re
+import sys
 import time
-import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from arama.artifact import atomik_kopyala, yayinla, yeni_versiyon_dizini
+from arama.yazim import yazim_frekanslari, yazim_sozlugu_kaydet
+from utils_text import normalize_tr_search, normalize_tr_search_series
 
 
 DATA_DIR = Path("data")
 MASTER_PARQUET = DATA_DIR / "urun_master.parquet"
 MASTER_JSON = DATA_DIR / "urun_master.json"
 ONERI_JSON = DATA_DIR / "oneri_listesi.json"
+YAZIM_JSON = DATA_DIR / "yazim_sozluk.json"
+MANIFEST_JSON = DATA_DIR / "urun_master_manifest.json"
+ARALIK_ONBELLEK_DIR = DATA_DIR / "stok_araliklari"
+MANIFEST_VERSIYON = 1
 
 
 def normalize_urun_ad(text: str) -> str:
     """SQL normalize_tr_search ile uyumlu sade normalize."""
-    if not text:
-        return ""
-
-    tr_map = {
-        'İ': 'i', 'I': 'i', 'ı': 'i',
-        'Ğ': 'g', 'ğ': 'g',
-        'Ü': 'u', 'ü': 'u',
-        'Ş': 's', 'ş': 's',
-        'Ö': 'o', 'ö': 'o',
-        'Ç': 'c', 'ç': 'c',
-    }
-
-    result = text
-    for tr_char, ascii_char in tr_map.items():
-        result = result.replace(tr_char, ascii_char)
-
-    result = unicodedata.normalize('NFKD', result)
-    result = ''.join(c for c in result if not unicodedata.combining(c))
-    result = result.lower()
-
-    result = result.replace('makinasi', 'makine')
-    result = result.replace('makinesi', 'makine')
-    result = result.replace('makina', 'makine')
-
-    for c, r in {
-        '\u201c': '', '\u201d': '', '\u2019': '',
-        '\u00a0': ' ', '\u0307': '',
-    }.items():
-        result = result.replace(c, r)
-
-    result = re.sub(r'(tv|televizyon)(\d)', r'\1 \2', result)
-    result = re.sub(r'\s+', ' ', result).strip()
-    return result
+    return normalize_tr_search(text)
 
 
 def get_supabase_client():
@@ -71,16 +52,32 @@ def get_supabase_client():
     return create_client(url, key)
 
 
-def _fetch_page_with_retry(client, last_id: int, page_size: int, max_retries: int = 5):
-    """Tek bir sayfayı cursor-based pagination + retry ile çek."""
+# Paralel keyset fetch: id uzayı sabit genişlikte aralıklara bölünür, her
+# aralık kendi içinde id > last_id ile sayfalanır. Aynı anda en fazla
+# FETCH_PARALEL aralık Supabase'e gider (eski 0.3 s'lik bekleme yerine).
+FETCH_PARALEL = 4
+ID_ARALIK = 50_000
+
+_RAW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('urun_kod', pa.string()),
+    ('urun_ad', pa.string()),
+    ('birim_fiyat', pa.float64()),
+])
+
+
+def _fetch_page_with_retry(client, last_id: int, page_size: int, max_retries: int = 5,
+                           ust_id: int | None = None):
+    """Tek bir sayfayı cursor-based pagination + retry ile çek (ust_id hariç üst sınır)."""
     for attempt in range(max_retries):
         try:
-            result = client.table('stok_gunluk')\
+            query = client.table('stok_gunluk')\
                 .select('id, urun_kod, urun_ad, birim_fiyat')\
                 .order('id')\
-                .gt('id', last_id)\
-                .limit(page_size)\
-                .execute()
+                .gt('id', last_id)
+            if ust_id is not None:
+                query = query.lt('id', ust_id)
+            result = query.limit(page_size).execute()
             return result.data or []
         except Exception as e:
             if attempt < max_retries - 1:
@@ -91,29 +88,198 @@ def _fetch_page_with_retry(client, last_id: int, page_size: int, max_retries: in
                 raise
 
 
-def _fetch_urunler_raw(client, page_size: int = 5000, max_rows: int = 900000):
-    """stok_gunluk kaynağından ürün satırlarını cursor-based pagination ile çek."""
-    rows_out = []
-    last_id = 0
-    page_num = 0
+def _id_sinirlari(client) -> tuple[int, int] | None:
+    """stok_gunluk'taki en küçük ve en büyük id; tablo boşsa None."""
+    def _uc(desc: bool):
+        rows = client.table('stok_gunluk').select('id').order('id', desc=desc).limit(1).execute().data
+        return int(rows[0]['id']) if rows else None
+
+    alt, ust = _uc(False), _uc(True)
+    if alt is None or ust is None:
+        return None
+    return alt, ust
+
+
+def _id_araliklari(alt: int, ust: int, genislik: int = ID_ARALIK) -> list[tuple[int, int]]:
+    """[alt, ust] kapalı aralığını genişliğin katlarına hizalı [lo, hi) parçalarına böl.
+
+    Hizalama sabittir (lo = k * genislik) — böylece aynı aralık çalıştırmalar
+    arasında aynı anahtarla özetlenir/önbelleklenir (bkz. stok_aralik_ozet).
+    """
+    ilk = (alt // genislik) * genislik
+    return [(lo, lo + genislik) for lo in range(ilk, ust + 1, genislik)]
+
+
+def _aralik_ozetleri(client, genislik: int = ID_ARALIK) -> dict[str, dict] | None:
+    """stok_aralik_ozet RPC'si: {str(lo): {satir, max_id, checksum}}; RPC yoksa None."""
+    try:
+        rows = client.rpc('stok_aralik_ozet', {'p_genislik': genislik}).execute().data or []
+    except Exception as e:
+        print(f"  stok_aralik_ozet kullanılamadı, tam fetch yapılacak: {e}")
+        return None
+    return {
+        str(int(r['out_lo'])): {
+            'satir': int(r['out_satir']),
+            'max_id': int(r['out_max_id']),
+            'checksum': r['out_checksum'],
+        }
+        for r in rows
+    }
+
+
+def _onbellek_yolu(onbellek_dir: Path, lo: int, checksum: str) -> Path:
+    return onbellek_dir / f"aralik_{lo}_{checksum[:16]}.parquet"
 
-    while len(rows_out) < max_rows:
-        rows = _fetch_page_with_retry(client, last_id, page_size)
+
+def _aralik_getir(client, lo: int, hi: int, page_size: int,
+                  onbellek: Path | None) -> tuple[list[pa.RecordBatch], bool]:
+    """Aralığı önbellekten (checksum eşleşirse) ya da Supabase'ten getir.
+
+    Çekilen aralık burada önbelleğe yazılmaz; bkz. _onbellege_yaz.
+
+    Returns:
+        (batches, önbellekten_mi)
+    """
+    if onbellek is not None and onbellek.exists():
+        try:
+            return pq.read_table(onbellek, schema=_RAW_SCHEMA).to_batches(), True
+        except Exception as e:
+            print(f"  Önbellek okunamadı ({onbellek.name}): {e}")
+    return _fetch_aralik(client, lo, hi, page_size), False
+
+
+def _onbellege_yaz(onbellek: Path, batches: list[pa.RecordBatch]):
+    onbellek.parent.mkdir(parents=True, exist_ok=True)
+    tmp = onbellek.with_suffix('.tmp')
+    pq.write_table(pa.Table.from_batches(batches, schema=_RAW_SCHEMA), tmp)
+    os.replace(tmp, onbellek)
+
+
+def _float_or_none(v):
+    if v is None:
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rows_to_batch(rows: list[dict]) -> pa.RecordBatch:
+    """Sayfayı hemen Arrow batch'e çevir — dict listesi bellekte birikmez."""
+    def _str(v):
+        return None if v is None else str(v)
+
+    return pa.RecordBatch.from_arrays([
+        pa.array([int(r['id']) for r in rows], pa.int64()),
+        pa.array([_str(r.get('urun_kod')) for r in rows], pa.string()),
+        pa.array([_str(r.get('urun_ad')) for r in rows], pa.string()),
+        pa.array([_float_or_none(r.get('birim_fiyat')) for r in rows], pa.float64()),
+    ], schema=_RAW_SCHEMA)
+
+
+def _fetch_aralik(client, lo: int, hi: int, page_size: int) -> list[pa.RecordBatch]:
+    """[lo, hi) id aralığını keyset pagination ile çek."""
+    batches = []
+    last_id = lo - 1
+    while True:
+        rows = _fetch_page_with_retry(client, last_id, page_size, ust_id=hi)
         if not rows:
             break
-
+        batches.append(_rows_to_batch(rows))
         last_id = rows[-1]['id']
-        rows_out.extend(rows)
-        page_num += 1
-        print(f"  Sayfa {page_num} OK: last_id={last_id}, satır={len(rows)}, toplam={len(rows_out)}")
         if len(rows) < page_size:
             break
-        time.sleep(0.3)
+    return batches
 
-    if not rows_out:
+
+def _fetch_urunler_raw(client, page_size: int = 5000, max_rows: int = 900000,
+                       paralel: int = FETCH_PARALEL, aralik: int = ID_ARALIK,
+                       ozet: dict[str, dict] | None = None, onbellek_dir: Path | None = None):
+    """stok_gunluk kaynağından ürün satırlarını paralel id aralıklarıyla çek.
+
+    ozet (stok_aralik_ozet) verilirse sadece dolu aralıklar istenir ve
+    onbellek_dir'de checksum'ı eşleşen aralıklar Supabase'e gitmeden okunur.
+
+    Sonuç id sırasındadır (aralıklar sırayla birleştirilir) — sıralı
+    fetch ile aynı DataFrame'i üretir.
+    """
+    if ozet is not None:
+        araliklar = [(int(lo), int(lo) + aralik) for lo in sorted(ozet, key=int)]
+        print(f"  {len(araliklar)} dolu aralık, {paralel} paralel")
+    else:
+        sinirlar = _id_sinirlari(client)
+        if sinirlar is None:
+            return pd.DataFrame(columns=['urun_kod', 'urun_ad', 'birim_fiyat'])
+        araliklar = _id_araliklari(*sinirlar, genislik=aralik)
+        print(f"  id {sinirlar[0]}..{sinirlar[1]}: {len(araliklar)} aralık, {paralel} paralel")
+
+    def _onbellek(lo: int) -> Path | None:
+        if ozet is None or onbellek_dir is None:
+            return None
+        return _onbellek_yolu(onbellek_dir, lo, ozet[str(lo)]['checksum'])
+
+    sonuc: list[list[pa.RecordBatch]] = [[] for _ in araliklar]
+    toplam = 0
+    onbellekten = 0
+    with ThreadPoolExecutor(max_workers=paralel, thread_name_prefix="urun-fetch") as pool:
+        futures = {
+            pool.submit(_aralik_getir, client, lo, hi, page_size, _onbellek(lo)): i
+            for i, (lo, hi) in enumerate(araliklar)
+        }
+        for fut in as_completed(futures):
+            i = futures[fut]
+            sonuc[i], cached = fut.result()
+            n = sum(b.num_rows for b in sonuc[i])
+            toplam += n
+            onbellekten += cached
+            lo, hi = araliklar[i]
+            kaynak = "önbellek" if cached else "fetch"
+            print(f"  Aralık {lo}-{hi - 1} OK ({kaynak}): satır={n}, toplam={toplam}")
+
+    if onbellek_dir is not None and ozet is not None:
+        print(f"  {onbellekten}/{len(araliklar)} aralık önbellekten okundu")
+        _cekilenleri_onbellege_yaz(client, ozet, araliklar, sonuc, onbellek_dir, aralik)
+
+    table = pa.Table.from_batches([b for batches in sonuc for b in batches], schema=_RAW_SCHEMA)
+    if table.num_rows > max_rows:
+        table = table.slice(0, max_rows)
+    return _tablodan_df(table)
+
+
+def _cekilenleri_onbellege_yaz(client, ozet: dict[str, dict], araliklar: list[tuple[int, int]],
+                               sonuc: list[list[pa.RecordBatch]], onbellek_dir: Path, genislik: int):
+    """Supabase'ten çekilen aralıkları, içerikleri özetle kesin tutuyorsa önbelleğe yaz.
+
+    Önbellek dosyası özet checksum'ıyla adlandırılır; özet ile fetch arasında
+    bir satır düzenlenirse (satır sayısı aynı kalsa da) eski içerik yeni
+    checksum altında kalıcı olurdu. Fetch bittikten sonra özet yeniden alınır;
+    sadece iki özette de aynı kalan aralıklar yazılır — şüphede yazılmaz, bir
+    sonraki çalıştırma o aralığı yeniden çeker.
+    """
+    cekilen = [i for i, (lo, _) in enumerate(araliklar)
+               if not _onbellek_yolu(onbellek_dir, lo, ozet[str(lo)]['checksum']).exists()]
+    if not cekilen:
+        return
+    son_ozet = _aralik_ozetleri(client, genislik) or {}
+    yazilan = 0
+    for i in cekilen:
+        lo = araliklar[i][0]
+        once = ozet[str(lo)]
+        n = sum(b.num_rows for b in sonuc[i])
+        if son_ozet.get(str(lo)) != once or n != once['satir']:
+            print(f"  Aralık {lo}: fetch sırasında değişti — önbelleğe yazılmadı")
+            continue
+        _onbellege_yaz(_onbellek_yolu(onbellek_dir, lo, once['checksum']), sonuc[i])
+        yazilan += 1
+    print(f"  {yazilan}/{len(cekilen)} çekilen aralık önbelleğe yazıldı")
+
+
+def _tablodan_df(table: pa.Table) -> pd.DataFrame:
+    """Ham Arrow tablosunu temizlenmiş (kod, ad, fiyat) DataFrame'ine çevir."""
+    if table.num_rows == 0:
         return pd.DataFrame(columns=['urun_kod', 'urun_ad', 'birim_fiyat'])
 
-    df = pd.DataFrame(rows_out)
+    df = table.to_pandas()
     df.drop(columns=['id'], errors='ignore', inplace=True)
     if 'urun_kod' not in df.columns:
         df['urun_kod'] = ''
@@ -130,58 +296,243 @@ def _fetch_urunler_raw(client, page_size: int = 5000, max_rows: int = 900000):
     return df.reset_index(drop=True)
 
 
-def build_and_save_urun_master() -> tuple[int, int]:
+def _manifest_oku(path: Path | None = None) -> dict | None:
+    path = path or MANIFEST_JSON
+    try:
+        with path.open(encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _manifest_yaz(manifest: dict, path: Path | None = None):
+    path = path or MANIFEST_JSON
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with tmp.open('w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _degisiklik_yok(manifest: dict | None, ozet: dict[str, dict] | None) -> bool:
+    """Kaynak, son kurulumdan beri aynı mı (ve çıktılar yerinde mi)?"""
+    if manifest is None or ozet is None:
+        return False
+    if manifest.get('versiyon') != MANIFEST_VERSIYON or manifest.get('aralik_genislik') != ID_ARALIK:
+        return False
+    if manifest.get('araliklar') != ozet:
+        return False
+    return all(p.exists() for p in (MASTER_PARQUET, MASTER_JSON, ONERI_JSON, YAZIM_JSON))
+
+
+def _onbellek_temizle(ozet: dict[str, dict], onbellek_dir: Path | None = None):
+    """Güncel özette olmayan (değişmiş/silinmiş) aralık dosyalarını sil."""
+    onbellek_dir = onbellek_dir or ARALIK_ONBELLEK_DIR
+    gecerli = {_onbellek_yolu(onbellek_dir, int(lo), o['checksum']).name for lo, o in ozet.items()}
+    for dosya in onbellek_dir.glob('aralik_*.parquet'):
+        if dosya.name not in gecerli:
+            dosya.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Kurulum aşamaları (benchmarks/bench_pipeline.py aşama aşama ölçer)
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def _asama(sureler: dict[str, float] | None, ad: str):
+    """Aşama süresini sureler[ad]'a yaz ve logla (scheduler bunu ilerleme olarak görür)."""
+    print(f"  [{ad}] başladı")
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        sure = time.perf_counter() - t0
+        if sureler is not None:
+            sureler[ad] = sure
+        print(f"  [{ad}] {sure:.2f} s")
+
+
+def _master_tekillestir(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Master: kimlik güvenli tablo (kod + ad)."""
+    return raw_df.drop_duplicates(subset=['urun_kod', 'urun_ad']).reset_index(drop=True)
+
+
+def _oneri_grupla(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """(kod, ad) başına mağaza sayısı (frekans) ve son fiyat, frekans sırasında.
+
+    Sonraki sort_values (kod, ad) tekil olduğu için tam sıralama verir;
+    groupby'ın kendi sıralaması (sort=True) gereksizdir.
+    """
+    if 'birim_fiyat' not in raw_df.columns:
+        raw_df = raw_df.assign(birim_fiyat=None)
+    return (
+        raw_df.groupby(['urun_kod', 'urun_ad'], as_index=False, sort=False)
+        .agg(frekans=('birim_fiyat', 'size'), birim_fiyat=('birim_fiyat', 'last'))
+        .sort_values(['frekans', 'urun_ad', 'urun_kod'], ascending=[False, True, True])
+        .reset_index(drop=True)
+    )
+
+
+def _fiyat_metni(fiyat) -> str:
+    if pd.notna(fiyat) and fiyat > 0:
+        # Tam sayıysa .00 gösterme
+        return f"{fiyat:.0f}" if fiyat == int(fiyat) else f"{fiyat:.2f}"
+    return ""
+
+
+def _format_oneri(row) -> str:
+    """Tek satırın "kod - ad - fiyat" metni (satır bazlı referans; bkz. _oneri_metinleri)."""
+    kod = str(row['urun_kod']).strip()
+    ad = str(row['urun_ad']).strip()
+    fiyat_str = _fiyat_metni(row.get('birim_fiyat'))
+    if kod and fiyat_str:
+        return f"{kod} - {ad} - {fiyat_str}"
+    if kod:
+        return f"{kod} - {ad}"
+    return ad
+
+
+def _oneri_metinleri(oneri_df: pd.DataFrame) -> list[str]:
+    """oneri_df.apply(_format_oneri, axis=1) ile aynı liste, satır başına Python çağrısı olmadan.
+
+    Farklı fiyat sayısı ürün sayısından çok küçük: fiyatlar factorize edilip
+    sadece tekil değerler biçimlenir, metinler object dizilerinde birleştirilir.
+    """
+    if oneri_df.empty:
+        return []
+    kod = oneri_df['urun_kod'].astype(str).str.strip().to_numpy(dtype=object)
+    ad = oneri_df['urun_ad'].astype(str).str.strip().to_numpy(dtype=object)
+    kodlar, tekil = pd.factorize(pd.to_numeric(oneri_df['birim_fiyat'], errors='coerce'))
+    # factorize NaN'ı -1 yapar → sondaki boş metin
+    tekil_metin = np.array([_fiyat_metni(f) for f in tekil] + [''], dtype=object)
+    fiyat = tekil_metin[kodlar]
+
+    kod_ad = kod + ' - ' + ad
+    metin = np.where(fiyat != '', kod_ad + ' - ' + fiyat, kod_ad)
+    metin = np.where(kod != '', metin, ad)
+    return pd.Series(metin, dtype=object).drop_duplicates().tolist()
+
+
+def _ciktilari_yaz(hedef_dir: Path, master_df: pd.DataFrame, oneri_df: pd.DataFrame,
+                   oneri_listesi: list[str], sureler: dict[str, float] | None = None):
+    """Dört artifact'ı hedef_dir'e yaz (pipeline'da yeni versiyon dizini)."""
+    with _asama(sureler, 'yaz'):
+        master_df.to_parquet(hedef_dir / MASTER_PARQUET.name, index=False)
+        master_df.to_json(hedef_dir / MASTER_JSON.name, orient='records', force_ascii=False)
+        with (hedef_dir / ONERI_JSON.name).open('w', encoding='utf-8') as f:
+            json.dump(oneri_listesi, f, ensure_ascii=False)
+
+    # Yazım düzeltme sözlüğü: kelime ağırlığı = ürünün mağaza sayısı
+    with _asama(sureler, 'yazim'):
+        magaza_sayisi = master_df.merge(
+            oneri_df[['urun_kod', 'urun_ad', 'frekans']], on=['urun_kod', 'urun_ad'], how='left'
+        )['frekans']
+        yazim_sozlugu_kaydet(
+            yazim_frekanslari(master_df['urun_ad_normalized'], magaza_sayisi),
+            hedef_dir / YAZIM_JSON.name,
+        )
+
+
+def build_and_save_urun_master(tam: bool = False,
+                               sureler: dict[str, float] | None = None) -> tuple[int, int]:
     """urun_master + öneri listesi üretip kaydeder.
 
+    Artımlı mod (varsayılan): stok_aralik_ozet ile id aralığı başına satır
+    sayısı + checksum alınır ve manifest ile karşılaştırılır.
+      - Hiçbir aralık değişmediyse yeniden kurulum atlanır; hiçbir dosya
+        yazılmaz (commit'lenen manifest değişmez, günlük cron boş commit atmaz).
+      - Değişen aralıklar Supabase'ten çekilir, değişmeyenler yerel
+        önbellekten okunur; çıktılar tam kurulumla byte-byte aynıdır.
+    RPC yoksa ya da tam=True ise her şey baştan çekilir.
+
+    Aşama süreleri (fetch, dedup, normalize, groupby, format, yaz, yazim,
+    yayinla) loglanır, manifest'e yazılır ve sureler verilirse içine konur.
+
     Returns:
         (master_satir_sayisi, oneri_sayisi)
     """
+    sureler = {} if sureler is None else sureler
     client = get_supabase_client()
-    raw_df = _fetch_urunler_raw(client)
+    ozet = None if tam else _aralik_ozetleri(client)
+    manifest = _manifest_oku()
+
+    if _degisiklik_yok(manifest, ozet):
+        print('  stok_gunluk değişmemiş — yeniden kurulum atlandı')
+        return manifest['master_satir'], manifest['oneri_satir']
+
+    with _asama(sureler, 'fetch'):
+        raw_df = _fetch_urunler_raw(
+            client, ozet=ozet, onbellek_dir=ARALIK_ONBELLEK_DIR if ozet is not None else None,
+        )
     if raw_df.empty:
         raise RuntimeError('Ürün verisi bulunamadı')
 
-    # Master: kimlik güvenli tablo (kod + ad)
-    master_df = raw_df.drop_duplicates(subset=['urun_kod', 'urun_ad']).reset_index(drop=True)
-    master_df['urun_ad_normalized'] = master_df['urun_ad'].map(normalize_urun_ad)
+    with _asama(sureler, 'dedup'):
+        master_df = _master_tekillestir(raw_df)
+    with _asama(sureler, 'normalize'):
+        master_df['urun_ad_normalized'] = normalize_tr_search_series(master_df['urun_ad'])
 
     # Öneri kaynağı: kod + ad + fiyat (son geçerli fiyat, hafif hesaplama)
-    if 'birim_fiyat' not in raw_df.columns:
-        raw_df['birim_fiyat'] = None
-
-    oneri_df = (
-        raw_df.groupby(['urun_kod', 'urun_ad'], as_index=False)
-        .agg(frekans=('birim_fiyat', 'size'), birim_fiyat=('birim_fiyat', 'last'))
-        .sort_values(['frekans', 'urun_ad', 'urun_kod'], ascending=[False, True, True])
-    )
-
-    def _format_oneri(row) -> str:
-        kod = str(row['urun_kod']).strip()
-        ad = str(row['urun_ad']).strip()
-        fiyat = row.get('birim_fiyat')
-        fiyat_str = ""
-        if pd.notna(fiyat) and fiyat > 0:
-            # Tam sayıysa .00 gösterme
-            fiyat_str = f"{fiyat:.0f}" if fiyat == int(fiyat) else f"{fiyat:.2f}"
-        if kod and fiyat_str:
-            return f"{kod} - {ad} - {fiyat_str}"
-        if kod:
-            return f"{kod} - {ad}"
-        return ad
-
-    oneri_listesi = oneri_df.apply(_format_oneri, axis=1).drop_duplicates().tolist()
+    with _asama(sureler, 'groupby'):
+        oneri_df = _oneri_grupla(raw_df)
+    with _asama(sureler, 'format'):
+        oneri_listesi = _oneri_metinleri(oneri_df)
 
+    # Yeni versiyon dizinine yaz → düz kopyaları atomik güncelle → CURRENT'ı çevir
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    master_df.to_parquet(MASTER_PARQUET, index=False)
-    master_df.to_json(MASTER_JSON, orient='records', force_ascii=False)
+    versiyon_dir = yeni_versiyon_dizini(DATA_DIR)
+    _ciktilari_yaz(versiyon_dir, master_df, oneri_df, oneri_listesi, sureler)
+
+    with _asama(sureler, 'yayinla'):
+        for hedef in (MASTER_PARQUET, MASTER_JSON, ONERI_JSON, YAZIM_JSON):
+            atomik_kopyala(versiyon_dir / hedef.name, hedef)
+        yayinla(versiyon_dir, DATA_DIR)
+    print(f"  Versiyon yayınlandı: {versiyon_dir.name}")
+
+    if ozet is not None:
+        simdi = datetime.now().isoformat(timespec='seconds')
+        _manifest_yaz({
+            'versiyon': MANIFEST_VERSIYON,
+            'aralik_genislik': ID_ARALIK,
+            'araliklar': ozet,
+            'max_id': max((o['max_id'] for o in ozet.values()), default=0),
+            'satir': sum(o['satir'] for o in ozet.values()),
+            'master_satir': len(master_df),
+            'oneri_satir': len(oneri_listesi),
+            'asama_sureleri': {ad: round(sn, 3) for ad, sn in sureler.items()},
+            'olusturuldu': simdi,
+        })
+        _onbellek_temizle(ozet)
+    else:
+        # Özetsiz kurulumun manifest'i yok: bir sonraki artımlı çalıştırma tam kurar
+        MANIFEST_JSON.unlink(missing_ok=True)
+
+    _urun_index_yenile()
+    return len(master_df), len(oneri_listesi)
 
-    with ONERI_JSON.open('w', encoding='utf-8') as f:
-        json.dump(oneri_listesi, f, ensure_ascii=False)
 
-    return len(master_df), len(oneri_listesi)
+def _urun_index_yenile():
+    """Aynı process'te arama index'leri yüklüyse yeni versiyonla senkron yeniden kur.
+
+    Ayrı process'lerde (subprocess, GitHub Actions) index'ler CURRENT
+    değişiminden kendileri (arka planda) yenilenir; burada gereksiz yere
+    import edilmez.
+    """
+    for modul_adi, fonksiyon in (
+        ('arama.urun_index', 'reload_urun_index'),
+        ('arama.yazim', 'reload_yazim_index'),
+    ):
+        modul = sys.modules.get(modul_adi)
+        if modul is None:
+            continue
+        try:
+            getattr(modul, fonksiyon)()
+        except Exception as e:
+            print(f"  {modul_adi} yenilenemedi: {e}")
 
 
 if __name__ == '__main__':
-    master_count, oneri_count = build_and_save_urun_master()
+    master_count, oneri_count = build_and_save_urun_master(tam='--tam' in sys.argv)
     print(f'urun_master üretildi: {master_count} satır')
     print(f'oneri_listesi üretildi: {oneri_count} kayıt')
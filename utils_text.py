@@ -3,6 +3,13 @@
 from __future__ import annotations
 
 import re
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 _TR_MAP = str.maketrans("İŞĞÖÜÇıişğöüç", "ISGOUCiisgouc")
 
@@ -48,3 +55,99 @@ def extract_tokens(text: str) -> dict:
         "size": size_tokens,
         "brand": brand_tokens,
     }
+
+
+# ---------------------------------------------------------------------------
+# Arama normalize'ı — SQL normalize_tr_search ile birebir
+# ---------------------------------------------------------------------------
+# urun_ara_app (sorgu) ve urun_master_pipeline (900k satırlık ürün adı) aynı
+# fonksiyonu kullanır; iki taraf ayrışırsa yerel index/SQL eşleşmesi bozulur.
+
+_SEARCH_TR_MAP = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u',
+    'Ş': 's', 'ş': 's',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+})
+
+# Smart quote ve özel karakter temizliği (makine dönüşümünden SONRA uygulanır)
+_SEARCH_PUNCT_MAP = str.maketrans({
+    '\u201c': None, '\u201d': None, '\u2019': None,
+    '\u00a0': ' ', '\u0307': None,
+})
+
+_RE_TV_SAYI = re.compile(r'(tv|televizyon)(\d)')
+
+
+@lru_cache(maxsize=1)
+def _combining_map() -> dict:
+    """Tüm combining karakterleri silen translate tablosu (ilk ASCII dışı girdide kurulur)."""
+    return {
+        cp: None for cp in range(sys.maxunicode + 1)
+        if unicodedata.combining(chr(cp))
+    }
+
+
+def _normalize_search(text: str) -> str:
+    result = text
+    if not result.isascii():
+        # ASCII girdide tek eşleme I→i'dir; onu lower() zaten yapar
+        result = result.translate(_SEARCH_TR_MAP)
+
+    # Accent temizliği (SQL: unaccent) — ASCII girdide NFKD değiştirmez
+    if not result.isascii():
+        result = unicodedata.normalize('NFKD', result).translate(_combining_map())
+
+    result = result.lower()
+
+    # Sıralı replace: "makinasisi" gibi girdilerde SQL ile aynı sonucu verir
+    if 'makin' in result:
+        result = result.replace('makinasi', 'makine')
+        result = result.replace('makinesi', 'makine')
+        result = result.replace('makina', 'makine')
+
+    if not result.isascii():
+        result = result.translate(_SEARCH_PUNCT_MAP)
+    if 'tv' in result or 'televizyon' in result:
+        result = _RE_TV_SAYI.sub(r'\1 \2', result)
+    # str.split() ile re \s aynı (Unicode) boşluk tanımını kullanır
+    return ' '.join(result.split())
+
+
+@lru_cache(maxsize=65536)
+def normalize_tr_search(text: str) -> str:
+    """
+    SQL normalize_tr_search ile birebir uyumlu normalize (memoize edilir).
+
+    SQL fonksiyonu sırası:
+      1. translate(text, 'İIıĞğÜüŞşÖöÇç', 'iiigguussoocc')
+      2. unaccent(...)       → â→a gibi accent temizliği
+      3. lower(...)
+      4. replace('makinasi','makine')
+      5. replace('makinesi','makine')
+      6. replace('makina','makine')
+
+    Python tarafı ayrıca smart quote / NBSP temizler, "tv65" → "tv 65"
+    ayırır ve boşlukları tekler.
+    """
+    if not text:
+        return ""
+    return _normalize_search(text)
+
+
+def normalize_tr_search_series(values: pd.Series) -> pd.Series:
+    """normalize_tr_search'ün Series versiyonu — her farklı değer bir kez işlenir.
+
+    stok_gunluk'ta aynı ürün adı her mağaza için tekrar eder; factorize ile
+    tekilleştirip sonucu geri yaymak satır satır map'ten çok daha ucuzdur.
+    Memo cache'i kirletmemek için lru_cache'li scalar yerine çekirdek kullanılır.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    normalized = [_normalize_search(u) if isinstance(u, str) and u else "" for u in uniques]
+    lookup = np.array(normalized + [""], dtype=object)  # -1 (NaN) → ""
+    return pd.Series(lookup[codes], index=values.index, dtype=object, name=values.name)